@@ -2,9 +2,18 @@
 TaskWeaver AI 核心模块
 
 包含统一数据模型和核心处理引擎。
+
+CoreProcessor 按需导入（PEP 562），只使用数据模型的调用方不必加载处理引擎。
 """
 
 from .models import Task, ProjectPlan
-from .processor import CoreProcessor
 
 __all__ = ['Task', 'ProjectPlan', 'CoreProcessor']
+
+
+def __getattr__(name):
+    """懒加载处理引擎，首次访问时才导入"""
+    if name == 'CoreProcessor':
+        from .processor import CoreProcessor
+        return CoreProcessor
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
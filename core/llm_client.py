@@ -5,25 +5,63 @@ TaskWeaver AI 统一LLM客户端
 """
 
 import os
+import re
 import json
-from typing import Dict, List, Optional, Any
+import asyncio
+from functools import lru_cache
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Any
 from enum import Enum
 
+# zstandard为可选压缩库，未安装时磁盘缓存退化为zlib压缩
+try:
+    import zstandard as _zstd
+except ImportError:
+    _zstd = None
+
+# openai（连带httpx/pydantic依赖图）的导入要几十到上百毫秒，
+# 懒加载到首次真正创建客户端时：CLI冷启动或只用本地解析的路径
+# 完全不付这笔开销。_OPENAI_OK为None表示尚未探测。
+openai = None
+_OPENAI_OK = None
+
+
+def _ensure_openai() -> bool:
+    """按需导入openai库，返回是否可用（结果缓存，重复调用零开销）"""
+    global openai, _OPENAI_OK
+    if _OPENAI_OK is None:
+        try:
+            import openai as _openai
+            openai = _openai
+            _OPENAI_OK = True
+        except ImportError:
+            _OPENAI_OK = False
+    return _OPENAI_OK
+
+# .env行格式：KEY=value，值可带双引号/单引号，忽略注释
+_ENV_RE = re.compile(
+    r'^\s*([A-Za-z_][A-Za-z0-9_]*)\s*=\s*'
+    r'(?:"([^"]*)"|\'([^\']*)\'|([^\r\n#]*))',
+    re.M
+)
+
+
 # 自动加载.env文件
 def load_env():
     """加载.env文件中的环境变量"""
+    # 同一进程内只解析一次，重复import不再读文件
+    if os.environ.get('_TASKWEAVER_ENV_LOADED'):
+        return
+    os.environ['_TASKWEAVER_ENV_LOADED'] = '1'
+
     env_file = os.path.join(os.path.dirname(os.path.dirname(__file__)), '.env')
     if os.path.exists(env_file):
         try:
             with open(env_file, 'r', encoding='utf-8') as f:
-                for line in f:
-                    line = line.strip()
-                    if line and not line.startswith('#') and '=' in line:
-                        key, value = line.split('=', 1)
-                        key = key.strip()
-                        value = value.strip().strip('"').strip("'")
-                        if not os.getenv(key):  # 只设置未设置的变量
-                            os.environ[key] = value
+                text = f.read()
+            for match in _ENV_RE.finditer(text):
+                key = match.group(1)
+                value = match.group(2) or match.group(3) or (match.group(4) or '').strip()
+                os.environ.setdefault(key, value)  # 只设置未设置的变量
         except Exception:
             pass  # 静默失败
 
@@ -31,6 +69,171 @@ def load_env():
 load_env()
 
 
+# 共享的httpx客户端（连接池），避免每个LLMClient实例重新建立TCP+TLS连接
+_SHARED_HTTP = None
+_SHARED_AHTTP = None
+
+
+def _get_shared_http_client():
+    """获取共享的同步httpx客户端（懒加载）"""
+    global _SHARED_HTTP
+    if _SHARED_HTTP is None:
+        import atexit
+        import httpx
+        _SHARED_HTTP = httpx.Client(
+            limits=httpx.Limits(
+                max_connections=64,
+                max_keepalive_connections=32,
+                keepalive_expiry=90
+            ),
+            timeout=httpx.Timeout(120.0, connect=10.0),
+            # 连接建立失败在传输层重试，省掉上层整次请求的重发
+            transport=httpx.HTTPTransport(retries=2)
+        )
+        atexit.register(_SHARED_HTTP.close)
+    return _SHARED_HTTP
+
+
+def _get_shared_async_http_client():
+    """获取共享的异步httpx客户端（懒加载）"""
+    global _SHARED_AHTTP
+    if _SHARED_AHTTP is None:
+        import httpx
+        _SHARED_AHTTP = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=64,
+                max_keepalive_connections=32,
+                keepalive_expiry=90
+            ),
+            timeout=httpx.Timeout(120.0, connect=10.0),
+            transport=httpx.AsyncHTTPTransport(retries=2)
+        )
+    return _SHARED_AHTTP
+
+
+class _ResponseCache:
+    """
+    LLM响应缓存
+
+    以内容寻址（SHA-256键）缓存聊天回复：内存中使用LRU（OrderedDict），
+    并可选地持久化到SQLite文件，重复的相同请求无需再次访问API。
+    """
+
+    def __init__(self, capacity: int = 1024, db_path: str = None):
+        """
+        初始化缓存
+
+        Args:
+            capacity: 内存LRU的最大条目数
+            db_path: SQLite持久化文件路径，None表示仅内存缓存
+        """
+        from collections import OrderedDict
+        self.capacity = capacity
+        self._memory = OrderedDict()
+        self._db_path = db_path
+        self._conn = None
+
+        if db_path:
+            try:
+                import sqlite3
+                os.makedirs(os.path.dirname(db_path), exist_ok=True)
+                self._conn = sqlite3.connect(db_path, check_same_thread=False)
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute("PRAGMA synchronous=NORMAL")
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS cache "
+                    "(key TEXT PRIMARY KEY, value TEXT, ts INTEGER)"
+                )
+                self._conn.commit()
+            except Exception:
+                self._conn = None  # 持久化失败时退化为纯内存缓存
+
+    @staticmethod
+    def _compress(value: str) -> bytes:
+        """压缩回复内容用于磁盘存储（首字节标记压缩算法）"""
+        data = value.encode('utf-8')
+        if _zstd is not None:
+            return b'\x01' + _zstd.ZstdCompressor(level=3).compress(data)
+        import zlib
+        return b'\x02' + zlib.compress(data, 1)
+
+    @staticmethod
+    def _decompress(blob) -> Optional[str]:
+        """解压磁盘存储的回复内容，无法识别时返回None"""
+        if isinstance(blob, str):
+            return blob  # 旧格式：未压缩的文本
+        try:
+            if blob[:1] == b'\x01' and _zstd is not None:
+                return _zstd.ZstdDecompressor().decompress(blob[1:]).decode('utf-8')
+            if blob[:1] == b'\x02':
+                import zlib
+                return zlib.decompress(blob[1:]).decode('utf-8')
+        except Exception:
+            pass
+        return None
+
+    @staticmethod
+    def make_key(provider: str, model: str, temperature: float,
+                 max_tokens: int, messages: List[Dict[str, str]]) -> str:
+        """根据请求参数生成内容寻址的缓存键"""
+        import hashlib
+        payload = json.dumps(
+            {"p": provider, "m": model, "t": temperature,
+             "mx": max_tokens, "msgs": messages},
+            sort_keys=True, ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """查询缓存，命中时返回回复内容"""
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return self._memory[key]
+
+        if self._conn is not None:
+            try:
+                row = self._conn.execute(
+                    "SELECT value FROM cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row:
+                    value = self._decompress(row[0])
+                    if value is not None:
+                        self._memory[key] = value
+                        return value
+            except Exception:
+                pass
+
+        return None
+
+    def put(self, key: str, value: str):
+        """写入缓存"""
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.capacity:
+            self._memory.popitem(last=False)
+
+        if self._conn is not None:
+            try:
+                import time
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO cache (key, value, ts) VALUES (?, ?, ?)",
+                    (key, self._compress(value), int(time.time()))
+                )
+                self._conn.commit()
+            except Exception:
+                pass
+
+    def clear(self):
+        """清空缓存"""
+        self._memory.clear()
+        if self._conn is not None:
+            try:
+                self._conn.execute("DELETE FROM cache")
+                self._conn.commit()
+            except Exception:
+                pass
+
+
 class LLMProvider(Enum):
     """LLM提供商枚举"""
     SILICONFLOW = "siliconflow"
@@ -55,8 +258,18 @@ class LLMClient:
         """
         self.provider = provider or os.getenv('DEFAULT_LLM_PROVIDER', 'siliconflow')
         self.client = None
+        self.aclient = None
         self.model = model
-        
+
+        # 响应缓存：相同请求直接返回缓存结果，避免重复的网络往返和API费用
+        # 磁盘层跨会话生效，可通过 TASKWEAVER_CACHE=0 关闭
+        cache_db = None
+        if os.getenv('TASKWEAVER_CACHE', '1') != '0':
+            cache_db = os.path.join(
+                os.path.expanduser('~'), '.taskweaver', 'llm_cache.sqlite'
+            )
+        self._cache = _ResponseCache(capacity=1024, db_path=cache_db)
+
         # 初始化客户端
         self._init_client(api_key)
     
@@ -71,9 +284,13 @@ class LLMClient:
     
     def _init_siliconflow_client(self, api_key: str = None):
         """初始化硅基流动客户端"""
+        if not _ensure_openai():
+            print("❌ 未安装openai库，无法使用硅基流动API")
+            self.client = None
+            self.aclient = None
+            return
+
         try:
-            import openai
-            
             # 使用API密钥
             api_key = api_key or os.getenv('SILICONFLOW_API_KEY')
             if not api_key:
@@ -84,25 +301,35 @@ class LLMClient:
                 self.model = os.getenv('SILICONFLOW_MODEL', 'Qwen/Qwen2.5-72B-Instruct')
             
             # 创建客户端，使用硅基流动的API端点
+            base_url = os.getenv('SILICONFLOW_BASE_URL', 'https://api.siliconflow.cn/v1')
             self.client = openai.OpenAI(
                 api_key=api_key,
-                base_url=os.getenv('SILICONFLOW_BASE_URL', 'https://api.siliconflow.cn/v1')
+                base_url=base_url,
+                http_client=_get_shared_http_client()
             )
-            
+            # 并行的异步客户端，用于批量请求
+            self.aclient = openai.AsyncOpenAI(
+                api_key=api_key,
+                base_url=base_url,
+                http_client=_get_shared_async_http_client()
+            )
+
             print(f"✅ 硅基流动客户端初始化成功，模型: {self.model}")
-            
-        except ImportError:
-            print("❌ 未安装openai库，无法使用硅基流动API")
-            self.client = None
+
         except Exception as e:
             print(f"❌ 硅基流动客户端初始化失败: {e}")
             self.client = None
+            self.aclient = None
     
     def _init_openai_client(self, api_key: str = None):
         """初始化OpenAI客户端"""
+        if not _ensure_openai():
+            print("❌ 未安装openai库，无法使用OpenAI API")
+            self.client = None
+            self.aclient = None
+            return
+
         try:
-            import openai
-            
             # 使用API密钥
             api_key = api_key or os.getenv('OPENAI_API_KEY')
             if not api_key:
@@ -113,54 +340,297 @@ class LLMClient:
                 self.model = os.getenv('OPENAI_MODEL', 'gpt-4')
             
             # 创建客户端
-            self.client = openai.OpenAI(api_key=api_key)
-            
+            self.client = openai.OpenAI(
+                api_key=api_key,
+                http_client=_get_shared_http_client()
+            )
+            # 并行的异步客户端，用于批量请求
+            self.aclient = openai.AsyncOpenAI(
+                api_key=api_key,
+                http_client=_get_shared_async_http_client()
+            )
+
             print(f"✅ OpenAI客户端初始化成功，模型: {self.model}")
-            
-        except ImportError:
-            print("❌ 未安装openai库，无法使用OpenAI API")
-            self.client = None
+
         except Exception as e:
             print(f"❌ OpenAI客户端初始化失败: {e}")
             self.client = None
+            self.aclient = None
     
     def is_available(self) -> bool:
         """检查客户端是否可用"""
         return self.client is not None
     
-    def chat_completion(self, messages: List[Dict[str, str]], 
-                       temperature: float = 0.1, 
-                       max_tokens: int = 2000) -> Optional[str]:
+    def _prompt_cache_kwargs(self, prompt_cache_key: Optional[str]) -> Dict:
+        """构造服务端提示缓存的请求参数
+
+        prompt_cache_key让OpenAI把相同前缀的请求路由到同一缓存分片，
+        静态系统提示的处理成本在命中时可省50-80%。只有官方OpenAI
+        确定支持该参数，其他OpenAI兼容端点（如SiliconFlow）可能拒绝
+        未知字段，保守起见不透传。
+        """
+        if prompt_cache_key and self.provider == 'openai':
+            return {'prompt_cache_key': prompt_cache_key}
+        return {}
+
+    def chat_completion(self, messages: List[Dict[str, str]],
+                       temperature: float = 0.1,
+                       max_tokens: int = 2000,
+                       no_cache: bool = False,
+                       prompt_cache_key: str = None,
+                       response_format: Dict = None) -> Optional[str]:
         """
         聊天完成API调用
-        
+
         Args:
             messages: 消息列表，格式为 [{"role": "system/user/assistant", "content": "内容"}]
             temperature: 温度参数
             max_tokens: 最大token数
-            
+            no_cache: 是否跳过响应缓存
+            prompt_cache_key: 服务端提示缓存分片键（仅OpenAI透传）
+            response_format: 结构化输出约束（如json_schema），由调用方
+                按提供商能力决定是否传入
+
         Returns:
             AI回复内容，失败时返回None
         """
         if not self.client:
             print("❌ LLM客户端未初始化")
             return None
-        
+
+        # 高温度下输出不确定，不使用缓存
+        use_cache = not no_cache and temperature <= 0.2
+        cache_key = None
+
+        if use_cache:
+            cache_key = _ResponseCache.make_key(
+                self.provider, self.model, temperature, max_tokens, messages
+            )
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                return cached
+
         try:
+            extra = self._prompt_cache_kwargs(prompt_cache_key)
+            if response_format is not None:
+                extra['response_format'] = response_format
             response = self.client.chat.completions.create(
                 model=self.model,
                 messages=messages,
                 temperature=temperature,
-                max_tokens=max_tokens
+                max_tokens=max_tokens,
+                **extra
             )
-            
-            return response.choices[0].message.content
-            
+
+            content = response.choices[0].message.content
+
+            if use_cache and content:
+                self._cache.put(cache_key, content)
+
+            return content
+
         except Exception as e:
             print(f"❌ LLM API调用失败: {e}")
             return None
+
+    def clear_cache(self):
+        """清空响应缓存"""
+        self._cache.clear()
+
+    def stream_completion(self, messages: List[Dict[str, str]],
+                          temperature: float = 0.1,
+                          max_tokens: int = 2000) -> Iterator[str]:
+        """
+        流式聊天完成API调用
+
+        逐块返回AI回复，调用方可以边接收边处理（如实时显示、增量解析），
+        无需等待完整响应。
+
+        Args:
+            messages: 消息列表，格式为 [{"role": "system/user/assistant", "content": "内容"}]
+            temperature: 温度参数
+            max_tokens: 最大token数
+
+        Yields:
+            回复内容的文本片段
+        """
+        if not self.client:
+            print("❌ LLM客户端未初始化")
+            return
+
+        try:
+            stream = self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=True
+            )
+
+            for chunk in stream:
+                if chunk.choices:
+                    yield chunk.choices[0].delta.content or ''
+
+        except Exception as e:
+            print(f"❌ LLM API调用失败: {e}")
+
+    async def astream_completion(self, messages: List[Dict[str, str]],
+                                 temperature: float = 0.1,
+                                 max_tokens: int = 2000) -> AsyncIterator[str]:
+        """
+        异步流式聊天完成API调用
+
+        与 stream_completion 相同，但使用异步客户端。
+
+        Yields:
+            回复内容的文本片段
+        """
+        if not self.aclient:
+            print("❌ LLM异步客户端未初始化")
+            return
+
+        try:
+            stream = await self.aclient.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=True
+            )
+
+            async for chunk in stream:
+                if chunk.choices:
+                    yield chunk.choices[0].delta.content or ''
+
+        except Exception as e:
+            print(f"❌ LLM API调用失败: {e}")
+
+    def chat_completion_streamed(self, messages: List[Dict[str, str]],
+                                 temperature: float = 0.1,
+                                 max_tokens: int = 2000) -> Optional[str]:
+        """
+        流式聊天完成的兼容包装
+
+        内部使用流式API接收，拼接为完整回复后返回，接口与 chat_completion 一致。
+
+        Returns:
+            AI回复内容，失败时返回None
+        """
+        parts = list(self.stream_completion(messages, temperature, max_tokens))
+        if not parts:
+            return None
+        return ''.join(parts)
     
-    def simple_completion(self, prompt: str, 
+    async def achat_completion(self, messages: List[Dict[str, str]],
+                               temperature: float = 0.1,
+                               max_tokens: int = 2000,
+                               prompt_cache_key: str = None,
+                               response_format: Dict = None) -> Optional[str]:
+        """
+        异步聊天完成API调用
+
+        与 chat_completion 相同，但使用异步客户端，可以并发执行多个请求。
+
+        Args:
+            messages: 消息列表，格式为 [{"role": "system/user/assistant", "content": "内容"}]
+            temperature: 温度参数
+            max_tokens: 最大token数
+            prompt_cache_key: 服务端提示缓存分片键（仅OpenAI透传）
+            response_format: 结构化输出约束（如json_schema），由调用方
+                按提供商能力决定是否传入
+
+        Returns:
+            AI回复内容，失败时返回None
+        """
+        if not self.aclient:
+            print("❌ LLM异步客户端未初始化")
+            return None
+
+        # 与同步路径共用同一份响应缓存（高温度下输出不确定，不缓存）
+        use_cache = temperature <= 0.2
+        cache_key = None
+
+        if use_cache:
+            cache_key = _ResponseCache.make_key(
+                self.provider, self.model, temperature, max_tokens, messages
+            )
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        try:
+            extra = self._prompt_cache_kwargs(prompt_cache_key)
+            if response_format is not None:
+                extra['response_format'] = response_format
+            response = await self.aclient.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                **extra
+            )
+
+            content = response.choices[0].message.content
+
+            if use_cache and content:
+                self._cache.put(cache_key, content)
+
+            return content
+
+        except Exception as e:
+            print(f"❌ LLM API调用失败: {e}")
+            return None
+
+    async def abatch(self, list_of_messages: List[List[Dict[str, str]]],
+                     max_concurrency: int = 8,
+                     temperature: float = 0.1,
+                     max_tokens: int = 2000) -> List[Optional[str]]:
+        """
+        异步批量聊天完成
+
+        并发执行多个聊天请求，将 N 次串行往返压缩为约一次往返的耗时。
+
+        Args:
+            list_of_messages: 多组消息列表
+            max_concurrency: 最大并发数
+            temperature: 温度参数
+            max_tokens: 最大token数
+
+        Returns:
+            与输入顺序对应的回复列表，单个请求失败时对应位置为异常对象
+        """
+        sem = asyncio.Semaphore(max_concurrency)
+
+        async def limited_call(messages):
+            async with sem:
+                return await self.achat_completion(messages, temperature, max_tokens)
+
+        tasks = [limited_call(messages) for messages in list_of_messages]
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+    def batch_completion(self, list_of_messages: List[List[Dict[str, str]]],
+                         max_concurrency: int = 8,
+                         temperature: float = 0.1,
+                         max_tokens: int = 2000) -> List[Optional[str]]:
+        """
+        同步便捷方法：批量聊天完成
+
+        内部使用 asyncio 并发执行所有请求。
+
+        Args:
+            list_of_messages: 多组消息列表
+            max_concurrency: 最大并发数
+            temperature: 温度参数
+            max_tokens: 最大token数
+
+        Returns:
+            与输入顺序对应的回复列表
+        """
+        return asyncio.run(self.abatch(
+            list_of_messages, max_concurrency, temperature, max_tokens
+        ))
+
+    def simple_completion(self, prompt: str,
                          system_prompt: str = None,
                          temperature: float = 0.1, 
                          max_tokens: int = 2000) -> Optional[str]:
@@ -185,6 +655,68 @@ class LLMClient:
         
         return self.chat_completion(messages, temperature, max_tokens)
     
+    def multi_completion(self, prompts: List[str],
+                         system_prompt: str = None,
+                         temperature: float = 0.1,
+                         max_tokens: int = 2000) -> List[Optional[str]]:
+        """
+        多提示合并完成
+
+        将多个小提示合并为一次API调用（要求模型返回JSON数组），
+        把N次网络往返压缩为1次。合并响应解析失败时回退到并发批量请求。
+
+        Args:
+            prompts: 提示列表
+            system_prompt: 系统提示（可选）
+            temperature: 温度参数
+            max_tokens: 最大token数
+
+        Returns:
+            与输入顺序对应的回复列表
+        """
+        if not prompts:
+            return []
+
+        combined_prompt = (
+            "请依次回答下面JSON数组中的每个提示，"
+            '并以JSON对象 {"answers": ["回答1", "回答2", ...]} 的格式返回，'
+            "回答顺序与提示顺序一致，不要添加其他内容。\n"
+            + json.dumps(prompts, ensure_ascii=False)
+        )
+
+        messages = []
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+        messages.append({"role": "user", "content": combined_prompt})
+
+        try:
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                response_format={"type": "json_object"}
+            )
+            content = response.choices[0].message.content
+            answers = json.loads(content)["answers"]
+            if isinstance(answers, list) and len(answers) == len(prompts):
+                return answers
+        except Exception as e:
+            print(f"⚠️ 合并请求失败，回退到并发批量请求: {e}")
+
+        # 回退：逐条并发请求
+        list_of_messages = []
+        for prompt in prompts:
+            msgs = []
+            if system_prompt:
+                msgs.append({"role": "system", "content": system_prompt})
+            msgs.append({"role": "user", "content": prompt})
+            list_of_messages.append(msgs)
+
+        return self.batch_completion(
+            list_of_messages, temperature=temperature, max_tokens=max_tokens
+        )
+
     def get_provider_info(self) -> Dict[str, Any]:
         """获取提供商信息"""
         return {
@@ -195,6 +727,102 @@ class LLMClient:
         }
 
 
+class RateLimitedLLM:
+    """
+    带速率限制的LLM客户端包装
+
+    组合LLMClient，用信号量限制并发数、用滑动窗口限制每分钟请求数，
+    避免大规模并发时触发提供商的429限流导致退避重试抵消并行收益。
+    """
+
+    def __init__(self, llm: LLMClient,
+                 max_concurrency: int = None,
+                 max_rpm: int = None):
+        """
+        初始化速率限制包装
+
+        Args:
+            llm: 被包装的LLM客户端
+            max_concurrency: 最大并发数，默认读取TASKWEAVER_MAX_CONCURRENCY（默认8）
+            max_rpm: 每分钟最大请求数，默认读取TASKWEAVER_MAX_RPM（默认60）
+        """
+        self.llm = llm
+        self.max_concurrency = int(
+            max_concurrency or os.getenv('TASKWEAVER_MAX_CONCURRENCY', '8')
+        )
+        self.max_rpm = int(max_rpm or os.getenv('TASKWEAVER_MAX_RPM', '60'))
+        self._sem = None
+        self._request_times = []
+
+    async def _acquire_rate_slot(self):
+        """滑动窗口限流：超过每分钟配额时等待最早的请求滑出窗口"""
+        import time
+        while True:
+            now = time.monotonic()
+            self._request_times = [t for t in self._request_times if now - t < 60]
+            if len(self._request_times) < self.max_rpm:
+                self._request_times.append(now)
+                return
+            await asyncio.sleep(60 - (now - self._request_times[0]))
+
+    async def achat_completion(self, messages: List[Dict[str, str]],
+                               temperature: float = 0.1,
+                               max_tokens: int = 2000,
+                               max_retries: int = 3) -> Optional[str]:
+        """
+        受速率限制的异步聊天完成
+
+        命中429限流时按retry-after等待并重试（带抖动），最多重试max_retries次。
+
+        Returns:
+            AI回复内容，失败时返回None
+        """
+        if not self.llm.aclient:
+            print("❌ LLM异步客户端未初始化")
+            return None
+
+        if self._sem is None:
+            self._sem = asyncio.Semaphore(self.max_concurrency)
+
+        for attempt in range(max_retries + 1):
+            await self._acquire_rate_slot()
+            try:
+                async with self._sem:
+                    response = await self.llm.aclient.chat.completions.create(
+                        model=self.llm.model,
+                        messages=messages,
+                        temperature=temperature,
+                        max_tokens=max_tokens
+                    )
+                return response.choices[0].message.content
+            except Exception as e:
+                is_rate_limit = (
+                    openai is not None and isinstance(e, openai.RateLimitError)
+                )
+                if is_rate_limit and attempt < max_retries:
+                    import random
+                    try:
+                        retry_after = int(e.response.headers.get('retry-after', '1'))
+                    except Exception:
+                        retry_after = 1
+                    await asyncio.sleep(retry_after + random.uniform(0, 1))
+                    continue
+                print(f"❌ LLM API调用失败: {e}")
+                return None
+
+        return None
+
+    async def abatch(self, list_of_messages: List[List[Dict[str, str]]],
+                     temperature: float = 0.1,
+                     max_tokens: int = 2000) -> List[Optional[str]]:
+        """受速率限制的异步批量聊天完成"""
+        tasks = [
+            self.achat_completion(messages, temperature, max_tokens)
+            for messages in list_of_messages
+        ]
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+
 # 便捷函数
 def create_llm_client(provider: str = None, api_key: str = None, model: str = None) -> LLMClient:
     """创建LLM客户端的便捷函数"""
@@ -216,8 +844,13 @@ def get_available_providers() -> List[str]:
     return providers
 
 
+@lru_cache(maxsize=1)
 def auto_select_provider() -> str:
-    """自动选择最佳可用的LLM提供商"""
+    """自动选择最佳可用的LLM提供商
+
+    结果按进程缓存：环境变量在进程内基本不变，循环创建解析器时
+    无需反复探测。测试中改了环境后可用cache_clear()刷新。
+    """
     available = get_available_providers()
     
     if not available:
@@ -4,9 +4,48 @@ TaskWeaver AI 统一数据模型
 定义项目中使用的核心数据结构，基于 Pydantic 实现数据验证和类型安全。
 """
 
-from typing import List, Optional
-from datetime import date
-from pydantic import BaseModel, Field, validator
+from typing import Dict, Iterator, List, Optional
+from datetime import date, timedelta
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, field_validator
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class SoAPlan:
+    """列式（Struct-of-Arrays）布局的项目计划视图
+
+    每个字段一条平行数组：对日期、工期做整列算术时走NumPy的向量化
+    路径，比逐个访问Task对象属性快一个量级，内存占用也更紧凑。
+    依赖关系压成CSR两条数组，第i个任务的前置任务下标为
+    dep_indices[dep_indptr[i]:dep_indptr[i+1]]。
+    阶段压成编号数组：sections是按首次出现排序的阶段名列表，
+    section_idx[i]是第i个任务所属阶段在其中的下标，分组统计可以
+    直接np.bincount(section_idx[section_idx >= 0])。
+
+    缺失值约定：start_dates/end_dates 用 NaT，durations 用 -1，
+    section_idx 用 -1（无阶段）。
+    这是只读快照，修改数组不会写回原ProjectPlan。
+    """
+
+    def __init__(self, ids, names, start_dates, end_dates, durations,
+                 milestone_mask, dep_indptr, dep_indices,
+                 sections, section_idx):
+        self.ids = ids
+        self.names = names
+        self.start_dates = start_dates
+        self.end_dates = end_dates
+        self.durations = durations
+        self.milestone_mask = milestone_mask
+        self.dep_indptr = dep_indptr
+        self.dep_indices = dep_indices
+        self.sections = sections
+        self.section_idx = section_idx
+
+    def __len__(self):
+        return len(self.ids)
 
 
 class Task(BaseModel):
@@ -45,35 +84,34 @@ class Task(BaseModel):
     description: Optional[str] = Field(None, description="任务的详细描述")
     assignee: Optional[str] = Field(None, description="任务负责人")
     
-    @validator('duration')
-    def validate_milestone_duration(cls, v, values):
+    @field_validator('duration')
+    @classmethod
+    def validate_milestone_duration(cls, v, info):
         """验证里程碑的持续时间必须为0"""
-        if values.get('is_milestone') and v != 0:
+        if info.data.get('is_milestone') and v != 0:
             raise ValueError('里程碑任务的持续时间必须为0')
         return v
-    
-    @validator('end_date')
-    def validate_date_consistency(cls, v, values):
+
+    @field_validator('end_date')
+    @classmethod
+    def validate_date_consistency(cls, v, info):
         """验证日期的一致性"""
-        start_date = values.get('start_date')
-        duration = values.get('duration')
-        
+        start_date = info.data.get('start_date')
+        duration = info.data.get('duration')
+
         if start_date and duration and v:
             # 简单计算：开始日期 + 持续天数 - 1
             calculated_end = start_date + timedelta(days=duration - 1)
-            
+
             # 只在差异很大时报错，允许小的差异
             if abs((v - calculated_end).days) > 1:
                 # 注释掉严格的验证，让 CoreProcessor 处理复杂的日期计算
                 # raise ValueError(f'结束日期 {v} 与计算结果 {calculated_end} 不一致')
                 pass
-        
+
         return v
-    
-    class Config:
-        """Pydantic 配置"""
-        use_enum_values = True
-        validate_assignment = True
+
+    model_config = ConfigDict(use_enum_values=True, validate_assignment=True)
 
 
 class ProjectPlan(BaseModel):
@@ -103,16 +141,24 @@ class ProjectPlan(BaseModel):
         [0, 1, 2, 3, 4],  # 周一到周五
         description="工作日列表，0=周一，6=周日"
     )
-    
-    @validator('tasks')
+
+    # 查询索引（懒构建，tasks 重新赋值时失效）
+    _task_index: Optional[Dict[str, Task]] = PrivateAttr(default=None)
+    _section_index: Optional[Dict[str, List[Task]]] = PrivateAttr(default=None)
+    _dependents_index: Optional[Dict[str, List[Task]]] = PrivateAttr(default=None)
+    _milestones: Optional[List[Task]] = PrivateAttr(default=None)
+
+    @field_validator('tasks')
+    @classmethod
     def validate_task_ids(cls, v):
         """验证任务ID的唯一性"""
         task_ids = [task.id for task in v]
         if len(task_ids) != len(set(task_ids)):
             raise ValueError('任务ID必须唯一')
         return v
-    
-    @validator('tasks')
+
+    @field_validator('tasks')
+    @classmethod
     def validate_dependencies(cls, v):
         """验证依赖关系的有效性"""
         task_ids = {task.id for task in v}
@@ -137,55 +183,146 @@ class ProjectPlan(BaseModel):
     @property
     def milestone_count(self) -> int:
         """里程碑数量"""
-        return len([task for task in self.tasks if task.is_milestone])
+        return len(self.get_milestones())
     
     @property
     def critical_tasks(self) -> List[Task]:
         """关键任务列表"""
         return [task for task in self.tasks if 'crit' in task.status]
+
+    def to_soa(self) -> SoAPlan:
+        """转换为列式布局视图（需要numpy）
+
+        下游的批量分析（工期算术、里程碑掩码、依赖遍历）可以在
+        返回的平行数组上向量化完成，例如：
+        end = soa.start_dates + soa.durations.astype('timedelta64[D]')
+        """
+        if np is None:
+            raise ImportError("ProjectPlan.to_soa 需要安装 numpy")
+
+        tasks = self.tasks
+        n = len(tasks)
+        ids = [task.id for task in tasks]
+        names = [task.name for task in tasks]
+
+        # None由numpy直接转成NaT/哨兵值，无需逐项分支
+        start_dates = np.array([task.start_date for task in tasks],
+                               dtype='datetime64[D]')
+        end_dates = np.array([task.end_date for task in tasks],
+                             dtype='datetime64[D]')
+        durations = np.fromiter(
+            (task.duration if task.duration is not None else -1
+             for task in tasks),
+            dtype=np.int32, count=n
+        )
+        milestone_mask = np.fromiter(
+            (task.is_milestone for task in tasks), dtype=bool, count=n
+        )
+
+        # 依赖展平为CSR：indptr一次cumsum构建
+        id_to_idx = {task_id: i for i, task_id in enumerate(ids)}
+        dep_counts = np.fromiter(
+            (len(task.dependencies) for task in tasks), dtype=np.int32, count=n
+        )
+        dep_indptr = np.zeros(n + 1, dtype=np.int32)
+        np.cumsum(dep_counts, out=dep_indptr[1:])
+        dep_indices = np.fromiter(
+            (id_to_idx[dep_id] for task in tasks for dep_id in task.dependencies),
+            dtype=np.int32, count=int(dep_indptr[-1])
+        )
+
+        # 阶段名编号化：同一阶段的任务共享一个小整数下标
+        section_to_idx: Dict[str, int] = {}
+        section_idx = np.empty(n, dtype=np.int32)
+        for i, task in enumerate(tasks):
+            if task.section is None:
+                section_idx[i] = -1
+            else:
+                section_idx[i] = section_to_idx.setdefault(
+                    task.section, len(section_to_idx)
+                )
+        sections = list(section_to_idx)
+
+        return SoAPlan(ids, names, start_dates, end_dates, durations,
+                       milestone_mask, dep_indptr, dep_indices,
+                       sections, section_idx)
     
+    def __setattr__(self, name, value):
+        """tasks 重新赋值时让查询索引失效"""
+        super().__setattr__(name, value)
+        if name == 'tasks':
+            self._task_index = None
+            self._section_index = None
+            self._dependents_index = None
+            self._milestones = None
+
+    def _ensure_indexes(self):
+        """一次遍历构建所有查询索引（id、分组、后续任务、里程碑）"""
+        if self._task_index is not None:
+            return
+
+        task_index: Dict[str, Task] = {}
+        section_index: Dict[str, List[Task]] = {}
+        dependents_index: Dict[str, List[Task]] = {}
+        milestones: List[Task] = []
+
+        for task in self.tasks:
+            task_index[task.id] = task
+            if task.section:
+                section_index.setdefault(task.section, []).append(task)
+            for dep_id in task.dependencies:
+                dependents_index.setdefault(dep_id, []).append(task)
+            if task.is_milestone:
+                milestones.append(task)
+
+        self._task_index = task_index
+        self._section_index = section_index
+        self._dependents_index = dependents_index
+        self._milestones = milestones
+
     def get_task_by_id(self, task_id: str) -> Optional[Task]:
         """根据ID获取任务"""
-        for task in self.tasks:
-            if task.id == task_id:
-                return task
-        return None
-    
+        self._ensure_indexes()
+        return self._task_index.get(task_id)
+
     def get_tasks_by_section(self, section: str) -> List[Task]:
         """根据分组获取任务列表"""
-        return [task for task in self.tasks if task.section == section]
-    
+        self._ensure_indexes()
+        return list(self._section_index.get(section, []))
+
     def get_sections(self) -> List[str]:
         """获取所有分组名称"""
-        sections = set()
-        for task in self.tasks:
-            if task.section:
-                sections.add(task.section)
-        return sorted(list(sections))
-    
-    def get_task_dependencies(self, task_id: str) -> List[Task]:
-        """获取指定任务的所有前置任务"""
-        task = self.get_task_by_id(task_id)
+        self._ensure_indexes()
+        return sorted(self._section_index.keys())
+
+    def get_milestones(self) -> List[Task]:
+        """获取所有里程碑任务（按出现顺序）"""
+        self._ensure_indexes()
+        return list(self._milestones)
+
+    def iter_task_dependencies(self, task_id: str) -> Iterator[Task]:
+        """惰性遍历指定任务的所有前置任务"""
+        self._ensure_indexes()
+        task = self._task_index.get(task_id)
         if not task:
-            return []
-        
-        dependencies = []
+            return
+
         for dep_id in task.dependencies:
-            dep_task = self.get_task_by_id(dep_id)
+            dep_task = self._task_index.get(dep_id)
             if dep_task:
-                dependencies.append(dep_task)
-        
-        return dependencies
-    
+                yield dep_task
+
+    def get_task_dependencies(self, task_id: str) -> List[Task]:
+        """获取指定任务的所有前置任务"""
+        return list(self.iter_task_dependencies(task_id))
+
+    def iter_task_dependents(self, task_id: str) -> Iterator[Task]:
+        """惰性遍历依赖指定任务的所有后续任务"""
+        self._ensure_indexes()
+        yield from self._dependents_index.get(task_id, ())
+
     def get_task_dependents(self, task_id: str) -> List[Task]:
         """获取依赖指定任务的所有后续任务"""
-        return [task for task in self.tasks if task_id in task.dependencies]
-    
-    class Config:
-        """Pydantic 配置"""
-        use_enum_values = True
-        validate_assignment = True
-
+        return list(self.iter_task_dependents(task_id))
 
-# 为了在 validator 中使用 timedelta，需要导入
-from datetime import timedelta
+    model_config = ConfigDict(use_enum_values=True, validate_assignment=True)
@@ -4,12 +4,21 @@ TaskWeaver AI 核心处理引擎
 负责处理任务依赖关系、计算日期、验证数据完整性等核心逻辑。
 """
 
-from typing import List, Dict, Set, Optional
+from typing import List, Dict, Set, Optional, Tuple
 from datetime import date, timedelta
 from collections import deque
 
+# numpy为可选加速库：busday_*以C实现日历运算，比逐日循环快得多
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 from .models import Task, ProjectPlan
 
+# 工作日序号的基准日期（关键路径计算在整数空间进行）
+_BD_EPOCH = date(2000, 1, 1)
+
 
 class CoreProcessor:
     """
@@ -31,29 +40,44 @@ class CoreProcessor:
         """
         self.project_plan = project_plan
         self.task_map: Dict[str, Task] = {}
-        self.dependency_graph: Dict[str, Set[str]] = {}
-        self.reverse_dependency_graph: Dict[str, Set[str]] = {}
+        self.reverse_dependency_graph: Dict[str, List[str]] = {}
         self.in_degree: Dict[str, int] = {}
-        
+
+        # 工作日集合：热循环中O(1)成员判断，避免每次线性扫描列表
+        self._working_days_set = frozenset(self.project_plan.working_days)
+
+        # numpy busday_* 使用的工作日掩码（周一..周日）
+        self._weekmask = ''.join(
+            '1' if d in self._working_days_set else '0' for d in range(7)
+        )
+
+        # 拓扑排序结果缓存（图结构不变时可复用）
+        self._topo_cache: Optional[List[str]] = None
+
         # 构建数据结构
         self._build_data_structures()
     
     def _build_data_structures(self):
         """构建内部数据结构"""
-        # 创建任务映射
-        for task in self.project_plan.tasks:
-            self.task_map[task.id] = task
-        
-        # 构建依赖图
+        task_map: Dict[str, Task] = {}
+        reverse_graph: Dict[str, List[str]] = {}
+        in_degree: Dict[str, int] = {}
+
+        # 一次遍历同时构建任务映射、入度和反向依赖图
+        # （每条边只出现一次，列表即可保证无重复，无需set）
         for task in self.project_plan.tasks:
-            self.dependency_graph[task.id] = set(task.dependencies)
-            self.reverse_dependency_graph[task.id] = set()
-            self.in_degree[task.id] = len(task.dependencies)
-        
-        # 构建反向依赖图
-        for task_id, dependencies in self.dependency_graph.items():
-            for dep_id in dependencies:
-                self.reverse_dependency_graph[dep_id].add(task_id)
+            task_map[task.id] = task
+            reverse_graph.setdefault(task.id, [])
+            in_degree[task.id] = len(task.dependencies)
+            for dep_id in task.dependencies:
+                reverse_graph.setdefault(dep_id, []).append(task.id)
+
+        self.task_map = task_map
+        self.reverse_dependency_graph = reverse_graph
+        self.in_degree = in_degree
+
+        # 图结构重建后，缓存的拓扑排序失效
+        self._topo_cache = None
     
     def calculate_dates(self) -> ProjectPlan:
         """
@@ -72,22 +96,30 @@ class CoreProcessor:
         
         # 按拓扑顺序处理任务
         processed_tasks = set()
-        
+
+        # 已处理任务的结束日期缓存，后续任务直接查表而不是逐个访问Task对象
+        end_by_id: Dict[str, date] = {}
+
+        # 热循环中把常用属性提升为局部变量，减少重复属性查找
+        task_map = self.task_map
+        reverse_graph = self.reverse_dependency_graph
+        in_degree = self.in_degree
+
         while queue:
             task_id = queue.popleft()
             if task_id in processed_tasks:
                 continue
-                
-            task = self.task_map[task_id]
+
+            task = task_map[task_id]
             processed_tasks.add(task_id)
-            
+
             # 计算当前任务的日期
-            self._calculate_task_dates(task)
-            
+            self._calculate_task_dates(task, end_by_id)
+
             # 更新后续任务的入度
-            for dependent_id in self.reverse_dependency_graph[task_id]:
-                self.in_degree[dependent_id] -= 1
-                if self.in_degree[dependent_id] == 0:
+            for dependent_id in reverse_graph[task_id]:
+                in_degree[dependent_id] -= 1
+                if in_degree[dependent_id] == 0:
                     queue.append(dependent_id)
         
         # 检查是否有循环依赖
@@ -100,28 +132,31 @@ class CoreProcessor:
         
         return self.project_plan
     
-    def _calculate_task_dates(self, task: Task):
+    def _calculate_task_dates(self, task: Task, end_by_id: Dict[str, date] = None):
         """
         计算单个任务的日期
-        
+
         Args:
             task: 要计算日期的任务
+            end_by_id: 已处理任务的结束日期缓存（拓扑顺序保证前置任务已在表中）
         """
         # 如果是里程碑，确保持续时间为0
         if task.is_milestone:
             task.duration = 0
-        
+
         # 如果有依赖，计算最早开始日期
         if task.dependencies:
-            latest_end_date = None
-            for dep_id in task.dependencies:
-                dep_task = self.task_map[dep_id]
-                if dep_task.end_date:
-                    if latest_end_date is None or dep_task.end_date > latest_end_date:
-                        latest_end_date = dep_task.end_date
-            
-            if latest_end_date:
-                task.start_date = self._add_working_days(latest_end_date, 1)
+            if end_by_id is not None:
+                ends = [end_by_id[d] for d in task.dependencies if d in end_by_id]
+            else:
+                task_map = self.task_map
+                ends = [
+                    task_map[d].end_date for d in task.dependencies
+                    if task_map[d].end_date
+                ]
+
+            if ends:
+                task.start_date = self._add_working_days(max(ends), 1)
         
         # 根据已知信息计算缺失的日期
         if task.start_date and task.duration is not None:
@@ -137,10 +172,14 @@ class CoreProcessor:
         # 如果任务没有明确的开始日期，设置为项目开始日期
         if task.start_date is None:
             task.start_date = self.project_plan.start_date or date.today()
-            
+
             # 重新计算其他日期
             if task.duration is not None:
                 task.end_date = self._add_working_days(task.start_date, task.duration - 1)
+
+        # 记录结束日期，供后续任务查表使用
+        if end_by_id is not None and task.end_date:
+            end_by_id[task.id] = task.end_date
     
     def _calculate_project_dates(self):
         """计算项目的开始和结束日期"""
@@ -168,67 +207,117 @@ class CoreProcessor:
     def _add_working_days(self, start_date: date, days: int) -> date:
         """
         添加工作日
-        
+
         Args:
             start_date: 开始日期
             days: 要添加的工作日数
-            
+
         Returns:
             计算后的日期
         """
-        current_date = start_date
-        remaining_days = days
-        
+        if days <= 0:
+            return start_date
+
+        if np is not None:
+            # roll='backward'：非工作日起点先退回最近的工作日再偏移，
+            # 与逐日循环的语义一致
+            return np.busday_offset(
+                np.datetime64(start_date, 'D'), days,
+                roll='backward', weekmask=self._weekmask
+            ).astype('O')
+
+        # 纯Python回退走序数整数运算：整周部分一次跳过（任意连续7天
+        # 恰好覆盖每个星期几一次），余数最多再逐天走几步，免去逐日
+        # 的timedelta分配和date富比较。weekday(o) == (o + 6) % 7
+        per_week = len(self._working_days_set)
+        if per_week == 0:
+            # 与numpy路径对空weekmask的行为一致
+            raise ValueError("工作日列表为空，无法推进日期")
+
+        # 余数留至少1天逐步走，保证终点落在工作日上
+        #（逐日循环总是停在第days个工作日，整周跳满会落回起点的星期几）
+        weeks, remaining_days = divmod(days, per_week)
+        if remaining_days == 0:
+            weeks -= 1
+            remaining_days = per_week
+        o = start_date.toordinal() + weeks * 7
+        working = self._working_days_set
         while remaining_days > 0:
-            current_date += timedelta(days=1)
-            if current_date.weekday() in self.project_plan.working_days:
+            o += 1
+            if (o + 6) % 7 in working:
                 remaining_days -= 1
-        
-        return current_date
-    
+
+        return date.fromordinal(o)
+
     def _subtract_working_days(self, end_date: date, days: int) -> date:
         """
         减去工作日
-        
+
         Args:
             end_date: 结束日期
             days: 要减去的工作日数
-            
+
         Returns:
             计算后的日期
         """
-        current_date = end_date
-        remaining_days = days
-        
+        if days <= 0:
+            return end_date
+
+        if np is not None:
+            return np.busday_offset(
+                np.datetime64(end_date, 'D'), -days,
+                roll='forward', weekmask=self._weekmask
+            ).astype('O')
+
+        # 与_add_working_days同构的序数整数运算，方向相反
+        per_week = len(self._working_days_set)
+        if per_week == 0:
+            raise ValueError("工作日列表为空，无法推进日期")
+
+        weeks, remaining_days = divmod(days, per_week)
+        if remaining_days == 0:
+            weeks -= 1
+            remaining_days = per_week
+        o = end_date.toordinal() - weeks * 7
+        working = self._working_days_set
         while remaining_days > 0:
-            current_date -= timedelta(days=1)
-            if current_date.weekday() in self.project_plan.working_days:
+            o -= 1
+            if (o + 6) % 7 in working:
                 remaining_days -= 1
-        
-        return current_date
-    
+
+        return date.fromordinal(o)
+
     def _count_working_days(self, start_date: date, end_date: date) -> int:
         """
         计算两个日期之间的工作日数
-        
+
         Args:
             start_date: 开始日期
             end_date: 结束日期
-            
+
         Returns:
             工作日数
         """
         if start_date > end_date:
             return 0
-        
-        current_date = start_date
-        working_days = 0
-        
-        while current_date <= end_date:
-            if current_date.weekday() in self.project_plan.working_days:
+
+        if np is not None:
+            return int(np.busday_count(
+                np.datetime64(start_date, 'D'),
+                np.datetime64(end_date + timedelta(days=1), 'D'),
+                weekmask=self._weekmask
+            ))
+
+        # 整周部分直接乘法，只有不足一周的尾段逐天判断
+        o1 = start_date.toordinal()
+        o2 = end_date.toordinal()
+        weeks, _ = divmod(o2 - o1 + 1, 7)
+        working_days = weeks * len(self._working_days_set)
+        working = self._working_days_set
+        for o in range(o1 + weeks * 7, o2 + 1):
+            if (o + 6) % 7 in working:
                 working_days += 1
-            current_date += timedelta(days=1)
-        
+
         return working_days
     
     def validate_plan(self) -> List[str]:
@@ -238,98 +327,155 @@ class CoreProcessor:
         Returns:
             验证错误列表，如果为空则表示验证通过
         """
+        errors = self._field_errors()
+        if not self.project_plan.tasks:
+            return errors
+
+        # 检查循环依赖 - 仅做图遍历，不触发日期计算
+        cycle = self._detect_cycle()
+        if cycle:
+            errors.append(f"发现循环依赖，涉及任务: {cycle}")
+
+        return errors
+
+    def _field_errors(self) -> List[str]:
+        """逐任务的字段级校验（不含依赖图检查）"""
         errors = []
-        
+
         # 检查是否有任务
         if not self.project_plan.tasks:
             errors.append("项目计划中没有任务")
             return errors
-        
+
         # 检查任务信息的完整性 - 只检查必要信息
         for task in self.project_plan.tasks:
             # 至少需要有开始日期或持续时间其中一个
-            if (task.start_date is None and task.duration is None and 
+            if (task.start_date is None and task.duration is None and
                 not task.dependencies):
                 errors.append(f"任务 '{task.name}' ({task.id}) 缺少基本时间信息")
-            
+
             # 检查日期逻辑（如果两个日期都存在）
-            if (task.start_date and task.end_date and 
+            if (task.start_date and task.end_date and
                 task.start_date > task.end_date):
                 errors.append(f"任务 '{task.name}' ({task.id}) 的开始日期晚于结束日期")
-        
-        # 检查循环依赖 - 使用临时对象避免修改原数据
+
+        return errors
+
+    def validate_and_calculate(self) -> Tuple[List[str], Optional[ProjectPlan]]:
+        """
+        校验并计算日期的融合入口
+
+        先后调用validate_plan和calculate_dates会把依赖图各遍历一遍；
+        这里校验只做字段检查，循环依赖交给日期计算自身的拓扑遍历发现，
+        整体少扫一次图。
+
+        Returns:
+            (验证错误列表, 处理后的项目计划)；发现循环依赖或没有任务时
+            计划为None
+        """
+        errors = self._field_errors()
+        if not self.project_plan.tasks:
+            return errors, None
+
         try:
-            temp_processor = CoreProcessor(self.project_plan)
-            temp_processor.calculate_dates()
+            processed = self.calculate_dates()
         except ValueError as e:
-            if "循环依赖" in str(e):
-                errors.append(str(e))
-        except Exception:
-            # 其他错误不算验证失败，可能是数据不完整但可以修复
-            pass
-        
-        return errors
+            errors.append(str(e))
+            return errors, None
+
+        return errors, processed
+
+    def _detect_cycle(self) -> Optional[Set[str]]:
+        """
+        检测依赖图中的循环
+
+        使用Kahn算法做一次O(N+E)遍历，不修改任务数据。
+
+        Returns:
+            循环涉及的任务ID集合，无循环时返回None
+        """
+        processed = set(self._topological_sort())
+        if len(processed) != len(self.task_map):
+            return set(self.task_map.keys()) - processed
+        return None
     
+    def _bd_index(self, d: date) -> int:
+        """日期转换为相对基准日期的工作日序号"""
+        return self._count_working_days(_BD_EPOCH, d)
+
     def get_critical_path(self) -> List[Task]:
         """
         获取关键路径
-        
+
         关键路径是项目中决定总工期的任务序列。
-        
+
+        日期先一次性转换为整数工作日序号，前向/后向遍历全部在整数空间
+        进行，避免每条依赖边都做一遍逐日的日期运算。
+
         Returns:
             关键路径上的任务列表
         """
-        # 计算每个任务的最早开始时间和最晚开始时间
+        task_map = self.task_map
+        topo_order = self._topological_sort()
+
+        # 一次性把日期映射为工作日序号
+        start_idx = {}
+        end_idx = {}
+        duration = {}
+        for task_id in topo_order:
+            task = task_map[task_id]
+            if task.start_date:
+                start_idx[task_id] = self._bd_index(task.start_date)
+            if task.end_date:
+                end_idx[task_id] = self._bd_index(task.end_date)
+            duration[task_id] = task.duration or 0
+
+        # 计算每个任务的最早开始时间和最晚开始时间（整数空间）
         earliest_start = {}
         latest_start = {}
-        
+
         # 计算最早开始时间
-        for task_id in self._topological_sort():
-            task = self.task_map[task_id]
-            
+        for task_id in topo_order:
+            task = task_map[task_id]
+
             if not task.dependencies:
-                earliest_start[task_id] = task.start_date
+                earliest_start[task_id] = start_idx.get(task_id)
             else:
-                max_dep_end = max(
-                    self.task_map[dep_id].end_date 
-                    for dep_id in task.dependencies
-                )
-                earliest_start[task_id] = self._add_working_days(max_dep_end, 1)
-        
+                earliest_start[task_id] = max(
+                    end_idx[dep_id] for dep_id in task.dependencies
+                ) + 1
+
         # 计算最晚开始时间（从后往前）
-        task_ids_reversed = list(reversed(self._topological_sort()))
-        
-        for task_id in task_ids_reversed:
-            task = self.task_map[task_id]
-            
+        for task_id in reversed(topo_order):
             if not self.reverse_dependency_graph[task_id]:
                 # 没有后续任务，最晚开始时间等于最早开始时间
                 latest_start[task_id] = earliest_start[task_id]
             else:
                 # 最晚开始时间等于后续任务的最晚开始时间减去当前任务的持续时间
                 min_dependent_start = min(
-                    latest_start[dep_id] 
+                    latest_start[dep_id]
                     for dep_id in self.reverse_dependency_graph[task_id]
                 )
-                latest_start[task_id] = self._subtract_working_days(
-                    min_dependent_start, task.duration
-                )
-        
+                latest_start[task_id] = min_dependent_start - duration[task_id]
+
         # 找出时差为0的任务（关键路径上的任务）
         critical_tasks = []
         for task_id in earliest_start:
             if earliest_start[task_id] == latest_start[task_id]:
-                critical_tasks.append(self.task_map[task_id])
-        
+                critical_tasks.append(task_map[task_id])
+
         return critical_tasks
     
     def _topological_sort(self) -> List[str]:
         """
-        拓扑排序
-        
+        拓扑排序（结果缓存在实例上）
+
         Returns:
             拓扑排序后的任务ID列表
         """
+        if self._topo_cache is not None:
+            return self._topo_cache
+
         in_degree_copy = self.in_degree.copy()
         queue = deque([
             task_id for task_id, degree in in_degree_copy.items() 
@@ -345,45 +491,64 @@ class CoreProcessor:
                 in_degree_copy[dependent_id] -= 1
                 if in_degree_copy[dependent_id] == 0:
                     queue.append(dependent_id)
-        
+
+        self._topo_cache = result
         return result
     
+    def _compute_status_counts(self) -> Dict[str, int]:
+        """
+        单次遍历统计任务状态
+
+        一次扫描同时累计done/active/crit/里程碑数量，
+        避免各统计属性分别全量遍历任务列表。
+
+        Returns:
+            各状态的任务数量字典
+        """
+        counts = {'done': 0, 'active': 0, 'crit': 0, 'milestone': 0}
+
+        for task in self.project_plan.tasks:
+            status = frozenset(task.status)
+            if 'done' in status:
+                counts['done'] += 1
+            if 'active' in status:
+                counts['active'] += 1
+            if 'crit' in status:
+                counts['crit'] += 1
+            if task.is_milestone:
+                counts['milestone'] += 1
+
+        return counts
+
     def get_project_statistics(self) -> Dict:
         """
         获取项目统计信息
-        
+
         Returns:
             包含项目统计信息的字典
         """
         total_duration = 0
         if self.project_plan.start_date and self.project_plan.end_date:
             total_duration = self._count_working_days(
-                self.project_plan.start_date, 
+                self.project_plan.start_date,
                 self.project_plan.end_date
             ) + 1
-        
-        completed_tasks = len([
-            task for task in self.project_plan.tasks 
-            if 'done' in task.status
-        ])
-        
-        active_tasks = len([
-            task for task in self.project_plan.tasks 
-            if 'active' in task.status
-        ])
-        
+
+        status_counts = self._compute_status_counts()
+        completed_tasks = status_counts['done']
+
         critical_path = self.get_critical_path()
-        
+
         return {
             'total_tasks': len(self.project_plan.tasks),
             'completed_tasks': completed_tasks,
-            'active_tasks': active_tasks,
-            'milestone_count': self.project_plan.milestone_count,
+            'active_tasks': status_counts['active'],
+            'milestone_count': status_counts['milestone'],
             'total_duration': total_duration,
             'start_date': self.project_plan.start_date,
             'end_date': self.project_plan.end_date,
             'completion_rate': (
-                completed_tasks / len(self.project_plan.tasks) * 100 
+                completed_tasks / len(self.project_plan.tasks) * 100
                 if self.project_plan.tasks else 0
             ),
             'critical_path_length': len(critical_path),
@@ -2,9 +2,20 @@
 TaskWeaver AI 生成器模块
 
 包含各种输出格式的生成器。
-"""
 
-from .excel_generator import ExcelGanttGenerator, create_gantt_from_data
-from .html_generator import HTMLGanttGenerator
+生成器按需导入（PEP 562）：只用HTML输出的调用方不必加载openpyxl，
+只用核心规划功能的调用方两者都不必加载。
+"""
 
 __all__ = ['ExcelGanttGenerator', 'HTMLGanttGenerator', 'create_gantt_from_data']
+
+
+def __getattr__(name):
+    """懒加载生成器，首次访问时才导入对应模块"""
+    if name in ('ExcelGanttGenerator', 'create_gantt_from_data'):
+        from . import excel_generator
+        return getattr(excel_generator, name)
+    if name == 'HTMLGanttGenerator':
+        from .html_generator import HTMLGanttGenerator
+        return HTMLGanttGenerator
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
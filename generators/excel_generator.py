@@ -7,15 +7,71 @@ TaskWeaver AI Excel 甘特图生成器
 """
 
 import re
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill, Alignment, Border, NamedStyle, Side
 from openpyxl.utils import get_column_letter
 from openpyxl.chart import BarChart, Reference, Series
 from openpyxl.chart.axis import DateAxis
 from openpyxl.chart.shapes import GraphicalProperties
 from openpyxl.drawing.line import LineProperties
 
+# ISO日期（YYYY-MM-DD）匹配，模块级编译一次
+_ISO_DATE_RE = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+
+def _argb(rgb):
+    """6位RGB补上FF不透明alpha；openpyxl默认补00，部分读取器当成透明色"""
+    return rgb if len(rgb) == 8 else "FF" + rgb
+
+
+# 样式对象驻留：同参数只构造一个实例，省掉重复分配和openpyxl
+# 保存时的样式哈希去重开销（样式对象不可变，共享是安全的）
+@lru_cache(maxsize=None)
+def _font(**kwargs):
+    """按参数驻留的Font实例，颜色统一为不透明ARGB"""
+    if kwargs.get('color'):
+        kwargs['color'] = _argb(kwargs['color'])
+    return Font(**kwargs)
+
+
+@lru_cache(maxsize=None)
+def _fill(color):
+    """按颜色驻留的纯色PatternFill实例，颜色统一为不透明ARGB"""
+    color = _argb(color)
+    return PatternFill(start_color=color, end_color=color, fill_type="solid")
+
+
+@lru_cache(maxsize=None)
+def _align(horizontal="center", vertical="center"):
+    """按参数驻留的Alignment实例"""
+    return Alignment(horizontal=horizontal, vertical=vertical)
+
+
+_CENTER_ALIGNMENT = _align()
+
+_BAR_STYLES = {
+    'milestone': (_fill("FF0000"), _font(bold=True, color="FFFFFF", size=9)),
+    'done': (_fill("00B050"), _font(bold=True, color="FFFFFF", size=9)),
+    'active': (_fill("0070C0"), _font(bold=True, color="FFFFFF", size=9)),
+    'crit': (_fill("FFC000"), _font(bold=True, color="000000", size=9)),
+    'default': (_fill("A5A5A5"), _font(bold=True, color="FFFFFF", size=9)),
+}
+
+# 星期缩写查表：weekday() -> 缩写，省去每天一次strftime的格式解析
+_WEEKDAY_ABBR = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+_TIMELINE_DATE_FONT = _font(bold=True, color="FFFFFF")
+_TIMELINE_DATE_FILL = _fill("366092")
+_TIMELINE_WEEKDAY_FILL = _fill("4F81BD")
+
 
 class ExcelGanttGenerator:
     """
@@ -26,22 +82,26 @@ class ExcelGanttGenerator:
     - table: 使用单元格填充创建时间线
     """
     
-    def __init__(self, parsed_data, mode="chart"):
+    def __init__(self, parsed_data, mode="chart", streaming=False):
         """
         初始化生成器
-        
+
         Args:
             parsed_data: 解析后的项目数据
             mode: 生成模式 - "chart" 或 "table"
+            streaming: 图表模式下使用openpyxl只写模式流式写入，
+                      大任务列表时显著降低内存占用（仅支持chart模式）
         """
         self.parsed_data = parsed_data
         self.mode = mode
+        self.streaming = streaming
         self.date_format_str = self._get_date_format()
+        # 图表模式只读任务数据，默认共享调用方的字典引用；
+        # 表格模式的任务副本和日期预计算在首次用到时构建并跨调用复用
         self.tasks = parsed_data['tasks']
-        self.wb = Workbook()
-        self.ws = self.wb.active
-        self.ws.title = parsed_data.get('title', "甘特图")
+        self._table_tasks = None
         self.task_id_to_row = {}
+        self._reset_workbook()
 
     def _get_date_format(self):
         """获取日期格式"""
@@ -50,50 +110,235 @@ class ExcelGanttGenerator:
             return date_format.replace('YYYY', '%Y').replace('MM', '%m').replace('DD', '%d')
         return '%Y-%m-%d'
 
-    def generate_excel(self, filename=None):
+    def _reset_workbook(self, write_only=False):
+        """准备一个全新的工作簿，同一实例可先后输出多个文件"""
+        title = self.parsed_data.get('title', "甘特图")
+        if write_only:
+            self.wb = Workbook(write_only=True)
+            self.ws = self.wb.create_sheet(title=title)
+        else:
+            self.wb = Workbook()
+            self.ws = self.wb.active
+            self.ws.title = title
+
+    def _ensure_table_tasks(self):
+        """表格模式的共享预计算，只做一次
+
+        表格模式会把派生字段（start_date/end_date）写回任务字典，
+        浅拷贝一份，避免污染调用方与其他生成器共享的同一批字典；
+        同一实例再次生成表格时直接复用副本和已算好的日期范围。
+        """
+        if self._table_tasks is None:
+            self._table_tasks = [dict(task) for task in self.parsed_data['tasks']]
+            self.tasks = self._table_tasks
+            self._calculate_dates()
+        else:
+            self.tasks = self._table_tasks
+
+    def generate_excel(self, filename=None, mode=None, compression_level=1):
         """
         生成Excel甘特图
-        
+
         Args:
             filename: 输出文件名，如果为None则自动生成
+            mode: 本次输出的模式，默认用构造时的模式。同一实例可以
+                  先后生成chart和table两个工作簿，表格模式的任务副本
+                  和日期预计算在两次调用之间复用
+            compression_level: 输出ZIP的压缩级别（1-9）。
+                              默认1：对结构化XML压缩率接近默认级别6，
+                              但CPU耗时约为其1/3；需要更小文件时传6
         """
+        if mode is None:
+            mode = self.mode
         if filename is None:
-            filename = f"gantt_{self.mode}.xlsx"
-        
-        if self.mode == "table":
+            filename = f"gantt_{mode}.xlsx"
+        self._compression_level = compression_level
+
+        streaming = self.streaming and mode == "chart"
+        self.task_id_to_row = {}
+        if mode == "table":
+            self._ensure_table_tasks()
+        else:
+            self.tasks = self.parsed_data['tasks']
+        if mode != "chart_fast":
+            self._reset_workbook(write_only=streaming)
+
+        if mode == "table":
             self._generate_table_gantt(filename)
+        elif mode == "chart_fast":
+            self._generate_chart_gantt_fast(filename)
+        elif streaming:
+            self._generate_chart_gantt_streaming(filename)
         else:
             self._generate_chart_gantt(filename)
-    
+
     def _generate_chart_gantt(self, filename):
         """生成图表模式的甘特图"""
         self._setup_chart_headers()
         self._populate_chart_data()
         self._create_gantt_chart()
         self._auto_size_columns()
-        self.wb.save(filename)
+        self._save_workbook(filename)
         print(f"Excel 甘特图已生成: {filename}")
-    
+
+    def _generate_chart_gantt_streaming(self, filename):
+        """以只写模式流式生成图表甘特图（按行顺序写出，不在内存中保留单元格树）"""
+        ws = self.ws
+
+        # 只写模式不支持随机访问，行号必须在写出前确定
+        for i, task in enumerate(self.tasks):
+            self.task_id_to_row[task['id']] = i + 2
+
+        # 表头
+        headers = ["任务名称", "ID", "状态", "开始日期", "结束日期", "持续天数", "依赖"]
+        header_font = _font(bold=True, color="FFFFFF")
+        header_fill = _fill("4F81BD")
+        header_alignment = _CENTER_ALIGNMENT
+
+        header_row = []
+        for header in headers:
+            cell = WriteOnlyCell(ws, value=header)
+            cell.font = header_font
+            cell.fill = header_fill
+            cell.alignment = header_alignment
+            header_row.append(cell)
+        ws.append(header_row)
+
+        # 数据行
+        milestone_font = _font(bold=True, color="FF0000")
+        current_row = 2
+        for task in self.tasks:
+            is_milestone = task.get('is_milestone')
+
+            # 开始日期
+            if task.get('dependency_id'):
+                dep_row = self.task_id_to_row.get(task['dependency_id'])
+                start_val = f'=E{dep_row}+1' if dep_row else "ERROR: Dep not found"
+                start_fmt = None
+            elif task.get('start_date_obj'):
+                start_val = task['start_date_obj'].strftime('%Y-%m-%d')
+                start_fmt = 'YYYY-MM-DD'
+            else:
+                start_val, start_fmt = None, None
+
+            # 持续天数
+            if is_milestone:
+                duration_val = 0
+            elif task.get('duration_val') is not None:
+                duration_val = task['duration_val']
+            else:
+                duration_val = f'=E{current_row}-D{current_row}+1'
+
+            # 结束日期
+            if is_milestone:
+                end_val, end_fmt = f'=D{current_row}', None
+            elif task.get('end_date_obj'):
+                end_val = task['end_date_obj'].strftime('%Y-%m-%d')
+                end_fmt = 'YYYY-MM-DD'
+            else:
+                end_val, end_fmt = f'=D{current_row}+F{current_row}-1', None
+
+            values = [
+                task['name'], task['id'], ", ".join(task.get('status', [])),
+                start_val, end_val, duration_val, task.get('dependency_id', "")
+            ]
+            row = [WriteOnlyCell(ws, value=v) for v in values]
+            if start_fmt:
+                row[3].number_format = start_fmt
+            if end_fmt:
+                row[4].number_format = end_fmt
+            if is_milestone:
+                for col in (0, 3, 4):
+                    row[col].font = milestone_font
+
+            ws.append(row)
+            current_row += 1
+
+        self.data_end_row = current_row - 1
+        self._create_gantt_chart()
+        self._save_workbook(filename)
+        print(f"Excel 甘特图已生成: {filename}")
+
+    def _generate_chart_gantt_fast(self, filename):
+        """直接写XML生成数据版甘特表（fast_writer，无样式、无图表）
+
+        数据列与图表模式完全一致，适合数万行以上只要数据的场景；
+        需要Excel图表时请用 mode="chart"。
+        """
+        from .fast_writer import write_xlsx
+
+        # 行号先定，公式里的依赖引用才能指向任意方向
+        for i, task in enumerate(self.tasks):
+            self.task_id_to_row[task['id']] = i + 2
+
+        def rows():
+            yield ["任务名称", "ID", "状态", "开始日期", "结束日期", "持续天数", "依赖"]
+            current_row = 2
+            for task in self.tasks:
+                is_milestone = task.get('is_milestone')
+
+                if task.get('dependency_id'):
+                    dep_row = self.task_id_to_row.get(task['dependency_id'])
+                    start_val = f'=E{dep_row}+1' if dep_row else "ERROR: Dep not found"
+                elif task.get('start_date_obj'):
+                    start_val = task['start_date_obj'].strftime('%Y-%m-%d')
+                else:
+                    start_val = None
+
+                if is_milestone:
+                    duration_val = 0
+                elif task.get('duration_val') is not None:
+                    duration_val = task['duration_val']
+                else:
+                    duration_val = f'=E{current_row}-D{current_row}+1'
+
+                if is_milestone:
+                    end_val = f'=D{current_row}'
+                elif task.get('end_date_obj'):
+                    end_val = task['end_date_obj'].strftime('%Y-%m-%d')
+                else:
+                    end_val = f'=D{current_row}+F{current_row}-1'
+
+                yield [
+                    task['name'], task['id'], ", ".join(task.get('status', [])),
+                    start_val, end_val, duration_val, task.get('dependency_id', "")
+                ]
+                current_row += 1
+
+        self.data_end_row = len(self.tasks) + 1
+        write_xlsx(filename, rows(), sheet_name=self.parsed_data.get('title', "甘特图"))
+        print(f"Excel 甘特图已生成: {filename}")
+
     def _generate_table_gantt(self, filename):
-        """生成表格模式的甘特图"""
+        """生成表格模式的甘特图（日期已在_ensure_table_tasks中算好）"""
         self._setup_table_headers()
-        self._calculate_dates()
         self._populate_task_data()
         self._create_timeline_header()
         self._fill_gantt_bars()
         self._format_table()
-        self.wb.save(filename)
+        self._save_workbook(filename)
         print(f"表格甘特图已生成: {filename}")
 
+    def _save_workbook(self, filename):
+        """保存工作簿，压缩级别可控（openpyxl自带的save固定用zlib默认级别6）"""
+        from datetime import timezone
+        from zipfile import ZipFile, ZIP_DEFLATED
+        from openpyxl.writer.excel import ExcelWriter
+
+        archive = ZipFile(filename, 'w', ZIP_DEFLATED, allowZip64=True,
+                          compresslevel=getattr(self, '_compression_level', 1))
+        self.wb.properties.modified = datetime.now(tz=timezone.utc).replace(tzinfo=None)
+        ExcelWriter(self.wb, archive).save()
+
     # ======================== 图表模式方法 ========================
     
     def _setup_chart_headers(self):
         """设置图表模式的表头"""
         headers = ["任务名称", "ID", "状态", "开始日期", "结束日期", "持续天数", "依赖"]
         self.ws.append(headers)
-        header_font = Font(bold=True, color="FFFFFF")
-        header_fill = PatternFill(start_color="4F81BD", end_color="4F81BD", fill_type="solid")
-        header_alignment = Alignment(horizontal="center", vertical="center")
+        header_font = _font(bold=True, color="FFFFFF")
+        header_fill = _fill("4F81BD")
+        header_alignment = _CENTER_ALIGNMENT
         for col_idx in range(1, len(headers) + 1):
             cell = self.ws.cell(row=1, column=col_idx)
             cell.font = header_font
@@ -101,46 +346,53 @@ class ExcelGanttGenerator:
             cell.alignment = header_alignment
 
     def _populate_chart_data(self):
-        """填充图表模式的数据"""
+        """填充图表模式的数据（整行append写入，逐行只回填格式）"""
+        milestone_font = _font(bold=True, color="FF0000")
         current_row = 2
         for task in self.tasks:
             self.task_id_to_row[task['id']] = current_row
-            self.ws.cell(row=current_row, column=1, value=task['name'])
-            self.ws.cell(row=current_row, column=2, value=task['id'])
-            self.ws.cell(row=current_row, column=3, value=", ".join(task.get('status', [])))
-            self.ws.cell(row=current_row, column=7, value=task.get('dependency_id', ""))
+            is_milestone = task.get('is_milestone')
 
-            start_cell = self.ws.cell(row=current_row, column=4)
+            # 开始日期
+            start_fmt = None
             if task.get('dependency_id'):
                 dep_row = self.task_id_to_row.get(task['dependency_id'])
-                if dep_row:
-                    start_cell.value = f'=E{dep_row}+1'
-                else:
-                    start_cell.value = "ERROR: Dep not found"
+                start_val = f'=E{dep_row}+1' if dep_row else "ERROR: Dep not found"
             elif task.get('start_date_obj'):
-                start_cell.value = task['start_date_obj'].strftime('%Y-%m-%d')
-                start_cell.number_format = 'YYYY-MM-DD'
+                start_val = task['start_date_obj'].strftime('%Y-%m-%d')
+                start_fmt = 'YYYY-MM-DD'
+            else:
+                start_val = None
 
-            duration_cell = self.ws.cell(row=current_row, column=6)
-            if task.get('is_milestone'):
-                duration_cell.value = 0
+            # 持续天数
+            if is_milestone:
+                duration_val = 0
             elif task.get('duration_val') is not None:
-                duration_cell.value = task['duration_val']
+                duration_val = task['duration_val']
             else:
-                duration_cell.value = f'=E{current_row}-D{current_row}+1'
+                duration_val = f'=E{current_row}-D{current_row}+1'
 
-            end_cell = self.ws.cell(row=current_row, column=5)
-            if task.get('is_milestone'):
-                end_cell.value = f'=D{current_row}'
+            # 结束日期
+            end_fmt = None
+            if is_milestone:
+                end_val = f'=D{current_row}'
             elif task.get('end_date_obj'):
-                end_cell.value = task['end_date_obj'].strftime('%Y-%m-%d')
-                end_cell.number_format = 'YYYY-MM-DD'
+                end_val = task['end_date_obj'].strftime('%Y-%m-%d')
+                end_fmt = 'YYYY-MM-DD'
             else:
-                end_cell.value = f'=D{current_row}+F{current_row}-1'
-
-            if task.get('is_milestone'):
-                milestone_font = Font(bold=True, color="FF0000")
-                for col in [1, 4, 5]:
+                end_val = f'=D{current_row}+F{current_row}-1'
+
+            self.ws.append([
+                task['name'], task['id'], ", ".join(task.get('status', [])),
+                start_val, end_val, duration_val, task.get('dependency_id', "")
+            ])
+
+            if start_fmt:
+                self.ws.cell(row=current_row, column=4).number_format = start_fmt
+            if end_fmt:
+                self.ws.cell(row=current_row, column=5).number_format = end_fmt
+            if is_milestone:
+                for col in (1, 4, 5):
                     self.ws.cell(row=current_row, column=col).font = milestone_font
             current_row += 1
         self.data_end_row = current_row - 1
@@ -189,67 +441,105 @@ class ExcelGanttGenerator:
         headers = ["任务名称", "负责人", "开始日期", "结束日期", "状态", "进度"]
         for col, header in enumerate(headers, 1):
             cell = self.ws.cell(row=1, column=col, value=header)
-            cell.font = Font(bold=True, color="FFFFFF")
-            cell.fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-            cell.alignment = Alignment(horizontal="center", vertical="center")
+            cell.font = _TIMELINE_DATE_FONT
+            cell.fill = _TIMELINE_DATE_FILL
+            cell.alignment = _CENTER_ALIGNMENT
 
     def _calculate_dates(self):
         """计算表格模式的任务日期"""
-        # 预处理任务，计算开始和结束日期
-        for task in self.tasks:
+        tasks = self.tasks
+        for task in tasks:
             task['start_date'] = None
             task['end_date'] = None
-            
-            # 如果没有依赖，尝试解析开始日期
-            if not task.get('dependency_id') and task.get('start_raw'):
-                try:
-                    if re.match(r'^\d{4}-\d{2}-\d{2}$', task['start_raw']):
-                        task['start_date'] = datetime.strptime(task['start_raw'], self.date_format_str).date()
-                except ValueError:
-                    pass
 
-            # 计算结束日期和持续时间
-            if task.get('end_raw'):
-                if task['end_raw'].endswith('d'):
+        # 解析ISO日期：numpy可用时整列一次转datetime64，省掉逐任务strptime
+        fast_iso = self.date_format_str == '%Y-%m-%d'
+        bulk_parsed = False
+        if np is not None and fast_iso and tasks:
+            start_strs = [
+                t['start_raw'] if (not t.get('dependency_id') and t.get('start_raw')
+                                   and _ISO_DATE_RE.match(t['start_raw'])) else 'NaT'
+                for t in tasks
+            ]
+            end_strs = [
+                t['end_raw'] if (t.get('end_raw') and not t['end_raw'].endswith('d')
+                                 and _ISO_DATE_RE.match(t['end_raw'])) else 'NaT'
+                for t in tasks
+            ]
+            try:
+                start_objs = np.array(start_strs, dtype='datetime64[D]').astype('O')
+                end_objs = np.array(end_strs, dtype='datetime64[D]').astype('O')
+            except ValueError:
+                # 形如 2024-13-99 的非法日期会让整列解析失败，退回逐任务路径
+                pass
+            else:
+                for task, start_obj, end_obj in zip(tasks, start_objs, end_objs):
+                    if start_obj is not None:
+                        task['start_date'] = start_obj
+                    if end_obj is not None:
+                        task['end_date'] = end_obj
+                bulk_parsed = True
+
+        if not bulk_parsed:
+            # ISO格式走C实现的fromisoformat，非ISO格式才进strptime的格式状态机
+            if fast_iso:
+                parse = date.fromisoformat
+            else:
+                parse = lambda s: datetime.strptime(s, self.date_format_str).date()
+
+            for task in tasks:
+                # 如果没有依赖，尝试解析开始日期
+                if not task.get('dependency_id') and task.get('start_raw'):
                     try:
-                        duration = int(task['end_raw'][:-1])
-                        if task['start_date']:
-                            task['end_date'] = task['start_date'] + timedelta(days=duration-1)
+                        if _ISO_DATE_RE.match(task['start_raw']):
+                            task['start_date'] = parse(task['start_raw'])
                     except ValueError:
                         pass
-                else:
+
+                if task.get('end_raw') and not task['end_raw'].endswith('d'):
                     try:
-                        if re.match(r'^\d{4}-\d{2}-\d{2}$', task['end_raw']):
-                            task['end_date'] = datetime.strptime(task['end_raw'], self.date_format_str).date()
+                        if _ISO_DATE_RE.match(task['end_raw']):
+                            task['end_date'] = parse(task['end_raw'])
                     except ValueError:
                         pass
 
-            # 里程碑处理
+        # 持续天数（'Nd'格式）与里程碑处理
+        for task in tasks:
+            end_raw = task.get('end_raw')
+            if end_raw and end_raw.endswith('d') and task['start_date']:
+                try:
+                    duration = int(end_raw[:-1])
+                    task['end_date'] = task['start_date'] + timedelta(days=duration-1)
+                except ValueError:
+                    pass
+
             if task.get('is_milestone') and task['start_date']:
                 task['end_date'] = task['start_date']
 
-        # 处理依赖关系
-        max_iterations = 10
-        for iteration in range(max_iterations):
-            changed = False
-            for task in self.tasks:
-                if task.get('dependency_id'):
-                    dep_task = next((t for t in self.tasks if t['id'] == task['dependency_id']), None)
-                    if dep_task and dep_task['end_date']:
-                        new_start_date = dep_task['end_date'] + timedelta(days=1)
-                        if task['start_date'] != new_start_date:
-                            task['start_date'] = new_start_date
-                            changed = True
-                            
-                            # 重新计算结束日期
-                            if task.get('end_raw') and task['end_raw'].endswith('d'):
-                                try:
-                                    duration = int(task['end_raw'][:-1])
-                                    task['end_date'] = task['start_date'] + timedelta(days=duration-1)
-                                except ValueError:
-                                    pass
-            if not changed:
-                break
+        # 处理依赖关系 - 按依赖方向做一次拓扑传播，每个任务只计算一次
+        from collections import deque
+
+        children = {}
+        for task in self.tasks:
+            dep_id = task.get('dependency_id')
+            if dep_id:
+                children.setdefault(dep_id, []).append(task)
+
+        queue = deque(t for t in self.tasks if not t.get('dependency_id'))
+        while queue:
+            task = queue.popleft()
+            for child in children.get(task['id'], ()):
+                if task['end_date']:
+                    child['start_date'] = task['end_date'] + timedelta(days=1)
+
+                    # 重新计算结束日期
+                    if child.get('end_raw') and child['end_raw'].endswith('d'):
+                        try:
+                            duration = int(child['end_raw'][:-1])
+                            child['end_date'] = child['start_date'] + timedelta(days=duration-1)
+                        except ValueError:
+                            pass
+                queue.append(child)
 
         # 计算项目总时间范围
         all_dates = []
@@ -271,15 +561,12 @@ class ExcelGanttGenerator:
             self.max_date = self.min_date + timedelta(days=60)
 
     def _populate_task_data(self):
-        """填充表格模式的任务基本信息"""
+        """填充表格模式的任务基本信息（整行append写入）"""
         current_row = 2
-        
+
         for task in self.tasks:
             self.task_id_to_row[task['id']] = current_row
-            
-            # 任务名称
-            self.ws.cell(row=current_row, column=1, value=task['name'])
-            
+
             # 负责人（基于状态）
             owner = ""
             status = task.get('status', [])
@@ -289,20 +576,7 @@ class ExcelGanttGenerator:
                 owner = "进行中"
             elif 'done' in status:
                 owner = "已完成"
-            self.ws.cell(row=current_row, column=2, value=owner)
-            
-            # 开始日期
-            if task.get('start_date'):
-                self.ws.cell(row=current_row, column=3, value=task['start_date'])
-            
-            # 结束日期
-            if task.get('end_date'):
-                self.ws.cell(row=current_row, column=4, value=task['end_date'])
-            
-            # 状态
-            status_text = ", ".join(status) if status else "待开始"
-            self.ws.cell(row=current_row, column=5, value=status_text)
-            
+
             # 进度
             progress = "0%"
             if 'done' in status:
@@ -311,8 +585,15 @@ class ExcelGanttGenerator:
                 progress = "50%"
             elif task.get('is_milestone'):
                 progress = "里程碑"
-            self.ws.cell(row=current_row, column=6, value=progress)
-            
+
+            self.ws.append([
+                task['name'],
+                owner,
+                task.get('start_date'),
+                task.get('end_date'),
+                ", ".join(status) if status else "待开始",
+                progress,
+            ])
             current_row += 1
 
     def _create_timeline_header(self):
@@ -326,15 +607,15 @@ class ExcelGanttGenerator:
         while current_date <= self.max_date:
             # 设置日期表头
             date_cell = self.ws.cell(row=1, column=date_col, value=current_date)
-            date_cell.font = Font(bold=True, color="FFFFFF")
-            date_cell.fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-            date_cell.alignment = Alignment(horizontal="center", vertical="center")
-            
+            date_cell.font = _TIMELINE_DATE_FONT
+            date_cell.fill = _TIMELINE_DATE_FILL
+            date_cell.alignment = _CENTER_ALIGNMENT
+
             # 设置星期几
-            weekday_cell = self.ws.cell(row=2, column=date_col, value=current_date.strftime("%a"))
-            weekday_cell.font = Font(bold=True, color="FFFFFF")
-            weekday_cell.fill = PatternFill(start_color="4F81BD", end_color="4F81BD", fill_type="solid")
-            weekday_cell.alignment = Alignment(horizontal="center", vertical="center")
+            weekday_cell = self.ws.cell(row=2, column=date_col, value=_WEEKDAY_ABBR[current_date.weekday()])
+            weekday_cell.font = _TIMELINE_DATE_FONT
+            weekday_cell.fill = _TIMELINE_WEEKDAY_FILL
+            weekday_cell.alignment = _CENTER_ALIGNMENT
             
             current_date += timedelta(days=1)
             date_col += 1
@@ -342,48 +623,56 @@ class ExcelGanttGenerator:
         self.timeline_start_col = timeline_start_col
         self.timeline_end_col = date_col - 1
 
+    def _register_bar_styles(self):
+        """把条形样式注册为命名样式：单元格赋值变成一次样式表索引写入，
+        而不是fill/font/alignment三次StyleArray写"""
+        style_names = {}
+        existing = set(self.wb.named_styles)
+        for key, (bar_fill, bar_font) in _BAR_STYLES.items():
+            name = f"gantt_bar_{key}"
+            if name not in existing:
+                self.wb.add_named_style(NamedStyle(
+                    name=name, font=bar_font, fill=bar_fill, alignment=_CENTER_ALIGNMENT
+                ))
+            style_names[key] = name
+        return style_names
+
     def _fill_gantt_bars(self):
         """填充甘特图条形"""
+        style_names = self._register_bar_styles()
+
         for task in self.tasks:
             row = self.task_id_to_row[task['id']]
-            
+
             if not task.get('start_date') or not task.get('end_date'):
                 continue
-            
+
             # 计算对应的列
             start_col = self.timeline_start_col + (task['start_date'] - self.min_date).days
             end_col = self.timeline_start_col + (task['end_date'] - self.min_date).days
-            
-            # 选择颜色
+
+            # 选择颜色：红色里程碑 / 绿色已完成 / 蓝色进行中 / 黄色关键任务 / 灰色待开始
             status = task.get('status', [])
             if task.get('is_milestone'):
-                fill_color = "FF0000"  # 红色里程碑
-                font_color = "FFFFFF"
+                style_name = style_names['milestone']
             elif 'done' in status:
-                fill_color = "00B050"  # 绿色已完成
-                font_color = "FFFFFF"
+                style_name = style_names['done']
             elif 'active' in status:
-                fill_color = "0070C0"  # 蓝色进行中
-                font_color = "FFFFFF"
+                style_name = style_names['active']
             elif 'crit' in status:
-                fill_color = "FFC000"  # 黄色关键任务
-                font_color = "000000"
+                style_name = style_names['crit']
             else:
-                fill_color = "A5A5A5"  # 灰色待开始
-                font_color = "FFFFFF"
-            
-            # 填充甘特图条形
-            for col in range(start_col, end_col + 1):
-                if col <= self.timeline_end_col:
-                    cell = self.ws.cell(row=row, column=col)
-                    cell.fill = PatternFill(start_color=fill_color, end_color=fill_color, fill_type="solid")
-                    cell.alignment = Alignment(horizontal="center", vertical="center")
-                    
-                    # 在第一天显示任务名称
-                    if col == start_col:
-                        task_name = task['name']
-                        cell.value = task_name[:8] + "..." if len(task_name) > 8 else task_name
-                        cell.font = Font(bold=True, color=font_color, size=9)
+                style_name = style_names['default']
+
+            # 填充甘特图条形：每格只写一次命名样式，文字只写在第一天
+            for col in range(start_col, min(end_col, self.timeline_end_col) + 1):
+                cell = self.ws.cell(row=row, column=col)
+                cell.style = style_name
+
+                # 在第一天显示任务名称
+                if col == start_col:
+                    task_name = task['name']
+                    cell.value = task_name[:8] + "..." if len(task_name) > 8 else task_name
 
     def _format_table(self):
         """格式化表格"""
@@ -399,33 +688,38 @@ class ExcelGanttGenerator:
         for col in range(self.timeline_start_col, self.timeline_end_col + 1):
             self.ws.column_dimensions[get_column_letter(col)].width = 3
         
-        # 添加边框
-        thin_border = Border(
-            left=Side(style='thin'), right=Side(style='thin'),
-            top=Side(style='thin'), bottom=Side(style='thin')
-        )
-        
-        # 为数据区域添加边框
-        for row in range(1, len(self.tasks) + 3):  # 包括表头和星期行
-            for col in range(1, self.timeline_end_col + 1):
-                self.ws.cell(row=row, column=col).border = thin_border
+        # 添加边框：只描外框和表头下划线。
+        # 整块矩形逐格写边框是 行×列 次样式拷贝，视觉上需要的只有一圈
+        thin = Side(style='thin')
+        header_row = 2  # 日期行+星期行之后是数据
+        bottom_row = len(self.tasks) + 2
+        right_col = self.timeline_end_col
+
+        def _edge_border(row, col):
+            return Border(
+                top=thin if row == 1 else None,
+                bottom=thin if row in (header_row, bottom_row) else None,
+                left=thin if col == 1 else None,
+                right=thin if col == right_col else None,
+            )
+
+        for col in range(1, right_col + 1):
+            for row in (1, header_row, bottom_row):
+                self.ws.cell(row=row, column=col).border = _edge_border(row, col)
+        for row in range(header_row + 1, bottom_row):
+            self.ws.cell(row=row, column=1).border = _edge_border(row, 1)
+            self.ws.cell(row=row, column=right_col).border = _edge_border(row, right_col)
 
     # ======================== 通用方法 ========================
     
     def _auto_size_columns(self):
-        """自动调整列宽"""
+        """自动调整列宽：每列一次max折叠，比较循环留在C层"""
         for col in self.ws.columns:
-            max_length = 0
-            column = col[0].column_letter
-            for cell in col:
-                try:
-                    cell_len = len(str(cell.value))
-                    if cell_len > max_length:
-                        max_length = cell_len
-                except:
-                    pass
-            adjusted_width = (max_length + 2) * 1.2
-            self.ws.column_dimensions[column].width = adjusted_width
+            max_length = max(
+                (len(str(cell.value)) for cell in col if cell.value is not None),
+                default=0,
+            )
+            self.ws.column_dimensions[col[0].column_letter].width = (max_length + 2) * 1.2
 
 
 def create_gantt_from_data(tasks_data, title="项目甘特图", filename=None, mode="all"):
@@ -457,7 +751,7 @@ def create_gantt_from_data(tasks_data, title="项目甘特图", filename=None, m
             processed_task['dependency_id'] = start_info.split(' ')[1]
         elif isinstance(start_info, str):
             try:
-                processed_task['start_date_obj'] = datetime.strptime(start_info, '%Y-%m-%d').date()
+                processed_task['start_date_obj'] = date.fromisoformat(start_info)
             except ValueError:
                 print(f"Warning: Invalid date format for task '{task['name']}'. Expected 'YYYY-MM-DD'.")
         
@@ -492,29 +786,37 @@ def create_gantt_from_data(tasks_data, title="项目甘特图", filename=None, m
         os.makedirs(project_folder, exist_ok=True)
         
         print(f"📁 创建项目文件夹: {project_folder}")
-        
-        # 1. Excel图表甘特图
+
+        # 1+2. 图表甘特图和表格甘特图相互独立，并行生成；
+        # 表格生成器持有自己的任务字典副本，openpyxl保存时的zip压缩会释放GIL
+        from concurrent.futures import ThreadPoolExecutor
+
         chart_path = f"{project_folder}/{base_name}_chart.xlsx"
-        chart_generator = ExcelGanttGenerator(gantt_data, mode="chart")
-        chart_generator.generate_excel(chart_path)
-        print(f"Excel图表甘特图已生成: {chart_path}")
-        
-        # 2. Excel表格甘特图
         table_path = f"{project_folder}/{base_name}_table.xlsx"
+        chart_generator = ExcelGanttGenerator(gantt_data, mode="chart")
         table_generator = ExcelGanttGenerator(gantt_data, mode="table")
-        table_generator.generate_excel(table_path)
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            chart_future = pool.submit(chart_generator.generate_excel, chart_path)
+            table_future = pool.submit(table_generator.generate_excel, table_path)
+            chart_future.result()
+            table_future.result()
+        print(f"Excel图表甘特图已生成: {chart_path}")
         print(f"Excel表格甘特图已生成: {table_path}")
         
-        # 3. 创建项目信息文件
+        # 3. 创建项目信息文件（一次成串、一次写出）
         info_path = f"{project_folder}/project_info.txt"
+        info_content = (
+            f"项目名称: {title}\n"
+            f"生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+            f"总任务数: {len(processed_tasks)}\n"
+            f"\n文件说明:\n"
+            f"- {base_name}_chart.xlsx: Excel图表甘特图\n"
+            f"- {base_name}_table.xlsx: Excel表格甘特图\n"
+            f"- project_info.txt: 项目信息文件\n"
+        )
         with open(info_path, 'w', encoding='utf-8') as f:
-            f.write(f"项目名称: {title}\n")
-            f.write(f"生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"总任务数: {len(processed_tasks)}\n")
-            f.write(f"\n文件说明:\n")
-            f.write(f"- {base_name}_chart.xlsx: Excel图表甘特图\n")
-            f.write(f"- {base_name}_table.xlsx: Excel表格甘特图\n")
-            f.write(f"- project_info.txt: 项目信息文件\n")
+            f.write(info_content)
         
         print(f"\n🎉 完整项目文件生成完成！")
         print(f"📁 项目文件夹: {project_folder}")
@@ -0,0 +1,116 @@
+"""
+TaskWeaver AI 快速XLSX写出器
+
+绕过openpyxl，直接把固定结构的数据表写成XLSX包里的XML文件。
+适合数万行以上的纯数据甘特表：省去openpyxl的样式合并和逐单元格
+Cell对象开销，字符串走inlineStr，顺序单元格省略 r=/s= 属性。
+
+只支持数据（文本、数字、公式），不支持样式和图表；
+图表模式需要图表时仍应使用openpyxl路径。
+"""
+
+from xml.sax.saxutils import escape
+from zipfile import ZipFile, ZIP_DEFLATED
+
+_CONTENT_TYPES_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '</Types>'
+)
+
+_ROOT_RELS_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+
+_WORKBOOK_RELS_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '<Relationship Id="rId2" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+    'Target="styles.xml"/>'
+    '</Relationships>'
+)
+
+# 最小合法styles.xml：一个默认字体/填充/边框/格式
+_STYLES_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="1"><fill><patternFill patternType="none"/></fill></fills>'
+    '<borders count="1"><border/></borders>'
+    '<cellStyleXfs count="1"><xf/></cellStyleXfs>'
+    '<cellXfs count="1"><xf xfId="0"/></cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+
+
+def _workbook_xml(sheet_name):
+    return (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        f'<sheets><sheet name="{escape(sheet_name)}" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    )
+
+
+def _cell_xml(value):
+    """单个单元格的XML片段。顺序写出，省略 r= 与 s="0" 属性。"""
+    if value is None or value == "":
+        return '<c/>'
+    if isinstance(value, bool):
+        return f'<c t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float)):
+        return f'<c><v>{value}</v></c>'
+    text = str(value)
+    if text.startswith('='):
+        return f'<c><f>{escape(text[1:])}</f></c>'
+    return f'<c t="inlineStr"><is><t>{escape(text)}</t></is></c>'
+
+
+def _sheet_xml_chunks(rows):
+    """按行流式产出sheet1.xml片段，避免拼出整张表的大字符串"""
+    yield ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+           '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+           '<sheetData>')
+    for r, row in enumerate(rows, 1):
+        yield f'<row r="{r}">' + ''.join(_cell_xml(v) for v in row) + '</row>'
+    yield '</sheetData></worksheet>'
+
+
+def write_xlsx(filename, rows, sheet_name="Sheet1"):
+    """
+    把二维数据直接写成XLSX文件
+
+    Args:
+        filename: 输出文件路径
+        rows: 可迭代的行，每行是单元格值列表；
+              以'='开头的字符串按公式写出，None/空串写空单元格
+        sheet_name: 工作表名称
+    """
+    with ZipFile(filename, 'w', ZIP_DEFLATED) as zf:
+        zf.writestr('[Content_Types].xml', _CONTENT_TYPES_XML)
+        zf.writestr('_rels/.rels', _ROOT_RELS_XML)
+        zf.writestr('xl/workbook.xml', _workbook_xml(sheet_name))
+        zf.writestr('xl/_rels/workbook.xml.rels', _WORKBOOK_RELS_XML)
+        zf.writestr('xl/styles.xml', _STYLES_XML)
+        with zf.open('xl/worksheets/sheet1.xml', 'w') as fh:
+            for chunk in _sheet_xml_chunks(rows):
+                fh.write(chunk.encode('utf-8'))
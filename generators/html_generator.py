@@ -4,141 +4,25 @@ TaskWeaver AI HTML 报告生成器
 生成基于Mermaid.js的可交互HTML甘特图报告
 """
 
+import io
 import os
+import sys
 from datetime import date
+from pathlib import Path
 from typing import Dict, List
 from jinja2 import Template
 
 from core.models import ProjectPlan, Task
 
+# 状态关键字驻留：配合_task_view里驻留过的status元组，
+# `in`比较先走指针相等的快路径，不必逐字符比较
+_DONE = sys.intern('done')
+_ACTIVE = sys.intern('active')
+_CRIT = sys.intern('crit')
 
-class HTMLGanttGenerator:
-    """
-    HTML甘特图生成器
-    
-    使用Mermaid.js生成可交互的HTML甘特图报告
-    """
-    
-    def __init__(self, project_plan: ProjectPlan):
-        """
-        初始化HTML生成器
-        
-        Args:
-            project_plan: 项目计划对象
-        """
-        self.project_plan = project_plan
-    
-    def generate_html(self, filename: str = None, include_statistics: bool = True):
-        """
-        生成HTML报告
-        
-        Args:
-            filename: 输出文件名
-            include_statistics: 是否包含项目统计信息
-        """
-        if filename is None:
-            filename = f"{self.project_plan.title.replace(' ', '_')}.html"
-        
-        # 生成Mermaid代码
-        mermaid_code = self._project_to_mermaid()
-        
-        # 生成统计信息
-        statistics = self._generate_statistics() if include_statistics else None
-        
-        # 渲染HTML模板
-        html_content = self._render_template(mermaid_code, statistics)
-        
-        # 保存文件
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write(html_content)
-        
-        print(f"HTML甘特图报告已生成: {filename}")
-    
-    def _project_to_mermaid(self) -> str:
-        """将项目计划转换为Mermaid甘特图代码"""
-        lines = ["gantt"]
-        lines.append(f"    dateFormat  YYYY-MM-DD")
-        lines.append(f"    title       {self.project_plan.title}")
-        lines.append("")
-        
-        # 按section分组
-        sections = {}
-        for task in self.project_plan.tasks:
-            section = task.section or "默认阶段"
-            if section not in sections:
-                sections[section] = []
-            sections[section].append(task)
-        
-        # 生成各个section
-        for section_name, tasks in sections.items():
-            lines.append(f"    section {section_name}")
-            
-            for task in tasks:
-                # 构建任务行 - 修复Mermaid语法
-                line_parts = [f"    {task.name}", f" :{task.id}"]
-                
-                # 处理里程碑
-                if task.is_milestone:
-                    line_parts.append(", milestone")
-                    # 添加开始信息
-                    if task.dependencies:
-                        line_parts.append(f", after {task.dependencies[0]}")
-                    elif task.start_date:
-                        line_parts.append(f", {task.start_date.strftime('%Y-%m-%d')}")
-                else:
-                    # 普通任务
-                    # 添加状态
-                    if task.status:
-                        line_parts.append(f", {', '.join(task.status)}")
-                    
-                    # 添加开始信息
-                    if task.dependencies:
-                        line_parts.append(f", after {task.dependencies[0]}")
-                    elif task.start_date:
-                        line_parts.append(f", {task.start_date.strftime('%Y-%m-%d')}")
-                    
-                    # 添加持续时间
-                    if task.duration and task.duration > 0:
-                        line_parts.append(f", {task.duration}d")
-                
-                lines.append("".join(line_parts))
-            
-            lines.append("")
-        
-        return "\n".join(lines)
-    
-    def _generate_statistics(self) -> Dict:
-        """生成项目统计信息"""
-        total_tasks = len(self.project_plan.tasks)
-        completed_tasks = len([t for t in self.project_plan.tasks if 'done' in t.status])
-        active_tasks = len([t for t in self.project_plan.tasks if 'active' in t.status])
-        critical_tasks = len([t for t in self.project_plan.tasks if 'crit' in t.status])
-        milestones = len([t for t in self.project_plan.tasks if t.is_milestone])
-        
-        # 计算工期
-        total_duration = 0
-        if self.project_plan.start_date and self.project_plan.end_date:
-            total_duration = (self.project_plan.end_date - self.project_plan.start_date).days + 1
-        
-        # 计算完成率
-        completion_rate = (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
-        
-        return {
-            'total_tasks': total_tasks,
-            'completed_tasks': completed_tasks,
-            'active_tasks': active_tasks,
-            'critical_tasks': critical_tasks,
-            'milestones': milestones,
-            'total_duration': total_duration,
-            'completion_rate': completion_rate,
-            'start_date': self.project_plan.start_date,
-            'end_date': self.project_plan.end_date,
-            'sections': self.project_plan.get_sections()
-        }
-    
-    def _render_template(self, mermaid_code: str, statistics: Dict = None) -> str:
-        """渲染HTML模板"""
-        template_str = """<!DOCTYPE html>
+
+# HTML模板：模块级常量，编译结果进程内只生成一次
+_HTML_TEMPLATE_STR = """<!DOCTYPE html>
 <html lang="zh-CN">
 <head>
     <meta charset="UTF-8">
@@ -365,21 +249,197 @@ class HTMLGanttGenerator:
     </script>
 </body>
 </html>"""
+
+_COMPILED_TEMPLATE = None
+
+
+def _get_template() -> Template:
+    """懒编译并缓存HTML模板，Jinja的词法分析/编译每个进程只跑一次"""
+    global _COMPILED_TEMPLATE
+    if _COMPILED_TEMPLATE is None:
+        _COMPILED_TEMPLATE = Template(_HTML_TEMPLATE_STR)
+    return _COMPILED_TEMPLATE
+
+
+class HTMLGanttGenerator:
+    """
+    HTML甘特图生成器
+    
+    使用Mermaid.js生成可交互的HTML甘特图报告
+    """
+    
+    def __init__(self, project_plan: ProjectPlan):
+        """
+        初始化HTML生成器
         
-        template = Template(template_str)
+        Args:
+            project_plan: 项目计划对象
+        """
+        self.project_plan = project_plan
+        self._sections_cache = None
+        self._sections_cache_key = None
+        self._view_cache = None
+        self._view_cache_key = None
+        self._view_sections = []
+
+    def _group_by_section(self) -> Dict[str, List[Task]]:
+        """按section分组任务；分组只依赖任务列表，同一列表重复调用直接复用"""
+        tasks = self.project_plan.tasks
+        if self._sections_cache is not None and self._sections_cache_key == id(tasks):
+            return self._sections_cache
+
+        groups: Dict[str, List[Task]] = {}
+        for task in tasks:
+            groups.setdefault(task.section or "默认阶段", []).append(task)
+
+        self._sections_cache = groups
+        self._sections_cache_key = id(tasks)
+        return groups
+
+    def _task_view(self) -> Dict[str, List[tuple]]:
+        """按section分组的任务元组投影
+
+        热循环里一次元组解包代替对模型的逐属性查找；
+        与_group_by_section同样按任务列表身份缓存。
+        """
+        tasks = self.project_plan.tasks
+        if self._view_cache is not None and self._view_cache_key == id(tasks):
+            return self._view_cache
+
+        view: Dict[str, List[tuple]] = {}
+        sections_seen: Dict[str, None] = {}
+        for task in tasks:
+            # 只记录真实声明过的section，与get_sections的口径一致
+            if task.section:
+                sections_seen[task.section] = None
+            view.setdefault(task.section or "默认阶段", []).append((
+                task.id,
+                task.name,
+                tuple(sys.intern(s) for s in task.status),
+                task.is_milestone,
+                task.dependencies[0] if task.dependencies else None,
+                task.start_date,
+                task.duration,
+            ))
+
+        self._view_cache = view
+        self._view_sections = sorted(sections_seen)
+        self._view_cache_key = id(tasks)
+        return view
+
+    def generate_html(self, filename: str = None, include_statistics: bool = True):
+        """
+        生成HTML报告
         
-        # 准备任务详情
-        task_details = {}
-        for task in self.project_plan.tasks:
-            section = task.section or "默认阶段"
-            if section not in task_details:
-                task_details[section] = []
-            task_details[section].append(task)
+        Args:
+            filename: 输出文件名
+            include_statistics: 是否包含项目统计信息
+        """
+        if filename is None:
+            filename = f"{self.project_plan.title.replace(' ', '_')}.html"
         
-        return template.render(
+        # 生成Mermaid代码
+        mermaid_code = self._project_to_mermaid()
+
+        # 生成统计信息
+        statistics = self._generate_statistics() if include_statistics else None
+
+        # 流式渲染HTML模板到文件，整页字符串不落内存
+        with open(filename, 'w', encoding='utf-8', buffering=131072) as f:
+            self._render_to(mermaid_code, statistics, f)
+
+        print(f"HTML甘特图报告已生成: {filename}")
+    
+    def _project_to_mermaid(self) -> str:
+        """将项目计划转换为Mermaid甘特图代码"""
+        buf = io.StringIO()
+        w = buf.write
+        w("gantt\n")
+        w("    dateFormat  YYYY-MM-DD\n")
+        w(f"    title       {self.project_plan.title}\n\n")
+
+        # 生成各个section
+        for section_name, entries in self._task_view().items():
+            w(f"    section {section_name}\n")
+
+            for task_id, name, status, is_milestone, dep0, start_date, duration in entries:
+                # 先拼出各可选片段，再一次写出整行（修复Mermaid语法）
+                if dep0:
+                    start_part = f", after {dep0}"
+                elif start_date:
+                    start_part = f", {start_date.isoformat()}"
+                else:
+                    start_part = ""
+
+                if is_milestone:
+                    w(f"    {name} :{task_id}, milestone{start_part}\n")
+                else:
+                    status_part = f", {', '.join(status)}" if status else ""
+                    dur_part = f", {duration}d" if duration and duration > 0 else ""
+                    w(f"    {name} :{task_id}{status_part}{start_part}{dur_part}\n")
+
+            w("\n")
+
+        # 收尾只保留一个换行，与原先"\n".join的输出完全一致
+        return buf.getvalue().rstrip("\n") + "\n"
+    
+    def _generate_statistics(self) -> Dict:
+        """生成项目统计信息"""
+        # 单次遍历累加各状态计数，代替每个指标各扫一遍任务列表
+        total_tasks = len(self.project_plan.tasks)
+        completed_tasks = active_tasks = critical_tasks = milestones = 0
+        for entries in self._task_view().values():
+            for _task_id, _name, status, is_milestone, _dep0, _start, _duration in entries:
+                if _DONE in status:
+                    completed_tasks += 1
+                if _ACTIVE in status:
+                    active_tasks += 1
+                if _CRIT in status:
+                    critical_tasks += 1
+                if is_milestone:
+                    milestones += 1
+        
+        # 计算工期
+        total_duration = 0
+        if self.project_plan.start_date and self.project_plan.end_date:
+            total_duration = (self.project_plan.end_date - self.project_plan.start_date).days + 1
+        
+        # 计算完成率
+        completion_rate = (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
+        
+        return {
+            'total_tasks': total_tasks,
+            'completed_tasks': completed_tasks,
+            'active_tasks': active_tasks,
+            'critical_tasks': critical_tasks,
+            'milestones': milestones,
+            'total_duration': total_duration,
+            'completion_rate': completion_rate,
+            'start_date': self.project_plan.start_date,
+            'end_date': self.project_plan.end_date,
+            # 构建任务投影时顺带收集，不必再让模型重建section索引
+            'sections': self._view_sections
+        }
+    
+    def _render_to(self, mermaid_code: str, statistics: Dict, file_obj) -> None:
+        """把HTML模板流式渲染到文件对象
+
+        template.stream按块产出并直接写入，峰值内存省掉整页HTML的拷贝；
+        小块由大缓冲的writer吸收。
+        """
+        # 直接用f-string拼日期，省掉strftime的格式串解析
+        today = date.today()
+        _get_template().stream(
             project_title=self.project_plan.title,
-            generation_time=date.today().strftime('%Y年%m月%d日'),
+            generation_time=f"{today.year}年{today.month:02d}月{today.day:02d}日",
             mermaid_code=mermaid_code,
             statistics=statistics,
-            task_details=task_details
-        )
+            # 任务详情直接复用缓存的section分组
+            task_details=self._group_by_section()
+        ).dump(file_obj)
+
+    def _render_template(self, mermaid_code: str, statistics: Dict = None) -> str:
+        """渲染HTML模板为字符串（需要整页内容时使用）"""
+        buf = io.StringIO()
+        self._render_to(mermaid_code, statistics, buf)
+        return buf.getvalue()
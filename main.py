@@ -9,18 +9,15 @@ import sys
 import os
 import argparse
 from datetime import date
-from pathlib import Path
+from pathlib import Path, PurePath
 
 # 添加项目根目录到路径
 sys.path.insert(0, str(Path(__file__).parent))
 
+# 只在顶层导入轻量的数据模型；解析器/处理器/生成器各自拖着
+# openai、openpyxl、jinja2等重依赖，推迟到用到它们的命令里再导入，
+# validate/test等子命令的冷启动不必付这笔钱
 from core.models import Task, ProjectPlan
-from core.processor import CoreProcessor
-from parsers.mermaid_parser import MermaidParser, MermaidValidator
-from parsers.ai_mermaid_parser import AIMermaidParser, OpenAIClient
-from parsers.nlp_parser import NaturalLanguageParser
-from generators.excel_generator import ExcelGanttGenerator
-from generators.html_generator import HTMLGanttGenerator
 
 
 def setup_argument_parser():
@@ -69,49 +66,109 @@ def setup_argument_parser():
     return parser
 
 
+# 解析结果磁盘缓存：按文件指纹存放，文件没变就不重复解析
+_PARSE_CACHE_DIR = Path("outputs/.cache")
+_PARSE_CACHE_MAX_ENTRIES = 64
+
+
+def _parse_cache_path(file_path: str, use_ai: bool):
+    """根据文件指纹（绝对路径+mtime+大小+解析器类型）计算缓存文件路径"""
+    import hashlib
+
+    st = os.stat(file_path)
+    key = f"{os.path.abspath(file_path)}|{st.st_mtime_ns}|{st.st_size}|{use_ai}"
+    digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest()
+    return _PARSE_CACHE_DIR / f"{digest}.pkl"
+
+
+def _evict_parse_cache():
+    """缓存条目超限时按修改时间淘汰最旧的"""
+    entries = sorted(_PARSE_CACHE_DIR.glob('*.pkl'), key=lambda p: p.stat().st_mtime)
+    for stale in entries[:-_PARSE_CACHE_MAX_ENTRIES]:
+        stale.unlink(missing_ok=True)
+
+
+def _load_or_parse(file_path: str, mermaid_code: str, use_ai: bool, api_key: str = None) -> ProjectPlan:
+    """解析Mermaid代码，带磁盘缓存
+
+    解析是输入文件的纯函数：文件内容没变时直接反序列化上次的结果，
+    跳过整个解析流程（AI路径还省一次模型调用）。
+    """
+    import pickle
+
+    cache_path = None
+    try:
+        cache_path = _parse_cache_path(file_path, use_ai)
+        if cache_path.exists():
+            with open(cache_path, 'rb') as f:
+                project_plan = pickle.load(f)
+            print("⚡ 文件未变化，使用缓存的解析结果")
+            return project_plan
+    except Exception:
+        cache_path = None
+
+    # 未命中：选择解析器并解析
+    from parsers.mermaid_parser import MermaidParser
+
+    if use_ai and api_key:
+        print("🤖 使用AI解析器...")
+        from parsers.ai_mermaid_parser import AIMermaidParser, OpenAIClient
+
+        llm_client = OpenAIClient(api_key)
+        parser = AIMermaidParser(llm_client)
+        # 设置备用解析器
+        fallback_parser = MermaidParser()
+        parser.set_fallback_parser(fallback_parser)
+    else:
+        print("📝 使用传统解析器...")
+        parser = MermaidParser()
+
+    project_plan = parser.parse(mermaid_code)
+
+    if cache_path is not None:
+        try:
+            _PARSE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            with open(cache_path, 'wb') as f:
+                pickle.dump(project_plan, f)
+            _evict_parse_cache()
+        except Exception:
+            pass  # 缓存失败不影响正常流程
+
+    return project_plan
+
+
 def parse_mermaid_file(file_path: str, output_path: str, output_format: str = 'all',
                       excel_mode: str = 'both', use_ai: bool = False, api_key: str = None):
     """解析Mermaid文件并生成完整的项目文件（Excel图表、表格甘特图、HTML）"""
     try:
-        # 读取文件
-        with open(file_path, 'r', encoding='utf-8') as f:
-            mermaid_code = f.read()
-        
+        # 读取文件（一次读入，避免小块read系统调用）
+        mermaid_code = Path(file_path).read_text(encoding='utf-8')
+
         print(f"📖 读取Mermaid文件: {file_path}")
-        
-        # 选择解析器
-        if use_ai and api_key:
-            print("🤖 使用AI解析器...")
-            llm_client = OpenAIClient(api_key)
-            parser = AIMermaidParser(llm_client)
-            # 设置备用解析器
-            fallback_parser = MermaidParser()
-            parser.set_fallback_parser(fallback_parser)
-        else:
-            print("📝 使用传统解析器...")
-            parser = MermaidParser()
-        
-        # 解析项目
-        project_plan = parser.parse(mermaid_code)
+
+        # 解析项目（文件未变化时命中磁盘缓存）
+        project_plan = _load_or_parse(file_path, mermaid_code, use_ai, api_key)
         print(f"✅ 解析成功: {project_plan.total_tasks} 个任务")
         
         # 处理日期计算
         print("🔄 计算日期和依赖关系...")
+        from core.processor import CoreProcessor
+
         processor = CoreProcessor(project_plan)
-        
-        # 验证项目
-        errors = processor.validate_plan()
+
+        # 验证并计算日期（融合接口，依赖图只遍历一遍）
+        errors, processed_project = processor.validate_and_calculate()
         if errors:
             print("⚠️ 发现问题:")
             for error in errors:
                 print(f"  - {error}")
-        
-        # 计算日期
-        processed_project = processor.calculate_dates()
+        if processed_project is None:
+            print("❌ 日期计算失败")
+            return False
         print("✅ 日期计算完成")
         
         # 生成完整的项目文件
-        base_name = os.path.splitext(os.path.basename(output_path))[0]
+        base_name = PurePath(output_path).stem
         generate_complete_project_files(processed_project, base_name)
         
         print("🎉 任务完成!")
@@ -139,21 +196,23 @@ def parse_mermaid_file(file_path: str, output_path: str, output_format: str = 'a
 def validate_mermaid_file(file_path: str, use_ai: bool = False):
     """验证Mermaid文件"""
     try:
-        # 读取文件
-        with open(file_path, 'r', encoding='utf-8') as f:
-            mermaid_code = f.read()
-        
+        # 读取文件（一次读入，避免小块read系统调用）
+        mermaid_code = Path(file_path).read_text(encoding='utf-8')
+
         print(f"📖 读取Mermaid文件: {file_path}")
-        
+
         if use_ai:
             print("🤖 使用AI验证器...")
             # AI验证需要API密钥，这里使用模拟
+            from parsers.ai_mermaid_parser import AIMermaidValidator, OpenAIClient
+
             llm_client = OpenAIClient("dummy_key")
-            from parsers.ai_mermaid_parser import AIMermaidValidator
             validator = AIMermaidValidator(llm_client)
             is_valid, errors, warnings = validator.validate(mermaid_code)
         else:
             print("📝 使用传统验证器...")
+            from parsers.mermaid_parser import MermaidValidator
+
             validator = MermaidValidator()
             is_valid, errors, warnings = validator.validate(mermaid_code)
         
@@ -195,25 +254,30 @@ def create_from_text(description: str, api_key: str = None, output_path: str = '
         if output_path == 'ai_project':
             base_name = "ai_project"
         else:
-            base_name = os.path.splitext(os.path.basename(output_path))[0]
+            base_name = PurePath(output_path).stem
         
         # 创建自然语言解析器
+        from parsers.nlp_parser import NaturalLanguageParser
+
         nlp_parser = NaturalLanguageParser(api_key=api_key)
-        
+
         # 解析描述
         project_plan = nlp_parser.parse(description)
         print(f"✅ 解析成功: {project_plan.total_tasks} 个任务")
-        
+
         # 处理项目
+        from core.processor import CoreProcessor
+
         processor = CoreProcessor(project_plan)
-        errors = processor.validate_plan()
-        
+        errors, processed_project = processor.validate_and_calculate()
+
         if errors:
             print("\n⚠️ 项目验证发现问题:")
             for error in errors:
                 print(f"  - {error}")
-        
-        processed_project = processor.calculate_dates()
+        if processed_project is None:
+            print("❌ 日期计算失败")
+            return False
         print("✅ 日期计算完成")
         
         # 生成完整的项目文件
@@ -292,6 +356,8 @@ def create_interactive_project():
     )
     
     # 处理项目
+    from core.processor import CoreProcessor
+
     processor = CoreProcessor(project)
     errors = processor.validate_plan()
     
@@ -311,6 +377,8 @@ def create_interactive_project():
         output_file = f"{title}.xlsx"
     
     # 生成Excel
+    from generators.excel_generator import ExcelGanttGenerator
+
     parsed_data = convert_project_to_old_format(processed_project)
     generator = ExcelGanttGenerator(parsed_data)
     generator.generate_excel(output_file)
@@ -319,24 +387,46 @@ def create_interactive_project():
     return True
 
 
+def _run_test_script(script_name: str = None):
+    """在当前解释器内用pytest运行测试
+
+    测试模块已是纯pytest用例，不再自带main()运行器；按__main__用
+    runpy执行只会定义函数、不跑任何用例。进程内调pytest.main真正
+    收集并运行用例，同样免去每个模块一次的子进程解释器启动。
+    不传script_name时运行整个test/目录。
+    """
+    import pytest
+
+    target = Path(__file__).parent / "test"
+    if script_name:
+        target = target / script_name
+    exit_code = pytest.main(['-q', str(target)])
+    if exit_code != 0:
+        print(f"⚠️ 测试未全部通过: {target.name}")
+
+
 def run_tests(module: str = None):
     """运行测试"""
     print("🧪 运行TaskWeaver AI测试")
     print("=" * 40)
-    
-    if module == "core" or module is None:
+
+    if module is None:
+        # 全量运行收敛为一次pytest会话：只收集一遍，会话级fixture只建一份
+        print("\n🧪 运行全部测试模块...")
+        _run_test_script()
+    elif module == "core":
         print("\n🔧 测试核心模块...")
-        os.system(f"cd '{Path(__file__).parent}' && python test/test_core.py")
-    
-    if module == "parser" or module is None:
+        _run_test_script("test_core.py")
+    elif module == "parser":
         print("\n📝 测试解析器...")
-        os.system(f"cd '{Path(__file__).parent}' && python test/test_mermaid_parser.py")
-    
-    if module == "ai" or module is None:
+        _run_test_script("test_mermaid_parser.py")
+    elif module == "ai":
         print("\n🤖 测试AI功能...")
-        print("✅ AI客户端和解析器模块正常加载")
-        
-        # 测试LLM客户端配置
+        _run_test_script("test_ai_mermaid_parser.py")
+
+    if module == "ai" or module is None:
+        # 检查LLM客户端配置（环境检查，不属于pytest用例）
+        print("\n🤖 检查AI环境配置...")
         try:
             from core.llm_client import auto_select_provider, LLMProvider
             provider = auto_select_provider()
@@ -357,49 +447,90 @@ def generate_complete_project_files(processed_project: ProjectPlan, base_name: s
     """生成完整的项目文件（Excel图表、表格甘特图、HTML）到专属文件夹"""
     import os
     from datetime import datetime
-    
+
+    from generators.excel_generator import ExcelGanttGenerator
+    from generators.html_generator import HTMLGanttGenerator
+
     # 创建项目专属文件夹
     project_folder = f"outputs/{base_name}"
     os.makedirs(project_folder, exist_ok=True)
-    
+
+    chart_path = f"{project_folder}/{base_name}_chart.xlsx"
+    table_path = f"{project_folder}/{base_name}_table.xlsx"
+    html_path = f"{project_folder}/{base_name}_report.html"
+    info_path = f"{project_folder}/project_info.txt"
+    result_paths = {
+        'folder': project_folder,
+        'chart': chart_path,
+        'table': table_path,
+        'html': html_path,
+        'info': info_path
+    }
+
+    # 内容指纹：项目数据没变且四个产物都在时，整套生成直接跳过
+    import hashlib
+    import pickle
+
+    fingerprint = hashlib.blake2b(pickle.dumps((
+        processed_project.title,
+        [(t.id, t.name, t.status, t.is_milestone, str(t.start_date),
+          str(t.end_date), t.duration, t.dependencies)
+         for t in processed_project.tasks],
+    )), digest_size=16).hexdigest()
+    hash_path = Path(project_folder) / '.content_hash'
+    try:
+        if (hash_path.exists() and hash_path.read_text() == fingerprint
+                and all(os.path.exists(p) for p in (chart_path, table_path, html_path, info_path))):
+            print(f"\n⚡ 项目内容未变化，复用已有文件: {project_folder}")
+            return result_paths
+    except OSError:
+        pass  # 指纹读取失败则照常重新生成
+
     # 转换数据格式
     parsed_data = convert_project_to_old_format(processed_project)
-    
+
     # 生成文件
     print(f"\n📁 创建项目文件夹: {project_folder}")
     print("📊 生成项目文件...")
     
-    # 1. Excel图表甘特图
-    chart_path = f"{project_folder}/{base_name}_chart.xlsx"
-    chart_generator = ExcelGanttGenerator(parsed_data, mode="chart")
-    chart_generator.generate_excel(chart_path)
+    # 1-3. 图表和表格甘特图共用一个生成器实例（任务副本、日期预计算
+    # 等内部状态跨两次generate调用复用），两次Excel输出顺序执行；
+    # HTML渲染与Excel打包相互独立，仍然并行掩盖IO等待
+    from concurrent.futures import ThreadPoolExecutor
+
+    excel_generator = ExcelGanttGenerator(parsed_data)
+    html_generator = HTMLGanttGenerator(processed_project)
+
+    def _generate_excels():
+        excel_generator.generate_excel(chart_path, mode="chart")
+        excel_generator.generate_excel(table_path, mode="table")
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = [
+            executor.submit(_generate_excels),
+            executor.submit(html_generator.generate_html, html_path),
+        ]
+        for future in futures:
+            future.result()
+
     print(f"  ✅ Excel图表甘特图: {chart_path}")
-    
-    # 2. Excel表格甘特图
-    table_path = f"{project_folder}/{base_name}_table.xlsx"
-    table_generator = ExcelGanttGenerator(parsed_data, mode="table")
-    table_generator.generate_excel(table_path)
     print(f"  ✅ Excel表格甘特图: {table_path}")
-    
-    # 3. HTML交互报告
-    html_path = f"{project_folder}/{base_name}_report.html"
-    html_generator = HTMLGanttGenerator(processed_project)
-    html_generator.generate_html(html_path)
     print(f"  ✅ HTML交互报告: {html_path}")
     
-    # 4. 创建项目信息文件
-    info_path = f"{project_folder}/project_info.txt"
-    with open(info_path, 'w', encoding='utf-8') as f:
-        f.write(f"项目名称: {processed_project.title}\n")
-        f.write(f"生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-        f.write(f"总任务数: {processed_project.total_tasks}\n")
-        f.write(f"项目阶段: {', '.join(processed_project.get_sections())}\n")
-        f.write(f"里程碑数: {len([t for t in processed_project.tasks if t.is_milestone])}\n")
-        f.write(f"\n文件说明:\n")
-        f.write(f"- {base_name}_chart.xlsx: Excel图表甘特图\n")
-        f.write(f"- {base_name}_table.xlsx: Excel表格甘特图\n")
-        f.write(f"- {base_name}_report.html: HTML交互报告\n")
-        f.write(f"- project_info.txt: 项目信息文件\n")
+    # 4. 创建项目信息文件（一次成串、一次写出）
+    Path(info_path).write_text(
+        f"项目名称: {processed_project.title}\n"
+        f"生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n"
+        f"总任务数: {processed_project.total_tasks}\n"
+        f"项目阶段: {', '.join(processed_project.get_sections())}\n"
+        f"里程碑数: {processed_project.milestone_count}\n"
+        f"\n文件说明:\n"
+        f"- {base_name}_chart.xlsx: Excel图表甘特图\n"
+        f"- {base_name}_table.xlsx: Excel表格甘特图\n"
+        f"- {base_name}_report.html: HTML交互报告\n"
+        f"- project_info.txt: 项目信息文件\n",
+        encoding='utf-8',
+    )
     
     print(f"  ✅ 项目信息文件: {info_path}")
     
@@ -409,14 +540,14 @@ def generate_complete_project_files(processed_project: ProjectPlan, base_name: s
     print(f"  📅 表格甘特图: {table_path}")
     print(f"  🌐 HTML报告: {html_path}")
     print(f"  📄 项目信息: {info_path}")
-    
-    return {
-        'folder': project_folder,
-        'chart': chart_path,
-        'table': table_path,
-        'html': html_path,
-        'info': info_path
-    }
+
+    # 记录本次内容指纹，下次数据未变即可跳过整套生成
+    try:
+        hash_path.write_text(fingerprint)
+    except OSError:
+        pass
+
+    return result_paths
 
 
 def convert_project_to_old_format(project_plan: ProjectPlan) -> dict:
@@ -437,8 +568,8 @@ def convert_project_to_old_format(project_plan: ProjectPlan) -> dict:
             'duration_val': task.duration,
             'dependency_id': task.dependencies[0] if task.dependencies else None,
             # 添加Excel生成器需要的字段
-            'start_raw': task.start_date.strftime('%Y-%m-%d') if task.start_date else None,
-            'end_raw': f"{task.duration}d" if task.duration and not task.is_milestone else (task.end_date.strftime('%Y-%m-%d') if task.end_date else None)
+            'start_raw': task.start_date.isoformat() if task.start_date else None,
+            'end_raw': f"{task.duration}d" if task.duration and not task.is_milestone else (task.end_date.isoformat() if task.end_date else None)
         }
         tasks_data.append(task_data)
     
@@ -4,24 +4,393 @@ TaskWeaver AI 驱动的 Mermaid 甘特图解析器
 基于LLM的智能解析器，将AI作为项目的核心中枢，实现更智能、更灵活的Mermaid语法解析。
 """
 
+import asyncio
+import io
 import json
+import logging
+import os
 import re
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, date
+from functools import lru_cache
 from typing import List, Dict, Optional, Any
 from abc import ABC, abstractmethod
 
 from core.models import Task, ProjectPlan
 from core.llm_client import LLMClient as CoreLLMClient, auto_select_provider
 
+# 热路径上的诊断输出走logging：print是同步I/O且每次都格式化字符串，
+# 批量场景下大量畸形日期的警告本身就能成为瓶颈；logger在级别不够时
+# 直接短路，%s惰性格式化，且输出可由调用方统一收口
+logger = logging.getLogger(__name__)
+
+# 日期格式分发表：每个格式对应一个形状正则，
+# 匹配后只调一次strptime，不再靠逐格式抛/接ValueError试错
+_DATE_PATTERNS = [
+    # strptime允许月/日只写一位，形状正则保持同样的宽容度
+    (re.compile(r'^\d{4}-\d{1,2}-\d{1,2}$'), '%Y-%m-%d'),
+    (re.compile(r'^\d{4}/\d{1,2}/\d{1,2}$'), '%Y/%m/%d'),
+    (re.compile(r'^\d{1,2}/\d{1,2}/\d{4}$'), '%d/%m/%Y'),  # 歧义时与原实现一致，日在前
+]
+
+# LLM响应的提取正则：re模块内部缓存有限且按字符串键查找，提前编译省掉每次调用的查找开销
+_MERMAID_BLOCK_RE = re.compile(r'```mermaid\n(.*?)\n```', re.DOTALL)
+
+
+def _extract_json(text: str) -> Optional[str]:
+    """提取响应中第一个花括号配平的JSON对象子串
+
+    单遍扫描代替贪婪的 {.*} 正则：用小状态机跳过字符串字面量里的
+    花括号和转义符，深度归零即返回切片。被正文包裹的嵌套JSON也能
+    正确截断，且不会生成覆盖整段响应的大match对象。
+    """
+    start = text.find('{')
+    if start == -1:
+        return None
+
+    depth = 0
+    in_string = False
+    escaped = False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == '\\':
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == '{':
+            depth += 1
+        elif ch == '}':
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+
+    return None
+
+
+def _iter_json_array_objects(chunks, array_key: str = '"tasks"'):
+    """从文本片段流中增量提取指定数组里的JSON对象子串
+
+    片段不断拼入缓冲区；定位到数组的'['之后，每当缓冲区里出现一个
+    花括号配平完整的对象就立刻产出，不必等整段响应接收完毕。
+    """
+    buf = ''
+    pos = -1  # 数组'['之后的扫描位置，-1表示还没定位到数组
+    search_from = 0  # 数组键的搜索起点，免得每个片段都从头重扫前缀
+    for chunk in chunks:
+        if not chunk:
+            continue
+        buf += chunk
+
+        if pos < 0:
+            key_idx = buf.find(array_key, search_from)
+            if key_idx < 0:
+                # 键可能被片段边界拆开，保留末尾不足一个键长的部分下次重扫
+                search_from = max(0, len(buf) - len(array_key) + 1)
+                continue
+            bracket = buf.find('[', key_idx)
+            if bracket < 0:
+                continue
+            pos = bracket + 1
+
+        while True:
+            while pos < len(buf) and buf[pos] in ' \t\r\n,':
+                pos += 1
+            if pos >= len(buf):
+                break
+            if buf[pos] == ']':
+                return
+            obj_str = _extract_json(buf[pos:])
+            if obj_str is None:
+                break  # 对象尚未接收完整，等下一个片段
+            yield obj_str
+            pos += len(obj_str)
+
+
+@lru_cache(maxsize=1024)
+def _parse_date_cached(date_str: str) -> Optional[date]:
+    """解析日期字符串
+
+    先用形状正则确定格式再解析，常见的ISO输入直接按段取数构造，
+    完全绕开strptime的格式状态机和逐格式试错的异常开销。
+    大计划里日期大量重复，整个转换阶段按字符串记忆化；
+    date对象不可变，跨调用共享是安全的。
+    """
+    # 快路径：YYYY-MM-DD 直接按段取数构造
+    if _DATE_PATTERNS[0][0].match(date_str):
+        y, m, d = date_str.split('-')
+        try:
+            return date(int(y), int(m), int(d))
+        except ValueError:
+            pass
+    else:
+        for pattern, fmt in _DATE_PATTERNS[1:]:
+            if pattern.match(date_str):
+                try:
+                    return datetime.strptime(date_str, fmt).date()
+                except ValueError:
+                    # dd/mm与mm/dd同形，与原实现一致：日在前优先，失败再试月在前
+                    if fmt == '%d/%m/%Y':
+                        try:
+                            return datetime.strptime(date_str, '%m/%d/%Y').date()
+                        except ValueError:
+                            pass
+                break
+
+    logger.warning("无法解析日期: %r", date_str)
+    return None
+
+
+# 系统提示全部取模块级常量：每次调用发送完全相同的字节串，
+# 服务端的提示前缀缓存才能命中；顺带剥掉源码缩进带来的填充token。
+# 动态的mermaid代码始终放在用户消息末尾，保证缓存前缀连续。
+_SYS_CORRECT_AND_PARSE = """你是一个Mermaid甘特图专家。你的任务是先纠正用户提供的Mermaid代码中的语法错误，再将纠正后的代码解析为结构化的任务数据。
+
+纠正原则：
+1. 保持任务名称、ID、日期、依赖关系等核心信息不变
+2. 修正语法格式，使其符合标准Mermaid Gantt语法
+3. 补充缺失的必要信息（如持续时间）
+4. 统一日期格式
+5. 确保依赖关系的正确性
+
+解析要求：
+1. 提取所有任务信息，包括：任务ID、名称、状态、开始日期、持续时间、依赖关系
+2. 识别里程碑任务（标记为milestone状态）
+3. 确定任务所属的阶段（section）
+4. 计算任务的结束日期
+5. 验证依赖关系的正确性
+
+返回JSON格式的数据，包含以下字段：
+- corrected_mermaid: 纠正后的Mermaid代码
+- title: 项目标题
+- date_format: 日期格式
+- sections: 项目阶段列表
+- tasks: 任务列表，每个任务包含：
+- id: 任务ID
+- name: 任务名称
+- status: 状态列表
+- section: 所属阶段
+- is_milestone: 是否为里程碑
+- start_date: 开始日期
+- end_date: 结束日期
+- duration: 持续时间（天数）
+- dependencies: 依赖的任务ID列表
+
+确保返回的是有效的JSON格式，不要添加任何解释。"""
+
+_SYS_NL_TO_MERMAID = """你是一个项目规划专家。你的任务是将用户的自然语言描述转换为标准的Mermaid甘特图代码。
+
+转换要求：
+1. 识别项目中的主要任务和里程碑
+2. 确定任务之间的依赖关系
+3. 合理安排任务的时间顺序
+4. 使用标准的Mermaid Gantt语法
+5. 添加适当的section来组织任务
+
+返回完整的Mermaid代码，包含必要的dateFormat和title。"""
+
+_SYS_OPTIMIZE = """你是一个项目管理专家。你的任务是优化项目计划，提供更好的建议。
+
+优化方向：
+1. 识别并解决依赖冲突
+2. 优化任务时间安排
+3. 建议关键路径优化
+4. 提供风险评估
+5. 建议资源分配优化
+
+返回优化后的项目计划数据，格式与输入相同。"""
+
+_SYS_VALIDATE = """你是一个Mermaid甘特图语法专家。你的任务是验证用户提供的Mermaid代码的正确性。
+
+验证内容：
+1. 语法正确性
+2. 依赖关系的完整性
+3. 日期格式的一致性
+4. 任务信息的完整性
+5. 循环依赖检测
+
+返回JSON格式的验证结果：
+{
+"is_valid": true/false,
+"errors": ["错误1", "错误2"],
+"warnings": ["警告1", "警告2"],
+"suggestions": ["建议1", "建议2"]
+}"""
+
+_SYS_SUGGEST = """你是一个Mermaid甘特图专家。请为用户提供的Mermaid代码提供改进建议。
+
+建议方向：
+1. 语法优化
+2. 结构改进
+3. 可读性提升
+4. 最佳实践应用
+
+返回JSON格式的建议列表：
+{
+"suggestions": ["建议1", "建议2", "建议3"]
+}"""
+
+
+# 模拟模式的固定响应：内容不变，提前序列化成常量，
+# 省掉每次调用的json.dumps和中间dict/list分配
+_SIMULATED_RESPONSE = json.dumps({
+    "tasks": [
+        {
+            "id": "simulated_task",
+            "name": "模拟任务",
+            "start_date": "2024-01-01",
+            "duration": 5,
+            "dependencies": []
+        }
+    ]
+}, ensure_ascii=False)
+
+# Task字段默认值表：_build_task用一次dict合并批量补齐缺省字段
+_TASK_DEFAULTS = {
+    'id': '', 'name': '', 'status': [], 'section': None,
+    'is_milestone': False, 'start_date': None, 'end_date': None,
+    'duration': None, 'dependencies': [],
+}
+
+# 每类调用的(草稿模型, 升级模型)：结构化提取对小模型来说绰绰有余，
+# 默认用便宜的草稿模型，只在输出解析失败时才升级到大模型重试一次。
+# None表示沿用客户端自身配置的模型。
+_CALL_MODELS = {
+    'correct_parse': ('gpt-4o-mini', 'gpt-4'),
+    'validate': ('gpt-4o-mini', 'gpt-4'),
+    'suggest': ('gpt-4o-mini', 'gpt-4'),
+    'optimize': ('gpt-4o-mini', 'gpt-4'),
+    'nl2mermaid': (None, None),  # 开放式生成，直接用默认大模型
+}
+
+
+def _adaptive_max_tokens(prompt: str) -> int:
+    """按输入规模估算输出token配额
+
+    输出（JSON或Mermaid代码）的体量与输入大致成正比，短输入没必要
+    预留整段2000 token的生成上限；上限不超过原来的固定值。
+    """
+    return min(2000, 512 + len(prompt) // 2)
+
+
+def _tiered_generate(llm_client, kind: str, prompt: str,
+                     system_prompt: str, parse=None):
+    """按调用类型分层选择模型并生成，解析失败时升级重试
+
+    parse为None时直接返回草稿模型的原始回复；否则先用草稿模型，
+    回复解析失败（JSONDecodeError/ValueError）再用升级模型重试一次，
+    返回parse的结果。绝大多数调用停在便宜的草稿模型上。
+    """
+    draft_model, full_model = _CALL_MODELS.get(kind, (None, None))
+    max_tokens = _adaptive_max_tokens(prompt)
+
+    response = llm_client.generate(prompt, system_prompt,
+                                   max_tokens=max_tokens, model=draft_model)
+    if parse is None:
+        return response
+
+    try:
+        return parse(response)
+    except (json.JSONDecodeError, ValueError):
+        if not full_model or full_model == draft_model:
+            raise
+        response = llm_client.generate(prompt, system_prompt,
+                                       max_tokens=max_tokens, model=full_model)
+        return parse(response)
+
+
+async def _atiered_generate(llm_client, kind: str, prompt: str,
+                            system_prompt: str, parse=None):
+    """_tiered_generate的异步版本"""
+    draft_model, full_model = _CALL_MODELS.get(kind, (None, None))
+    max_tokens = _adaptive_max_tokens(prompt)
+
+    response = await llm_client.generate_async(
+        prompt, system_prompt, max_tokens=max_tokens, model=draft_model)
+    if parse is None:
+        return response
+
+    try:
+        return parse(response)
+    except (json.JSONDecodeError, ValueError):
+        if not full_model or full_model == draft_model:
+            raise
+        response = await llm_client.generate_async(
+            prompt, system_prompt, max_tokens=max_tokens, model=full_model)
+        return parse(response)
+
+
+_JSON_DECODER = json.JSONDecoder()
+
+
+def _loads_lenient(response: str) -> Any:
+    """宽容地解析LLM响应中的JSON对象
+
+    干净响应走快路径：raw_decode从第一个非空白字符直接解码，整段
+    只扫一遍（必要时先跳过Markdown代码围栏）；响应被正文包裹时才
+    退回花括号配平扫描提取。解析失败抛json.JSONDecodeError。
+    """
+    idx = 0
+    n = len(response)
+    while idx < n and response[idx] in ' \t\r\n':
+        idx += 1
+
+    # 跳过 ```json 之类的代码围栏开头
+    if response.startswith('```', idx):
+        newline = response.find('\n', idx)
+        if newline != -1:
+            idx = newline + 1
+
+    try:
+        obj, _ = _JSON_DECODER.raw_decode(response, idx)
+        if isinstance(obj, dict):
+            return obj
+    except json.JSONDecodeError:
+        pass
+
+    # 慢路径：从正文中提取第一个配平的JSON对象
+    json_str = _extract_json(response)
+    if json_str is not None:
+        return json.loads(json_str)
+    return json.loads(response)
+
 
 class LLMClientBase(ABC):
     """LLM客户端抽象基类"""
     
     @abstractmethod
-    def generate(self, prompt: str, system_prompt: str = None) -> str:
-        """生成文本"""
+    def generate(self, prompt: str, system_prompt: str = None,
+                 max_tokens: int = 2000, model: str = None) -> str:
+        """生成文本
+
+        max_tokens限制输出配额；model为None时用客户端默认模型，
+        不支持按调用切换模型的实现可忽略该参数。
+        """
         pass
 
+    async def generate_async(self, prompt: str, system_prompt: str = None,
+                             max_tokens: int = 2000, model: str = None) -> str:
+        """异步生成文本
+
+        默认实现把同步generate放进线程池执行；
+        子类可覆盖为真正的异步API调用以获得更高并发。
+        """
+        return await asyncio.to_thread(self.generate, prompt, system_prompt,
+                                       max_tokens, model)
+
+    def generate_stream(self, prompt: str, system_prompt: str = None):
+        """流式生成文本，逐片段产出
+
+        默认实现一次性产出完整回复；子类可覆盖为真正的流式API调用，
+        让调用方在生成结束前就开始消费。
+        """
+        yield self.generate(prompt, system_prompt)
+
 
 class OpenAIClient(LLMClientBase):
     """OpenAI客户端实现"""
@@ -30,51 +399,122 @@ class OpenAIClient(LLMClientBase):
         self.api_key = api_key
         self.model = model
         self.client = None
-        
+        self.aclient = None
+        self._client_ready = False
+
+    def _ensure_client(self):
+        """懒初始化openai SDK客户端
+
+        构建客户端（及首次导入openai）推迟到第一次真正生成时：
+        传入自定义llm_client或走本地解析的冷启动路径不付这笔开销。
+        """
+        if self._client_ready:
+            return
+        self._client_ready = True
+
         try:
             import openai
-            self.client = openai.OpenAI(api_key=api_key)
+            from core.llm_client import (
+                _get_shared_http_client, _get_shared_async_http_client
+            )
+            # 复用核心层的共享连接池：TLS握手只付一次，
+            # 并发调用共享keep-alive连接
+            self.client = openai.OpenAI(
+                api_key=self.api_key,
+                http_client=_get_shared_http_client()
+            )
+            self.aclient = openai.AsyncOpenAI(
+                api_key=self.api_key,
+                http_client=_get_shared_async_http_client()
+            )
         except ImportError:
-            print("警告：未安装openai库，将使用模拟模式")
+            logger.warning("未安装openai库，将使用模拟模式")
     
-    def generate(self, prompt: str, system_prompt: str = None) -> str:
+    def generate(self, prompt: str, system_prompt: str = None,
+                 max_tokens: int = 2000, model: str = None) -> str:
         """生成文本"""
+        self._ensure_client()
         if self.client is None:
             # 模拟模式
             return self._simulate_response(prompt)
-        
+
         try:
             messages = []
             if system_prompt:
                 messages.append({"role": "system", "content": system_prompt})
             messages.append({"role": "user", "content": prompt})
-            
+
             response = self.client.chat.completions.create(
-                model=self.model,
+                model=model or self.model,
                 messages=messages,
                 temperature=0.1,
-                max_tokens=2000
+                max_tokens=max_tokens
             )
-            
+
             return response.choices[0].message.content
         except Exception as e:
-            print(f"OpenAI API调用失败: {e}")
+            logger.error("OpenAI API调用失败: %s", e)
             return self._simulate_response(prompt)
-    
+
+    async def generate_async(self, prompt: str, system_prompt: str = None,
+                             max_tokens: int = 2000, model: str = None) -> str:
+        """异步生成文本（openai.AsyncOpenAI，多个请求可在事件循环中并发等待）"""
+        self._ensure_client()
+        if self.aclient is None:
+            # 模拟模式
+            return self._simulate_response(prompt)
+
+        try:
+            messages = []
+            if system_prompt:
+                messages.append({"role": "system", "content": system_prompt})
+            messages.append({"role": "user", "content": prompt})
+
+            response = await self.aclient.chat.completions.create(
+                model=model or self.model,
+                messages=messages,
+                temperature=0.1,
+                max_tokens=max_tokens
+            )
+
+            return response.choices[0].message.content
+        except Exception as e:
+            logger.error("OpenAI API调用失败: %s", e)
+            return self._simulate_response(prompt)
+
+    def generate_stream(self, prompt: str, system_prompt: str = None):
+        """流式生成文本（stream=True，边生成边产出内容片段）"""
+        self._ensure_client()
+        if self.client is None:
+            # 模拟模式
+            yield self._simulate_response(prompt)
+            return
+
+        try:
+            messages = []
+            if system_prompt:
+                messages.append({"role": "system", "content": system_prompt})
+            messages.append({"role": "user", "content": prompt})
+
+            stream = self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=0.1,
+                max_tokens=2000,
+                stream=True
+            )
+
+            for chunk in stream:
+                if chunk.choices:
+                    yield chunk.choices[0].delta.content or ''
+        except Exception as e:
+            logger.error("OpenAI API调用失败: %s", e)
+            yield self._simulate_response(prompt)
+
     def _simulate_response(self, prompt: str) -> str:
         """模拟AI响应（用于测试）"""
         # 这是一个简化的模拟，实际使用时应该连接真实的LLM
-        return json.dumps({
-            "tasks": [
-                {
-                    "id": "simulated_task",
-                    "name": "模拟任务",
-                    "start_date": "2024-01-01",
-                    "duration": 5,
-                    "dependencies": []
-                }
-            ]
-        })
+        return _SIMULATED_RESPONSE
 
 
 class AIMermaidParser:
@@ -96,20 +536,50 @@ class AIMermaidParser:
                 self.core_llm_client = CoreLLMClient(provider, api_key)
                 self.llm_client = self._wrap_core_client()
             except Exception as e:
-                print(f"⚠️ LLM客户端初始化失败，将使用备用模式: {e}")
+                logger.warning("LLM客户端初始化失败，将使用备用模式: %s", e)
                 self.llm_client = None
                 
         self.fallback_parser = None  # 备用解析器
-        
+
+        # 解析结果缓存：键为归一化后的Mermaid代码。
+        # 底层LLMClient的响应缓存只对逐字节相同的请求生效，
+        # 这一层抹平缩进/空行差异，重复解析直接跳过两次LLM调用
+        self._parse_cache: Dict[str, Dict[str, Any]] = {}
+
+    @staticmethod
+    def _normalize_code(mermaid_code: str) -> str:
+        """归一化Mermaid代码作为缓存键：去掉缩进和空行差异"""
+        lines = (line.strip() for line in mermaid_code.splitlines())
+        return '\n'.join(line for line in lines if line)
+
     def _wrap_core_client(self):
         """包装核心LLM客户端以适配旧接口"""
         class WrappedClient(LLMClientBase):
             def __init__(self, core_client):
                 self.core_client = core_client
                 
-            def generate(self, prompt: str, system_prompt: str = None) -> str:
-                return self.core_client.simple_completion(prompt, system_prompt)
-        
+            def generate(self, prompt: str, system_prompt: str = None,
+                         max_tokens: int = 2000, model: str = None) -> str:
+                # 核心客户端的模型由提供商配置决定，忽略model参数
+                return self.core_client.simple_completion(
+                    prompt, system_prompt, max_tokens=max_tokens)
+
+            async def generate_async(self, prompt: str, system_prompt: str = None,
+                                     max_tokens: int = 2000, model: str = None) -> str:
+                messages = []
+                if system_prompt:
+                    messages.append({"role": "system", "content": system_prompt})
+                messages.append({"role": "user", "content": prompt})
+                return await self.core_client.achat_completion(
+                    messages, max_tokens=max_tokens)
+
+            def generate_stream(self, prompt: str, system_prompt: str = None):
+                messages = []
+                if system_prompt:
+                    messages.append({"role": "system", "content": system_prompt})
+                messages.append({"role": "user", "content": prompt})
+                yield from self.core_client.stream_completion(messages)
+
         return WrappedClient(self.core_llm_client)
         
     def set_fallback_parser(self, parser):
@@ -118,137 +588,311 @@ class AIMermaidParser:
     
     def parse(self, mermaid_code: str) -> ProjectPlan:
         """
-        使用AI解析Mermaid代码
-        
+        解析Mermaid代码
+
+        配置了本地解析器时优先走本地确定性解析：零token、零网络
+        往返且结果可复现，规范输入根本不需要LLM。只有本地解析抛出
+        异常时才调用LLM做修复式解析，并把失败原因一并发给模型。
+        未配置本地解析器时维持原有的AI优先路径。
+
         Args:
             mermaid_code: Mermaid Gantt 语法代码
-            
+
         Returns:
             解析后的项目计划对象
         """
+        if self.fallback_parser:
+            try:
+                return self.fallback_parser.parse(mermaid_code)
+            except Exception as e:
+                logger.warning("本地解析失败，交给AI修复: %s", e)
+                return self._parse_with_ai_repair(mermaid_code, str(e))
+
         try:
-            # 首先尝试AI解析
             return self._parse_with_ai(mermaid_code)
         except Exception as e:
-            print(f"AI解析失败: {e}")
-            # 如果AI解析失败，使用备用解析器
-            if self.fallback_parser:
-                return self.fallback_parser.parse(mermaid_code)
-            else:
-                raise RuntimeError("AI解析失败且无备用解析器")
-    
+            logger.error("AI解析失败: %s", e)
+            raise RuntimeError("AI解析失败且无备用解析器")
+
+    def _parse_with_ai_repair(self, mermaid_code: str,
+                              error_message: str) -> ProjectPlan:
+        """本地解析失败后的LLM修复式解析
+
+        在标准的纠错+解析提示后附上本地解析器的报错，
+        模型可以针对性地修复出问题的语法。
+        """
+        cache_key = self._normalize_code(mermaid_code)
+        cached = self._parse_cache.get(cache_key)
+        if cached is not None:
+            return self._convert_to_project_plan(cached)
+
+        prompt, system_prompt = self._correct_and_parse_prompts(mermaid_code)
+        prompt += f"\n\n本地解析器报告的错误：{error_message}"
+        parsed_data = _tiered_generate(self.llm_client, 'correct_parse',
+                                       prompt, system_prompt,
+                                       parse=self._parse_json_response)
+        self._parse_cache[cache_key] = parsed_data
+
+        return self._convert_to_project_plan(parsed_data)
+
     def _parse_with_ai(self, mermaid_code: str) -> ProjectPlan:
         """使用AI进行解析"""
-        # 步骤1：语法纠错
-        corrected_code = self._correct_syntax(mermaid_code)
-        
-        # 步骤2：智能解析
-        parsed_data = self._intelligent_parse(corrected_code)
-        
-        # 步骤3：转换为统一数据模型
+        cache_key = self._normalize_code(mermaid_code)
+        cached = self._parse_cache.get(cache_key)
+        if cached is not None:
+            # 缓存的是结构化数据，每次重新构建模型对象，调用方可放心修改
+            return self._convert_to_project_plan(cached)
+
+        # 纠错与解析融合为一次LLM往返
+        prompt, system_prompt = self._correct_and_parse_prompts(mermaid_code)
+        parsed_data = _tiered_generate(self.llm_client, 'correct_parse',
+                                       prompt, system_prompt,
+                                       parse=self._parse_json_response)
+        self._parse_cache[cache_key] = parsed_data
+
+        # 转换为统一数据模型
         return self._convert_to_project_plan(parsed_data)
-    
-    def _correct_syntax(self, mermaid_code: str) -> str:
-        """使用AI纠正语法错误"""
-        system_prompt = """你是一个Mermaid甘特图语法专家。你的任务是纠正用户提供的Mermaid代码中的语法错误，保持原意不变。
-        
-        纠正原则：
-        1. 保持任务名称、ID、日期、依赖关系等核心信息不变
-        2. 修正语法格式，使其符合标准Mermaid Gantt语法
-        3. 补充缺失的必要信息（如持续时间）
-        4. 统一日期格式
-        5. 确保依赖关系的正确性
-        
-        返回纠正后的Mermaid代码，不要添加任何解释。"""
-        
-        prompt = f"""请纠正以下Mermaid代码中的语法错误：
+
+    async def _parse_with_ai_async(self, mermaid_code: str) -> ProjectPlan:
+        """_parse_with_ai的异步版本：LLM调用在事件循环中等待"""
+        cache_key = self._normalize_code(mermaid_code)
+        cached = self._parse_cache.get(cache_key)
+        if cached is not None:
+            return self._convert_to_project_plan(cached)
+
+        prompt, system_prompt = self._correct_and_parse_prompts(mermaid_code)
+        parsed_data = await _atiered_generate(self.llm_client, 'correct_parse',
+                                              prompt, system_prompt,
+                                              parse=self._parse_json_response)
+        self._parse_cache[cache_key] = parsed_data
+
+        return self._convert_to_project_plan(parsed_data)
+
+    async def aparse_many(self, codes: List[str],
+                          max_concurrency: int = 8) -> List[ProjectPlan]:
+        """
+        并发解析多段Mermaid代码
+
+        不同代码段的网络等待相互重叠，N段代码的总耗时从N次往返
+        压缩到约一次往返；信号量限制同时在途的请求数，避免触发
+        服务端限流。
+
+        Args:
+            codes: Mermaid代码列表
+            max_concurrency: 最大并发数
+
+        Returns:
+            与输入顺序对应的项目计划列表
+        """
+        sem = asyncio.Semaphore(max_concurrency)
+
+        async def limited_parse(code):
+            async with sem:
+                try:
+                    return await self._parse_with_ai_async(code)
+                except Exception as e:
+                    logger.error("AI解析失败: %s", e)
+                    if self.fallback_parser:
+                        return self.fallback_parser.parse(code)
+                    raise RuntimeError("AI解析失败且无备用解析器")
+
+        return await asyncio.gather(*(limited_parse(code) for code in codes))
+
+    def parse_many(self, codes: List[str],
+                   max_concurrency: int = 8) -> List[ProjectPlan]:
+        """同步便捷方法：批量解析多段Mermaid代码（内部用asyncio并发执行）"""
+        return asyncio.run(self.aparse_many(codes, max_concurrency))
+
+    def _raw_openai_client(self):
+        """取底层的openai SDK客户端与模型名（Batch API需要直连SDK）"""
+        # SDK客户端是懒初始化的，取之前先确保已构建
+        ensure = getattr(self.llm_client, '_ensure_client', None)
+        if ensure is not None:
+            ensure()
+        client = getattr(self.llm_client, 'client', None)
+        model = getattr(self.llm_client, 'model', None)
+        if client is None:
+            core = getattr(self, 'core_llm_client', None)
+            if core is not None:
+                client = core.client
+                model = core.model
+        return client, model
+
+    def parse_batch(self, codes: List[str],
+                    poll_interval: float = 10.0,
+                    timeout: float = 86400.0) -> List[ProjectPlan]:
+        """通过Batch API离线批量解析多段Mermaid代码
+
+        适合对延迟不敏感的离线流水线：所有请求打包成一个.jsonl文件
+        一次性提交，服务端在24小时窗口内异步执行，按折扣价计费且
+        不占用实时接口的限流配额。交互场景请继续用parse()/parse_many()。
+
+        Args:
+            codes: Mermaid代码列表
+            poll_interval: 初始轮询间隔（秒），之后指数退避
+            timeout: 等待批任务完成的最长时间（秒）
+
+        Returns:
+            与输入顺序对应的项目计划列表
+        """
+        client, model = self._raw_openai_client()
+        if client is None:
+            logger.warning("当前LLM客户端不支持Batch API，改用并发实时调用")
+            return self.parse_many(codes)
+
+        # 每段代码一行请求，custom_id按输入下标编号，便于结果按序还原
+        lines = []
+        for i, code in enumerate(codes):
+            prompt, system_prompt = self._correct_and_parse_prompts(code)
+            lines.append(json.dumps({
+                "custom_id": f"parse-{i}",
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": model,
+                    "messages": [
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": prompt},
+                    ],
+                    "temperature": 0.1,
+                    "max_tokens": 2000,
+                },
+            }, ensure_ascii=False))
+        payload = '\n'.join(lines).encode('utf-8')
+
+        batch_file = client.files.create(file=io.BytesIO(payload),
+                                         purpose="batch")
+        batch = client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+        )
+
+        # 轮询间隔指数退避，封顶5分钟，长任务不做无谓的空转请求
+        interval = poll_interval
+        deadline = time.monotonic() + timeout
+        while batch.status not in ("completed", "failed", "expired", "cancelled"):
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"Batch任务等待超时: {batch.id}")
+            time.sleep(interval)
+            interval = min(interval * 2, 300.0)
+            batch = client.batches.retrieve(batch.id)
+
+        if batch.status != "completed" or not batch.output_file_id:
+            raise RuntimeError(f"Batch任务未成功完成: {batch.id} ({batch.status})")
+
+        responses = {}
+        output_text = client.files.content(batch.output_file_id).text
+        for line in output_text.splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            body = (record.get('response') or {}).get('body') or {}
+            choices = body.get('choices') or []
+            if choices:
+                responses[record['custom_id']] = choices[0]['message']['content']
+
+        plans = []
+        for i, code in enumerate(codes):
+            response = responses.get(f"parse-{i}")
+            try:
+                if response is None:
+                    raise ValueError("Batch结果中缺少该请求的响应")
+                parsed_data = self._parse_json_response(response)
+                self._parse_cache[self._normalize_code(code)] = parsed_data
+                plans.append(self._convert_to_project_plan(parsed_data))
+            except Exception as e:
+                logger.error("AI解析失败: %s", e)
+                if self.fallback_parser:
+                    plans.append(self.fallback_parser.parse(code))
+                else:
+                    raise RuntimeError("AI解析失败且无备用解析器")
+        return plans
+
+    def parse_stream(self, mermaid_code: str):
+        """流式解析：任务对象随LLM生成逐个产出
+
+        以流式方式接收融合调用的响应，tasks数组里每关闭一个对象就
+        立即构建并产出一个Task，首个任务的等待时间从整段响应的生成
+        时长缩短到首个对象的生成时长，适合进度式交互界面。
+        完整的ProjectPlan仍请使用parse()。
+
+        Yields:
+            Task: 按响应中出现的顺序产出的任务对象
+        """
+        prompt, system_prompt = self._correct_and_parse_prompts(mermaid_code)
+        chunks = self.llm_client.generate_stream(prompt, system_prompt)
+        for obj_str in _iter_json_array_objects(chunks):
+            yield self._build_task(json.loads(obj_str))
+
+    def _correct_and_parse_prompts(self, mermaid_code: str) -> tuple:
+        """构造"纠错+解析"融合调用的(prompt, system_prompt)
+
+        原本语法纠错和结构化解析是两次串行LLM调用，各付一次网络往返
+        和几乎相同的上下文预填充；融合为一个提示后，单次响应同时给出
+        纠正后的代码和结构化数据，延迟和token消耗都减半。
+
+        代码先做空白归一化：等价的输入发送完全相同的提示，
+        既省掉缩进填充token，也提高服务端前缀缓存的命中率。
+        """
+        system_prompt = _SYS_CORRECT_AND_PARSE
+
+        prompt = f"""请纠正并解析以下Mermaid代码，返回结构化的任务数据：
 
 ```mermaid
-{mermaid_code}
+{self._normalize_code(mermaid_code)}
 ```"""
-        
-        corrected = self.llm_client.generate(prompt, system_prompt)
-        
-        # 提取Mermaid代码部分
-        mermaid_match = re.search(r'```mermaid\n(.*?)\n```', corrected, re.DOTALL)
+
+        return prompt, system_prompt
+
+    @staticmethod
+    def _extract_mermaid_block(response: str) -> str:
+        """从LLM响应中提取Mermaid代码部分，没有代码块时原样返回"""
+        mermaid_match = _MERMAID_BLOCK_RE.search(response)
         if mermaid_match:
             return mermaid_match.group(1)
-        
-        return corrected
-    
-    def _intelligent_parse(self, mermaid_code: str) -> Dict[str, Any]:
-        """智能解析Mermaid代码"""
-        system_prompt = """你是一个Mermaid甘特图解析专家。你的任务是将Mermaid代码解析为结构化的任务数据。
-        
-        解析要求：
-        1. 提取所有任务信息，包括：任务ID、名称、状态、开始日期、持续时间、依赖关系
-        2. 识别里程碑任务（标记为milestone状态）
-        3. 确定任务所属的阶段（section）
-        4. 计算任务的结束日期
-        5. 验证依赖关系的正确性
-        
-        返回JSON格式的数据，包含以下字段：
-        - title: 项目标题
-        - date_format: 日期格式
-        - sections: 项目阶段列表
-        - tasks: 任务列表，每个任务包含：
-          - id: 任务ID
-          - name: 任务名称
-          - status: 状态列表
-          - section: 所属阶段
-          - is_milestone: 是否为里程碑
-          - start_date: 开始日期
-          - end_date: 结束日期
-          - duration: 持续时间（天数）
-          - dependencies: 依赖的任务ID列表
-        
-        确保返回的是有效的JSON格式。"""
-        
-        prompt = f"""请解析以下Mermaid代码，返回结构化的任务数据：
 
-```mermaid
-{mermaid_code}
-```"""
-        
-        response = self.llm_client.generate(prompt, system_prompt)
-        
-        # 解析JSON响应
+        return response
+
+    @staticmethod
+    def _parse_json_response(response: str) -> Dict[str, Any]:
+        """从LLM响应中提取并解析JSON数据"""
         try:
-            # 尝试提取JSON部分
-            json_match = re.search(r'\{.*\}', response, re.DOTALL)
-            if json_match:
-                json_str = json_match.group(0)
-                return json.loads(json_str)
-            else:
-                return json.loads(response)
+            return _loads_lenient(response)
         except json.JSONDecodeError as e:
-            print(f"JSON解析失败: {e}")
-            print(f"原始响应: {response}")
+            logger.error("JSON解析失败: %s；原始响应: %s", e, response)
             raise ValueError("AI返回的数据格式不正确")
-    
+
+    def _build_task(self, task_data: Dict[str, Any]) -> Task:
+        """从解析出的字典构建单个Task对象
+
+        缺省字段用一次dict合并补齐，在C层完成，代替逐字段的.get调用；
+        日期字符串交给记忆化的_parse_date转换。可变默认值（列表）会被
+        pydantic校验时复制，跨任务共享是安全的。
+        """
+        merged = _TASK_DEFAULTS | task_data
+        merged['start_date'] = self._parse_date(merged['start_date'])
+        merged['end_date'] = self._parse_date(merged['end_date'])
+        return Task(**merged)
+
+    # 超过该规模才值得把任务构建分发到线程池，小计划线程开销反而更贵
+    _PARALLEL_BUILD_THRESHOLD = 512
+
     def _convert_to_project_plan(self, parsed_data: Dict[str, Any]) -> ProjectPlan:
-        """转换为统一的项目计划对象"""
-        tasks = []
-        
-        # 创建任务对象
-        for task_data in parsed_data.get('tasks', []):
-            # 解析日期
-            start_date = self._parse_date(task_data.get('start_date'))
-            end_date = self._parse_date(task_data.get('end_date'))
-            
-            task = Task(
-                id=task_data.get('id', ''),
-                name=task_data.get('name', ''),
-                status=task_data.get('status', []),
-                section=task_data.get('section'),
-                is_milestone=task_data.get('is_milestone', False),
-                start_date=start_date,
-                end_date=end_date,
-                duration=task_data.get('duration'),
-                dependencies=task_data.get('dependencies', [])
-            )
-            tasks.append(task)
-        
+        """转换为统一的项目计划对象
+
+        每行任务的构建相互独立，大计划分发到线程池并行执行
+        （pydantic的核心校验在Rust层进行，会释放GIL）；
+        小计划仍走单线程，避免为几百个对象付线程池的启动开销。
+        """
+        task_dicts = parsed_data.get('tasks', [])
+        if len(task_dicts) > self._PARALLEL_BUILD_THRESHOLD:
+            with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+                tasks = list(executor.map(self._build_task, task_dicts,
+                                          chunksize=256))
+        else:
+            tasks = [self._build_task(task_data) for task_data in task_dicts]
+
         # 创建项目计划
         project_plan = ProjectPlan(
             title=parsed_data.get('title', 'AI解析的项目'),
@@ -261,78 +905,44 @@ class AIMermaidParser:
         return project_plan
     
     def _parse_date(self, date_str: str) -> Optional[date]:
-        """解析日期字符串"""
+        """解析日期字符串（结果按字符串记忆化，见_parse_date_cached）"""
         if not date_str:
             return None
-        
-        try:
-            # 尝试常见格式
-            for fmt in ['%Y-%m-%d', '%Y/%m/%d', '%d/%m/%Y', '%m/%d/%Y']:
-                try:
-                    dt = datetime.strptime(date_str, fmt)
-                    return dt.date()
-                except ValueError:
-                    continue
-        except Exception:
-            pass
-        
-        print(f"警告：无法解析日期: '{date_str}'")
-        return None
+        return _parse_date_cached(date_str)
     
     def natural_language_to_mermaid(self, description: str) -> str:
         """将自然语言描述转换为Mermaid代码"""
-        system_prompt = """你是一个项目规划专家。你的任务是将用户的自然语言描述转换为标准的Mermaid甘特图代码。
-        
-        转换要求：
-        1. 识别项目中的主要任务和里程碑
-        2. 确定任务之间的依赖关系
-        3. 合理安排任务的时间顺序
-        4. 使用标准的Mermaid Gantt语法
-        5. 添加适当的section来组织任务
-        
-        返回完整的Mermaid代码，包含必要的dateFormat和title。"""
+        system_prompt = _SYS_NL_TO_MERMAID
         
         prompt = f"""请将以下项目描述转换为Mermaid甘特图代码：
 
 {description}"""
-        
-        response = self.llm_client.generate(prompt, system_prompt)
-        
+
+        response = _tiered_generate(self.llm_client, 'nl2mermaid',
+                                    prompt, system_prompt)
+
         # 提取Mermaid代码部分
-        mermaid_match = re.search(r'```mermaid\n(.*?)\n```', response, re.DOTALL)
-        if mermaid_match:
-            return mermaid_match.group(1)
-        
-        return response
-    
+        return self._extract_mermaid_block(response)
+
     def optimize_project_plan(self, project_plan: ProjectPlan) -> ProjectPlan:
         """使用AI优化项目计划"""
         # 将项目计划转换为描述
         description = self._project_plan_to_description(project_plan)
         
-        system_prompt = """你是一个项目管理专家。你的任务是优化项目计划，提供更好的建议。
-        
-        优化方向：
-        1. 识别并解决依赖冲突
-        2. 优化任务时间安排
-        3. 建议关键路径优化
-        4. 提供风险评估
-        5. 建议资源分配优化
-        
-        返回优化后的项目计划数据，格式与输入相同。"""
+        system_prompt = _SYS_OPTIMIZE
         
         prompt = f"""请优化以下项目计划：
 
 {description}"""
-        
-        response = self.llm_client.generate(prompt, system_prompt)
-        
+
         try:
             # 解析优化后的数据
-            optimized_data = json.loads(response)
+            optimized_data = _tiered_generate(self.llm_client, 'optimize',
+                                              prompt, system_prompt,
+                                              parse=_loads_lenient)
             return self._convert_to_project_plan(optimized_data)
         except Exception as e:
-            print(f"优化解析失败: {e}")
+            logger.error("优化解析失败: %s", e)
             return project_plan
     
     def _project_plan_to_description(self, project_plan: ProjectPlan) -> str:
@@ -358,88 +968,46 @@ class AIMermaidValidator:
     
     def validate(self, mermaid_code: str) -> tuple:
         """使用AI验证Mermaid代码"""
-        system_prompt = """你是一个Mermaid甘特图语法专家。你的任务是验证用户提供的Mermaid代码的正确性。
-        
-        验证内容：
-        1. 语法正确性
-        2. 依赖关系的完整性
-        3. 日期格式的一致性
-        4. 任务信息的完整性
-        5. 循环依赖检测
-        
-        返回JSON格式的验证结果：
-        {
-            "is_valid": true/false,
-            "errors": ["错误1", "错误2"],
-            "warnings": ["警告1", "警告2"],
-            "suggestions": ["建议1", "建议2"]
-        }"""
+        system_prompt = _SYS_VALIDATE
         
         prompt = f"""请验证以下Mermaid代码的正确性：
 
 ```mermaid
 {mermaid_code}
 ```"""
-        
-        response = self.llm_client.generate(prompt, system_prompt)
-        
+
         try:
             # 解析JSON响应
-            json_match = re.search(r'\{.*\}', response, re.DOTALL)
-            if json_match:
-                json_str = json_match.group(0)
-                result = json.loads(json_str)
-                return (
-                    result.get('is_valid', False),
-                    result.get('errors', []),
-                    result.get('warnings', [])
-                )
-            else:
-                result = json.loads(response)
-                return (
-                    result.get('is_valid', False),
-                    result.get('errors', []),
-                    result.get('warnings', [])
-                )
+            result = _tiered_generate(self.llm_client, 'validate',
+                                      prompt, system_prompt,
+                                      parse=_loads_lenient)
+            return (
+                result.get('is_valid', False),
+                result.get('errors', []),
+                result.get('warnings', [])
+            )
         except Exception as e:
-            print(f"验证解析失败: {e}")
+            logger.error("验证解析失败: %s", e)
             return False, ["AI验证失败"], []
     
     def suggest_improvements(self, mermaid_code: str) -> List[str]:
         """使用AI提供改进建议"""
-        system_prompt = """你是一个Mermaid甘特图专家。请为用户提供的Mermaid代码提供改进建议。
-        
-        建议方向：
-        1. 语法优化
-        2. 结构改进
-        3. 可读性提升
-        4. 最佳实践应用
-        
-        返回JSON格式的建议列表：
-        {
-            "suggestions": ["建议1", "建议2", "建议3"]
-        }"""
+        system_prompt = _SYS_SUGGEST
         
         prompt = f"""请为以下Mermaid代码提供改进建议：
 
 ```mermaid
 {mermaid_code}
 ```"""
-        
-        response = self.llm_client.generate(prompt, system_prompt)
-        
+
         try:
             # 解析JSON响应
-            json_match = re.search(r'\{.*\}', response, re.DOTALL)
-            if json_match:
-                json_str = json_match.group(0)
-                result = json.loads(json_str)
-                return result.get('suggestions', [])
-            else:
-                result = json.loads(response)
-                return result.get('suggestions', [])
+            result = _tiered_generate(self.llm_client, 'suggest',
+                                      prompt, system_prompt,
+                                      parse=_loads_lenient)
+            return result.get('suggestions', [])
         except Exception as e:
-            print(f"建议解析失败: {e}")
+            logger.error("建议解析失败: %s", e)
             return []
 
 
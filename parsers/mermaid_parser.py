@@ -4,12 +4,189 @@ TaskWeaver AI Mermaid 甘特图解析器
 重构后的解析器，基于原始实现适配统一数据模型。
 """
 
+import io
 import re
+import sys
 from datetime import datetime, date
+from functools import lru_cache
 from typing import List, Dict, Optional
 
 from core.models import Task, ProjectPlan
 
+# 预编译的语法正则：模块加载时编译一次，解析器与验证器共享同一批
+# 编译结果，逐行循环里不再走re模块的字符串键缓存查找
+_DEP_RE = re.compile(r'after\s+([a-zA-Z0-9_-]+)')
+# 任务行各字段的字符集（与原任务行正则保持一致）
+_ID_RE = re.compile(r'^[a-zA-Z0-9_-]+$')
+_INFO_RE = re.compile(r'^[a-zA-Z0-9\s/_-]+$')
+# dateFormat里应出现的日期占位符，验证时用于提示可疑格式
+_DATE_PLACEHOLDERS = ('YYYY', 'YY', 'MM', 'DD')
+
+# Mermaid日期占位符 -> strptime指令：逐token翻译代替整串查表，
+# 任意组合的格式（如DD/MM/YYYY）都能翻译，不再悄悄落回默认格式
+_MERMAID_TOKEN_RE = re.compile(r'YYYY|YY|MM|DD|HH|mm|ss')
+_MERMAID_TOKENS = {
+    'YYYY': '%Y', 'YY': '%y', 'MM': '%m', 'DD': '%d',
+    'HH': '%H', 'mm': '%M', 'ss': '%S',
+}
+
+
+@lru_cache(maxsize=64)
+def _convert_mermaid_format(mermaid_format: str) -> str:
+    """把Mermaid日期格式逐占位符翻译成strptime格式
+
+    识别不出任何占位符时保持旧行为，落回默认的%Y-%m-%d。
+    """
+    converted, count = _MERMAID_TOKEN_RE.subn(
+        lambda m: _MERMAID_TOKENS[m.group(0)], mermaid_format
+    )
+    if count == 0:
+        return '%Y-%m-%d'
+    return converted
+
+
+# 常见纯日期格式 -> (形状正则, (年,月,日)的捕获组下标)：
+# 匹配后直接按段取数构造date，绕开strptime每次调用都要
+# 重新解析格式串的开销
+_FAST_DATE_RES = {
+    '%Y-%m-%d': (re.compile(r'(\d{4})-(\d{1,2})-(\d{1,2})$'), (1, 2, 3)),
+    '%Y/%m/%d': (re.compile(r'(\d{4})/(\d{1,2})/(\d{1,2})$'), (1, 2, 3)),
+    '%d-%m-%Y': (re.compile(r'(\d{1,2})-(\d{1,2})-(\d{4})$'), (3, 2, 1)),
+    '%d/%m/%Y': (re.compile(r'(\d{1,2})/(\d{1,2})/(\d{4})$'), (3, 2, 1)),
+    '%m/%d/%Y': (re.compile(r'(\d{1,2})/(\d{1,2})/(\d{4})$'), (2, 3, 1)),
+}
+
+
+@lru_cache(maxsize=1024)
+def _parse_date_cached(date_str: str, primary_fmt: str) -> Optional[date]:
+    """解析日期字符串
+
+    strptime很慢，而同一计划里日期大量重复（同一section的任务常
+    共享开始日期），按(字符串, 主格式)记忆化后重复解析只剩一次
+    字典查找。date对象不可变，跨调用共享是安全的。
+    """
+    # 最常见的%Y-%m-%d走C实现的fromisoformat，比strptime快数倍
+    if primary_fmt == '%Y-%m-%d' and len(date_str) == 10:
+        try:
+            return date.fromisoformat(date_str)
+        except ValueError:
+            pass
+
+    # 其余常见纯日期格式按预编译正则直接取数构造
+    fast = _FAST_DATE_RES.get(primary_fmt)
+    if fast is not None:
+        m = fast[0].match(date_str)
+        if m:
+            yi, mi, di = fast[1]
+            try:
+                return date(int(m[yi]), int(m[mi]), int(m[di]))
+            except ValueError:
+                pass  # 段值越界（如13月），落回通用路径
+
+    try:
+        # 尝试按照配置的日期格式解析（带时间段或两位年份的格式走这里）
+        return datetime.strptime(date_str, primary_fmt).date()
+    except ValueError:
+        # 尝试常见格式
+        for fmt in ('%Y-%m-%d', '%Y/%m/%d', '%d/%m/%Y', '%m/%d/%Y'):
+            try:
+                return datetime.strptime(date_str, fmt).date()
+            except ValueError:
+                continue
+
+    print(f"警告：无法解析日期: '{date_str}'")
+    return None
+
+
+# 无状态任务行共享同一个空元组，省掉逐行的空列表分配
+_EMPTY_STATUS = ()
+
+
+def _split_task_line(line: str):
+    """把任务行切成 (名称, ID, 状态列表, 开始信息, 结束信息)，失败返回None
+
+    原来的多分支任务行正则带着可选组和重叠字符类，畸形行上回溯
+    严重；这里换成partition/split分词，每个字段只做一次线性扫描。
+    行为与原正则逐点对齐：
+    - 名称里允许出现冒号（逐个冒号位置尝试，等价于正则对name的回溯）
+    - ID紧跟逗号，尾部不允许空格；字符集[a-zA-Z0-9_-]
+    - 状态是ID之后连续的纯ASCII字母词，但至少要给开始信息留一个字段
+    - 开始/结束信息的字符集[a-zA-Z0-9\\s/_-]，字段数超出即整行不匹配
+    """
+    idx = line.find(':')
+    while idx != -1:
+        result = _try_split_at(line, idx)
+        if result is not None:
+            return result
+        idx = line.find(':', idx + 1)
+    return None
+
+
+def _try_split_at(line: str, idx: int):
+    """尝试以line[idx]处的冒号为名称/字段分界做切分"""
+    name = line[:idx].strip()
+    if not name:
+        return None
+
+    parts = line[idx + 1:].split(',')
+    task_id = parts[0].lstrip()
+    if not _ID_RE.match(task_id):
+        return None
+    # 任务ID在依赖解析、集合差和索引构建里反复做相等比较，
+    # 驻留后同一ID全计划共享一个对象，比较先走指针相等
+    task_id = sys.intern(task_id)
+
+    fields = parts[1:]
+    if not fields:
+        return None  # 开始信息是必填字段
+
+    # 数ID之后连续的纯字母状态词，但最后一个字段必须留给开始信息。
+    # 状态词后面必须紧跟逗号（只去左空白），带尾部空格的字段不算状态
+    n = len(fields)
+    k = 0
+    while k < n - 1:
+        word = fields[k].lstrip()
+        if word and word.isascii() and word.isalpha():
+            k += 1
+        else:
+            break
+
+    # 原正则的空状态分支：紧跟ID的空字段可以被状态组整个吞掉
+    # （状态为空），且该解释优先于把空字段当开始信息
+    if k == 0 and n >= 2 and not fields[0].strip():
+        tail = _pick_start_end(fields[1:])
+        if tail is not None:
+            return (name, task_id, _EMPTY_STATUS) + tail
+
+    if n - k > 2:
+        return None  # 状态之后最多只有开始+结束两个字段
+
+    tail = _pick_start_end(fields[k:])
+    if tail is None:
+        return None
+    # 状态词表很小（done/active/crit/milestone），驻留后同一词全计划
+    # 共享一个字符串对象，下游的 'milestone' in status 先走指针比较。
+    # 常见的0/1个状态词走快路径，不为每行分配新容器
+    if k == 0:
+        status = _EMPTY_STATUS
+    elif k == 1:
+        status = (sys.intern(fields[0].strip()),)
+    else:
+        status = tuple(sys.intern(fields[i].strip()) for i in range(k))
+    return (name, task_id, status) + tail
+
+
+def _pick_start_end(fields):
+    """校验开始/结束字段并返回(start_info, end_info)，不合法返回None"""
+    if len(fields) > 2:
+        return None
+    for field in fields:
+        if not field or not _INFO_RE.match(field):
+            return None
+    start_info = fields[0].strip()
+    end_info = fields[1].strip() if len(fields) == 2 else None
+    return start_info, end_info
+
 
 class MermaidParser:
     """
@@ -23,99 +200,186 @@ class MermaidParser:
         self.date_format = "%Y-%m-%d"
         self.title = "甘特图"
         self.sections = []
-        self.tasks_data = []
-        
+        self.tasks = []
+        self._current_section = None
+        # 阶段名驻留表：同一section下的所有任务共享一个字符串对象
+        self._section_interns = {}
+
+    def _handle_gantt(self, rest: str):
+        """gantt声明行，无需处理"""
+        pass
+
+    def _handle_datefmt(self, rest: str):
+        """dateFormat行：把Mermaid日期格式转换为Python日期格式"""
+        if rest:
+            self.date_format = self._convert_mermaid_to_python_format(rest)
+
+    def _handle_title(self, rest: str):
+        """title行"""
+        if rest:
+            self.title = rest
+
+    def _handle_section(self, rest: str):
+        """section行：切换当前阶段"""
+        if rest:
+            rest = self._section_interns.setdefault(rest, sys.intern(rest))
+            self._current_section = rest
+            self.sections.append(rest)
+
+    # 关键字 -> 处理方法的分发表（类属性，构建一次）
+    _DISPATCH = {
+        'gantt': _handle_gantt,
+        'dateFormat': _handle_datefmt,
+        'title': _handle_title,
+        'section': _handle_section,
+    }
+
     def parse(self, mermaid_code: str) -> ProjectPlan:
         """
         解析 Mermaid 甘特图代码
-        
+
         Args:
             mermaid_code: Mermaid Gantt 语法代码
-            
+
         Returns:
             解析后的项目计划对象
         """
+        plan, _, errors, _ = self.parse_and_validate(mermaid_code)
+        if plan is None:
+            # 与旧行为兼容：计划无法构建时抛ValueError
+            #（pydantic的ValidationError本身就是ValueError的子类）
+            raise ValueError('；'.join(errors))
+        return plan
+
+    @classmethod
+    def parse_cached(cls, mermaid_code: str) -> ProjectPlan:
+        """按源码文本记忆化的解析入口
+
+        解析是纯计算，相同输入（CI里反复跑同一份示例很常见）直接
+        复用缓存结果，整个分词、构建阶段全部跳过。返回深拷贝：
+        CoreProcessor.calculate_dates会原地改写任务日期，共享缓存
+        实例会被污染。
+        """
+        return cls._parse_memoized(mermaid_code).model_copy(deep=True)
+
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _parse_memoized(mermaid_code: str) -> ProjectPlan:
+        return MermaidParser().parse(mermaid_code)
+
+    def parse_and_validate(self, mermaid_code: str) -> tuple:
+        """
+        单遍完成解析与验证
+
+        解析器和验证器原本各自逐行走一遍同样的分词逻辑，解析+验证
+        的流水线每行要付两倍的切分成本；融合后一次遍历同时产出
+        计划对象和验证结果。
+
+        Args:
+            mermaid_code: Mermaid Gantt 语法代码
+
+        Returns:
+            (项目计划或None, 是否有效, 错误列表, 警告列表)
+        """
         # 重置状态
-        self.tasks_data = []
+        self.tasks = []
         self.sections = []
-        
-        lines = mermaid_code.splitlines()
-        current_section = None
+        self._current_section = None
 
-        for line in lines:
+        # 空输入快路径：不必铺开行循环和校验簿记，直接给出空计划
+        #（计划对象可变且会被处理引擎原地改写，不能共享常量实例）
+        if not mermaid_code or mermaid_code.isspace():
+            return self._convert_to_project_plan(), True, [], []
+
+        errors = []
+        warnings = []
+        task_ids = set()
+        dep_edges = []  # (行号, 依赖ID)，收集一遍最后统一做集合差
+        task_construction_failed = False
+
+        # io.StringIO按行惰性产出（C实现），免去splitlines一次性
+        # 物化整个行列表，大文件峰值内存减半
+        for line_num, line in enumerate(io.StringIO(mermaid_code), 1):
             line = line.strip()
-            if not line or line.startswith('%') or line.startswith('%%'):
+            if not line or line[0] == '%':
                 continue
 
-            if line.startswith('gantt'):
-                pass
-            elif line.startswith('dateFormat'):
-                match = re.search(r'dateFormat\s+(.*)', line)
-                if match:
-                    mermaid_format = match.group(1).strip()
-                    # 将 Mermaid 日期格式转换为 Python 日期格式
-                    self.date_format = self._convert_mermaid_to_python_format(mermaid_format)
-            elif line.startswith('title'):
-                match = re.search(r'title\s+(.*)', line)
-                if match:
-                    self.title = match.group(1).strip()
-            elif line.startswith('section'):
-                match = re.search(r'section\s+(.*)', line)
-                if match:
-                    current_section = match.group(1).strip()
-                    self.sections.append(current_section)
-            else:
-                # 任务行解析 - 支持中文和更灵活的格式
-                task_match = re.match(
-                    r'^(.+?)\s*:\s*([a-zA-Z0-9_-]+)'  # 任务名称和ID (支持中文)
-                    r'(?:,\s*([a-zA-Z]+(?:,\s*[a-zA-Z]+)*)?)?' # 可选的状态关键词列表
-                    r'(?:,\s*([a-zA-Z0-9\s/_-]+))'          # 开始信息 (日期或 'after ID') - 支持下划线
-                    r'(?:,\s*([a-zA-Z0-9\s/_-]+))?$'    # 可选的结束信息 (日期或持续天数) - 支持下划线
-                    , line
-                )
-                
-                if task_match:
-                    name = task_match.group(1).strip()
-                    task_id = task_match.group(2).strip()
-                    status_str = task_match.group(3)
-                    start_info = task_match.group(4).strip()
-                    end_info = task_match.group(5)
-                    end_info = end_info.strip() if end_info else None
-
-                    # 解析状态关键词
-                    status = [s.strip() for s in status_str.split(',') if s.strip()] if status_str else []
-                    
-                    is_milestone = 'milestone' in status
-                    dependency_id = None
-                    
-                    # 检查开始信息中是否包含依赖关系
-                    dep_match = re.match(r'after\s+([a-zA-Z0-9_-]+)', start_info)
-                    if dep_match:
-                        dependency_id = dep_match.group(1)
-
-                    # 解析日期和持续时间
-                    start_date, end_date, duration = self._parse_date_info(
-                        start_info, end_info, is_milestone, dependency_id is not None
-                    )
-
-                    task_data = {
-                        'id': task_id,
-                        'name': name,
-                        'status': status,
-                        'section': current_section,
-                        'is_milestone': is_milestone,
-                        'start_date': start_date,
-                        'end_date': end_date,
-                        'duration': duration,
-                        'dependencies': [dependency_id] if dependency_id else []
-                    }
-                    self.tasks_data.append(task_data)
-                else:
-                    print(f"警告：无法解析任务行: '{line}'")
-        
-        # 转换为统一的数据模型
-        return self._convert_to_project_plan()
-    
+            # 首个空白分隔的词做一次字典分发，代替逐关键字的startswith级联
+            parts = line.split(None, 1)
+            handler = self._DISPATCH.get(parts[0])
+            if handler is not None:
+                # 行已strip且split(None,1)吞掉了剩余部分的前导空白，
+                # rest两端都已干净，无需再strip一次
+                rest = parts[1] if len(parts) > 1 else ''
+                handler(self, rest)
+                if parts[0] == 'dateFormat':
+                    if not rest:
+                        errors.append(f"第{line_num}行：日期格式语法错误")
+                    elif not any(ph in rest for ph in _DATE_PLACEHOLDERS):
+                        warnings.append(f"第{line_num}行：日期格式可能不正确")
+                continue
+
+            # 任务行解析 - 支持中文和更灵活的格式
+            task_fields = _split_task_line(line)
+            if task_fields is None:
+                print(f"警告：无法解析任务行: '{line}'")
+                errors.append(f"第{line_num}行：任务语法错误: '{line}'")
+                continue
+
+            name, task_id, status, start_info, end_info = task_fields
+
+            is_milestone = 'milestone' in status
+            dependency_id = None
+
+            # 检查开始信息中是否包含依赖关系
+            dep_match = _DEP_RE.match(start_info)
+            if dep_match:
+                # 依赖ID与被指向任务的ID驻留到同一对象，'after X'的
+                # X和taskX的ID做相等比较时直接指针命中
+                dependency_id = sys.intern(dep_match.group(1))
+                dep_edges.append((line_num, dependency_id))
+            task_ids.add(task_id)
+
+            # 解析日期和持续时间
+            start_date, end_date, duration = self._parse_date_info(
+                start_info, end_info, is_milestone, dependency_id is not None
+            )
+
+            # 直接构建Task对象，省掉先攒字典再二次遍历转换的一轮分配
+            try:
+                self.tasks.append(Task(
+                    id=task_id,
+                    name=name,
+                    status=status,
+                    section=self._current_section,
+                    is_milestone=is_milestone,
+                    start_date=start_date,
+                    end_date=end_date,
+                    duration=duration,
+                    dependencies=[dependency_id] if dependency_id else []
+                ))
+            except ValueError as e:
+                errors.append(f"第{line_num}行：{e}")
+                task_construction_failed = True
+
+        # 检查是否有依赖的任务不存在：一次集合差找出缺失ID，
+        # 再按原始边列表回填行号，同一缺失被多行引用时逐行报错
+        missing = {dep for _, dep in dep_edges} - task_ids
+        if missing:
+            for line_num, dep in dep_edges:
+                if dep in missing:
+                    errors.append(f"第{line_num}行：依赖的任务 '{dep}' 不存在")
+
+        # 转换为统一的数据模型（模型层自身的校验失败也记为错误）
+        plan = None
+        if not task_construction_failed:
+            try:
+                plan = self._convert_to_project_plan()
+            except ValueError as e:
+                errors.append(str(e))
+
+        return plan, len(errors) == 0, errors, warnings
+
     def _parse_date_info(self, start_info: str, end_info: str, 
                         is_milestone: bool, has_dependency: bool) -> tuple:
         """
@@ -162,28 +426,10 @@ class MermaidParser:
         return start_date, end_date, duration
     
     def _parse_date(self, date_str: str) -> Optional[date]:
-        """解析日期字符串"""
+        """解析日期字符串（按(字符串, 主格式)记忆化，见_parse_date_cached）"""
         if not date_str:
             return None
-        
-        try:
-            # 尝试按照配置的日期格式解析
-            dt = datetime.strptime(date_str, self.date_format)
-            return dt.date()
-        except ValueError:
-            try:
-                # 尝试常见格式
-                for fmt in ['%Y-%m-%d', '%Y/%m/%d', '%d/%m/%Y', '%m/%d/%Y']:
-                    try:
-                        dt = datetime.strptime(date_str, fmt)
-                        return dt.date()
-                    except ValueError:
-                        continue
-            except Exception:
-                pass
-        
-        print(f"警告：无法解析日期: '{date_str}'")
-        return None
+        return _parse_date_cached(date_str, self.date_format)
     
     def _convert_mermaid_to_python_format(self, mermaid_format: str) -> str:
         """
@@ -201,53 +447,24 @@ class MermaidParser:
         Returns:
             Python 日期格式字符串
         """
-        format_mapping = {
-            'YYYY-MM-DD': '%Y-%m-%d',
-            'YYYY/MM/DD': '%Y/%m/%d',
-            'DD-MM-YYYY': '%d-%m-%Y',
-            'MM-DD-YYYY': '%m-%d-%Y',
-            'YYYY-MM': '%Y-%m',
-            'YYYY/MM': '%Y/%m',
-            'MM-YYYY': '%m-%Y',
-            'MM/YYYY': '%m/%Y',
-        }
-        
-        return format_mapping.get(mermaid_format, '%Y-%m-%d')
+        return _convert_mermaid_format(mermaid_format)
     
     def _convert_to_project_plan(self) -> ProjectPlan:
-        """转换为统一的项目计划对象"""
-        tasks = []
-        
-        # 创建任务对象
-        for task_data in self.tasks_data:
-            task = Task(
-                id=task_data['id'],
-                name=task_data['name'],
-                status=task_data['status'],
-                section=task_data['section'],
-                is_milestone=task_data['is_milestone'],
-                start_date=task_data['start_date'],
-                end_date=task_data['end_date'],
-                duration=task_data['duration'],
-                dependencies=task_data['dependencies']
-            )
-            tasks.append(task)
-        
-        # 创建项目计划
-        project_plan = ProjectPlan(
+        """转换为统一的项目计划对象（任务已在解析循环里直接构建）"""
+        return ProjectPlan(
             title=self.title,
-            tasks=tasks,
+            tasks=self.tasks,
             date_format=self.date_format,
             created_date=date.today(),
             version="1.0"
         )
-        
-        return project_plan
-    
+
     def get_parsed_data(self) -> Dict:
         """
         获取解析后的原始数据（用于调试和兼容性）
-        
+
+        任务字典视图按需物化，保持旧的数据形状。
+
         Returns:
             包含解析结果的字典
         """
@@ -255,7 +472,20 @@ class MermaidParser:
             'date_format': self.date_format,
             'title': self.title,
             'sections': self.sections,
-            'tasks': self.tasks_data
+            'tasks': [
+                {
+                    'id': task.id,
+                    'name': task.name,
+                    'status': task.status,
+                    'section': task.section,
+                    'is_milestone': task.is_milestone,
+                    'start_date': task.start_date,
+                    'end_date': task.end_date,
+                    'duration': task.duration,
+                    'dependencies': list(task.dependencies),
+                }
+                for task in self.tasks
+            ]
         }
 
 
@@ -273,93 +503,20 @@ class MermaidValidator:
     def validate(self, mermaid_code: str) -> tuple:
         """
         验证 Mermaid 代码
-        
+
+        解析器的parse_and_validate已在一次遍历里完成全部检查，
+        这里只是丢弃计划对象的薄包装。
+
         Args:
             mermaid_code: 要验证的 Mermaid 代码
-            
+
         Returns:
             (是否有效, 错误列表, 警告列表)
         """
-        self.errors = []
-        self.warnings = []
-        
-        lines = mermaid_code.splitlines()
-        task_ids = set()
-        dependencies = set()
-        
-        for line_num, line in enumerate(lines, 1):
-            line = line.strip()
-            
-            if not line or line.startswith('%') or line.startswith('%%'):
-                continue
-            
-            # 验证基本语法
-            if line.startswith('gantt'):
-                continue
-            elif line.startswith('dateFormat'):
-                self._validate_date_format(line, line_num)
-            elif line.startswith('title'):
-                continue  # 标题不需要特殊验证
-            elif line.startswith('section'):
-                continue  # 章节不需要特殊验证
-            else:
-                # 验证任务行
-                task_id, deps = self._validate_task_line(line, line_num)
-                if task_id:
-                    task_ids.add(task_id)
-                    dependencies.update(deps)
-        
-        # 验证依赖关系的有效性
-        self._validate_dependencies(task_ids, dependencies)
-        
-        return len(self.errors) == 0, self.errors, self.warnings
-    
-    def _validate_date_format(self, line: str, line_num: int):
-        """验证日期格式"""
-        match = re.search(r'dateFormat\s+(.+)', line)
-        if not match:
-            self.errors.append(f"第{line_num}行：日期格式语法错误")
-            return
-        
-        date_format = match.group(1).strip()
-        # 简单验证日期格式是否包含基本的日期占位符
-        if not any(fmt in date_format for fmt in ['YYYY', 'YY', 'MM', 'DD']):
-            self.warnings.append(f"第{line_num}行：日期格式可能不正确")
-    
-    def _validate_task_line(self, line: str, line_num: int) -> tuple:
-        """验证任务行语法"""
-        # 使用与解析器相同的正则表达式
-        task_match = re.match(
-            r'^(.+?)\s*:\s*([a-zA-Z0-9_-]+)'  # 任务名称和ID (支持中文)
-            r'(?:,\s*([a-zA-Z]+(?:,\s*[a-zA-Z]+)*)?)?' # 可选的状态关键词列表
-            r'(?:,\s*([a-zA-Z0-9\s/_-]+))'          # 开始信息 (日期或 'after ID') - 支持下划线
-            r'(?:,\s*([a-zA-Z0-9\s/_-]+))?$'    # 可选的结束信息 (日期或持续天数) - 支持下划线
-            , line
-        )
-        
-        if not task_match:
-            self.errors.append(f"第{line_num}行：任务语法错误: '{line}'")
-            return None, set()
-        
-        task_id = task_match.group(2).strip()
-        start_info = task_match.group(4).strip()
-        
-        # 检查依赖关系
-        dependencies = set()
-        dep_match = re.match(r'after\s+([a-zA-Z0-9_-]+)', start_info)
-        if dep_match:
-            dep_id = dep_match.group(1)
-            dependencies.add(dep_id)
-        
-        return task_id, dependencies
-    
-    def _validate_dependencies(self, task_ids: set, dependencies: set):
-        """验证依赖关系的有效性"""
-        # 检查是否有依赖的任务不存在
-        missing_deps = dependencies - task_ids
-        if missing_deps:
-            for dep in missing_deps:
-                self.errors.append(f"依赖的任务 '{dep}' 不存在")
+        parser = MermaidParser()
+        _, is_valid, self.errors, self.warnings = \
+            parser.parse_and_validate(mermaid_code)
+        return is_valid, self.errors, self.warnings
 
 
 # 使用示例和测试函数
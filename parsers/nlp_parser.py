@@ -4,15 +4,315 @@ TaskWeaver AI 自然语言解析器
 将自然语言项目描述转换为结构化的项目计划
 """
 
+import asyncio
+import hashlib
 import json
-import re
 import os
+from collections import deque
 from typing import List, Dict, Optional
 from datetime import date, datetime, timedelta
 
+from pydantic import TypeAdapter
+
 from core.models import Task, ProjectPlan
 from core.llm_client import LLMClient, auto_select_provider
 
+# 任务列表整批校验：单次调用在pydantic的Rust核心里循环构建全部
+# Task，省掉逐个Task(**kwargs)的Python层调用开销
+_TASK_LIST_ADAPTER = TypeAdapter(List[Task])
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def _loads(json_str: str):
+    """反序列化JSON，装了orjson就走C实现，否则退回标准库"""
+    if orjson is not None:
+        return orjson.loads(json_str)
+    return json.loads(json_str)
+
+
+def _adaptive_max_tokens(description: str) -> int:
+    """按描述长度估算输出token预算，争取一次尝试就给够
+
+    项目越复杂（描述越长）任务JSON越大。没有tiktoken依赖，用
+    字符数做粗略代理（中文约1字符1 token，英文偏保守）；下限
+    保证小描述也装得下10-15个任务的JSON，上限不超过4096输出限制。
+    """
+    return min(4000, max(2000, 250 + len(description) * 2))
+
+
+def _topological_order(tasks: List[Task]) -> List[Task]:
+    """Kahn拓扑排序：把前置任务排在依赖它的任务之前
+
+    LLM给出的任务顺序不保证依赖先行，重排后下游的单遍日程推导
+    不用回头补算。无依赖的就绪任务按原有相对顺序出队（FIFO），
+    引用不存在ID的边忽略，存在循环依赖时放弃重排原样返回。
+    """
+    index = {task.id: i for i, task in enumerate(tasks)}
+    indegree = [0] * len(tasks)
+    dependents: Dict[int, List[int]] = {}
+    for i, task in enumerate(tasks):
+        for dep_id in task.dependencies:
+            j = index.get(dep_id)
+            if j is not None:
+                indegree[i] += 1
+                dependents.setdefault(j, []).append(i)
+
+    queue = deque(i for i, d in enumerate(indegree) if d == 0)
+    order = []
+    while queue:
+        i = queue.popleft()
+        order.append(i)
+        for k in dependents.get(i, ()):
+            indegree[k] -= 1
+            if indegree[k] == 0:
+                queue.append(k)
+
+    if len(order) != len(tasks):
+        return tasks  # 循环依赖，保持原序
+    return [tasks[i] for i in order]
+
+
+def _is_truncation_error(err) -> bool:
+    """判断JSON解码失败是否像输出被截断
+
+    只有截断才可能被更大的max_tokens修复；模型输出整段散文时用
+    同样的提示重试是白付一轮往返。特征：错误落在缓冲区末尾附近，
+    且错误类型符合"数据戛然而止"（期望值/未闭合字符串/缺分隔符）。
+    """
+    if not isinstance(err, json.JSONDecodeError):
+        return False
+    msg = getattr(err, 'msg', '') or ''
+    doc = getattr(err, 'doc', '') or ''
+    pos = getattr(err, 'pos', len(doc))
+    # 开头就解不动说明整段是散文而非截断；远离末尾的失败同理
+    if pos == 0 or pos < len(doc) - 32:
+        return False
+    return msg.startswith((
+        'Expecting value',
+        'Unterminated string',
+        "Expecting ',' delimiter",
+    ))
+
+
+def _truncate_to_balanced(text: str) -> Optional[str]:
+    """把截断的响应裁剪到最后一个花括号配平的'}'处
+
+    有numpy时在uint8字节视图上向量化累计深度（'{'记+1、'}'记-1，
+    cumsum后找最后一个回到0的'}'），整段扫描都在C里完成；UTF-8的
+    续字节不会撞上花括号，按字节计数是安全的。找不到完整对象时
+    返回None。
+    """
+    if np is not None:
+        buf = np.frombuffer(text.encode('utf-8'), dtype=np.uint8)
+        delta = (buf == ord('{')).astype(np.int32)
+        delta -= (buf == ord('}')).astype(np.int32)
+        depth = np.cumsum(delta)
+        zeros = np.nonzero((depth == 0) & (buf == ord('}')))[0]
+        if zeros.size:
+            return bytes(buf[:int(zeros[-1]) + 1]).decode('utf-8')
+        return None
+
+    # 纯Python退路：逐字符累计深度
+    depth = 0
+    last_complete_pos = -1
+    for i, char in enumerate(text):
+        if char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                last_complete_pos = i + 1
+    if last_complete_pos > 0:
+        return text[:last_complete_pos]
+    return None
+
+
+def _task_default(o):
+    """orjson的default钩子：Task直接展开为字典，省掉整表预转换
+
+    orjson原生支持date，start_date无需手工isoformat。
+    """
+    if isinstance(o, Task):
+        return {
+            "id": o.id,
+            "name": o.name,
+            "description": o.description,
+            "duration": o.duration,
+            "dependencies": o.dependencies,
+            "status": o.status,
+            "is_milestone": o.is_milestone,
+            "section": o.section,
+            "start_date": o.start_date,
+        }
+    raise TypeError(f"无法序列化类型: {type(o).__name__}")
+
+
+def _extract_json(text: str) -> Optional[str]:
+    """线性扫描提取首个花括号配平的JSON片段
+
+    跟踪字符串内外状态和花括号深度，一趟扫描即可定位最小配平
+    区间，替代原来的DOTALL贪婪正则（对嵌套对象会提前截断，
+    且整段回扫开销大）。找不到返回None。
+    """
+    start = text.find('{')
+    if start == -1:
+        return None
+
+    depth = 0
+    in_string = False
+    escaped = False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == '\\':
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == '{':
+            depth += 1
+        elif ch == '}':
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+    return None
+
+
+def _iter_stream_objects(chunks, array_key: str = '"tasks"'):
+    """增量提取流式响应中tasks数组里的完整JSON对象子串
+
+    响应片段持续拼入缓冲区，定位数组'['后每凑齐一个配平对象立即
+    产出，无需等整段响应收完；markdown围栏在数组键之前，定位时
+    自然被跳过。
+    """
+    buf = ''
+    pos = -1  # 数组'['之后的扫描位置，-1表示尚未定位到数组
+    search_from = 0  # 数组键的搜索起点，避免每个片段都从头重扫前缀
+    for chunk in chunks:
+        if not chunk:
+            continue
+        buf += chunk
+
+        if pos < 0:
+            key_idx = buf.find(array_key, search_from)
+            if key_idx < 0:
+                # 键可能跨片段拆开，保留末尾不足一个键长的部分下次重扫
+                search_from = max(0, len(buf) - len(array_key) + 1)
+                continue
+            bracket = buf.find('[', key_idx)
+            if bracket < 0:
+                continue
+            pos = bracket + 1
+
+        while True:
+            while pos < len(buf) and buf[pos] in ' \t\r\n,':
+                pos += 1
+            if pos >= len(buf):
+                break
+            if buf[pos] == ']':
+                return
+            obj_str = _extract_json(buf[pos:])
+            if obj_str is None:
+                break  # 当前对象还没接收完整
+            yield obj_str
+            pos += len(obj_str)
+
+
+# 系统提示是固定文本，提升为模块常量，每次调用免去重建约1KB字符串
+_SYSTEM_PROMPT = """你是项目管理专家。将自然语言项目描述转换为JSON格式的项目计划。
+
+要求：
+1. 识别主要任务和里程碑
+2. 合理估算持续时间（工作日）
+3. 分析任务依赖关系
+4. 按阶段分组任务
+
+返回JSON格式：
+{
+    "title": "项目标题",
+    "description": "项目描述",
+    "tasks": [
+        {
+            "id": "task1",
+            "name": "任务名称",
+            "description": "任务描述",
+            "duration": 5,
+            "dependencies": [],
+            "status": ["active"],
+            "is_milestone": false,
+            "section": "阶段名称",
+            "start_date": "2025-01-01"
+        }
+    ]
+}
+
+严格要求：
+- 任务ID用简短英文标识符（如task1, design, dev等）
+- duration必须是整数（工作日），不能有小数
+- 里程碑duration为0
+- status只能是：["active"]、["crit"]或["done"]
+- 控制任务数量在10-15个主要任务
+- 避免过度细分，重点关注主要里程碑
+- 确保JSON格式完整正确"""
+
+# OpenAI严格结构化输出的schema：与Task/ProjectPlan字段对应，
+# strict模式要求所有属性都在required里，可缺省字段用null联合类型
+_PROJECT_PLAN_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "title": {"type": "string"},
+        "description": {"type": ["string", "null"]},
+        "tasks": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "id": {"type": "string"},
+                    "name": {"type": "string"},
+                    "description": {"type": ["string", "null"]},
+                    "duration": {"type": "integer"},
+                    "dependencies": {"type": "array", "items": {"type": "string"}},
+                    "status": {"type": "array", "items": {"type": "string"}},
+                    "is_milestone": {"type": "boolean"},
+                    "section": {"type": ["string", "null"]},
+                    "start_date": {"type": ["string", "null"]},
+                },
+                "required": ["id", "name", "description", "duration",
+                             "dependencies", "status", "is_milestone",
+                             "section", "start_date"],
+                "additionalProperties": False,
+            },
+        },
+    },
+    "required": ["title", "description", "tasks"],
+    "additionalProperties": False,
+}
+
+_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "project_plan",
+        "schema": _PROJECT_PLAN_SCHEMA,
+        "strict": True,
+    },
+}
+
+# 服务端提示缓存分片键：系统提示字节不变，同一键让OpenAI复用
+# 静态前缀的处理结果（SiliconFlow等兼容端点由客户端负责忽略）
+_PROMPT_CACHE_KEY = hashlib.sha1(_SYSTEM_PROMPT.encode('utf-8')).hexdigest()[:16]
+
 
 class NaturalLanguageParser:
     """
@@ -41,6 +341,9 @@ class NaturalLanguageParser:
             raise Exception(f"LLM客户端不可用: {provider}。请检查API密钥和网络连接。")
         
         print(f"✅ 使用 {provider} 进行自然语言解析")
+
+        # 最近一次计划序列化的单槽缓存：(计划对象, 版本, JSON字符串)
+        self._plan_json_memo = None
     
     def parse(self, description: str, project_title: str = None) -> ProjectPlan:
         """
@@ -65,16 +368,28 @@ class NaturalLanguageParser:
             {"role": "user", "content": user_prompt}
         ]
         
-        # 尝试多次，逐步增加max_tokens（不超过4096限制）
-        max_attempts = 3
-        token_limits = [2000, 3000, 4000]
-        
+        # 官方OpenAI支持严格json_schema结构化输出：返回必为合法JSON，
+        # 升档重试没有意义，单次尝试即可；兼容端点（SiliconFlow等）
+        # 不保证支持，保留逐步增加max_tokens的串行升档（不超过4096限制）
+        structured = self.llm_client.provider == 'openai'
+        response_format = _RESPONSE_FORMAT if structured else None
+        # 首次预算按描述长度自适应，省掉原来固定2000起步的升档轮次；
+        # 非结构化输出保留一档4000的截断兜底
+        base_tokens = _adaptive_max_tokens(description)
+        if structured or base_tokens >= 4000:
+            token_limits = [base_tokens]
+        else:
+            token_limits = [base_tokens, 4000]
+        max_attempts = len(token_limits)
+
         for attempt in range(max_attempts):
             try:
                 content = self.llm_client.chat_completion(
-                    messages, 
-                    temperature=0.1, 
-                    max_tokens=token_limits[attempt]
+                    messages,
+                    temperature=0.1,
+                    max_tokens=token_limits[attempt],
+                    prompt_cache_key=_PROMPT_CACHE_KEY,
+                    response_format=response_format
                 )
                 
                 if not content:
@@ -83,7 +398,11 @@ class NaturalLanguageParser:
                 return self._parse_ai_response(content)
                 
             except ValueError as e:
-                if "AI返回的数据格式不正确" in str(e) and attempt < max_attempts - 1:
+                # 只有截断型解码失败才升档重试：格式性错误（散文、
+                # schema不符）重试同样的请求大概率还是失败
+                if ("AI返回的数据格式不正确" in str(e)
+                        and attempt < max_attempts - 1
+                        and _is_truncation_error(self._last_decode_error)):
                     print(f"⚠️ 第{attempt + 1}次解析失败，重试中...")
                     continue
                 else:
@@ -94,66 +413,178 @@ class NaturalLanguageParser:
                     continue
                 else:
                     raise Exception(f"AI解析失败，已重试{max_attempts}次: {str(e)}")
-        
+
         raise Exception("AI解析失败，请检查网络连接或API配置")
-    
 
-    
-    def _build_system_prompt(self) -> str:
-        """构建系统提示"""
-        return """你是项目管理专家。将自然语言项目描述转换为JSON格式的项目计划。
+    # 对冲请求：低token尝试超过该秒数未成功时再发高token后备
+    _HEDGE_DELAY = 8.0
 
-要求：
-1. 识别主要任务和里程碑
-2. 合理估算持续时间（工作日）
-3. 分析任务依赖关系
-4. 按阶段分组任务
+    async def parse_async(self, description: str, project_title: str = None) -> ProjectPlan:
+        """
+        异步解析自然语言描述
 
-返回JSON格式：
-{
-    "title": "项目标题",
-    "description": "项目描述",
-    "tasks": [
-        {
-            "id": "task1",
-            "name": "任务名称",
-            "description": "任务描述",
-            "duration": 5,
-            "dependencies": [],
-            "status": ["active"],
-            "is_milestone": false,
-            "section": "阶段名称",
-            "start_date": "2025-01-01"
+        采用对冲策略代替同步路径的串行升档重试：先发2000 token的
+        快速尝试，_HEDGE_DELAY秒后再发4000 token的后备请求，谁先
+        解析成功用谁并取消另一个。快速尝试因截断失败时只需等后备
+        完成，不再额外付一轮完整网络往返。
+
+        Args:
+            description: 项目的自然语言描述
+            project_title: 项目标题（可选）
+
+        Returns:
+            解析后的项目计划
+        """
+        system_prompt = self._build_system_prompt()
+        user_prompt = self._build_user_prompt(description, project_title)
+
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
+
+        # 与同步路径一致：官方OpenAI走严格json_schema结构化输出
+        response_format = (_RESPONSE_FORMAT
+                           if self.llm_client.provider == 'openai' else None)
+
+        async def attempt(max_tokens: int, delay: float = 0.0) -> ProjectPlan:
+            if delay:
+                await asyncio.sleep(delay)
+            content = await self.llm_client.achat_completion(
+                messages,
+                temperature=0.1,
+                max_tokens=max_tokens,
+                prompt_cache_key=_PROMPT_CACHE_KEY,
+                response_format=response_format
+            )
+            if not content:
+                raise Exception("LLM返回空结果")
+            return self._parse_ai_response(content)
+
+        pending = {
+            asyncio.create_task(attempt(_adaptive_max_tokens(description))),
+            asyncio.create_task(attempt(4000, delay=self._HEDGE_DELAY)),
         }
-    ]
-}
+        last_error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    try:
+                        return task.result()
+                    except Exception as e:
+                        last_error = e
+        finally:
+            for task in pending:
+                task.cancel()
+
+        raise Exception(f"AI解析失败: {last_error}")
+
+    async def aparse_many(self, descriptions: List[str]) -> List[ProjectPlan]:
+        """
+        异步并发解析多个项目描述
+
+        批量导入时N次串行网络往返压缩为约max(延迟)一次的耗时。
+
+        Args:
+            descriptions: 多个项目描述
+
+        Returns:
+            与输入顺序对应的项目计划列表，单个失败时对应位置为异常对象
+        """
+        tasks = [self.parse_async(description) for description in descriptions]
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+    def parse_many(self, descriptions: List[str]) -> List[ProjectPlan]:
+        """同步便捷方法：并发解析多个项目描述（见 aparse_many）"""
+        return asyncio.run(self.aparse_many(descriptions))
+
+    def _build_system_prompt(self) -> str:
+        """构建系统提示（模块级常量，避免每次调用重建）"""
+        return _SYSTEM_PROMPT
 
-严格要求：
-- 任务ID用简短英文标识符（如task1, design, dev等）
-- duration必须是整数（工作日），不能有小数
-- 里程碑duration为0
-- status只能是：["active"]、["crit"]或["done"]
-- 控制任务数量在10-15个主要任务
-- 避免过度细分，重点关注主要里程碑
-- 确保JSON格式完整正确"""
-    
     def _build_user_prompt(self, description: str, project_title: str = None) -> str:
         """构建用户提示"""
-        prompt = f"""请分析以下项目描述，生成结构化的项目计划：
+        title_part = f"\n项目标题：{project_title}" if project_title else ""
+        return (
+            f"请分析以下项目描述，生成结构化的项目计划：\n\n"
+            f"项目描述：\n{description}\n"
+            f"{title_part}\n\n请返回JSON格式的项目计划。"
+        )
+
+    @staticmethod
+    def _normalize_task_data(task_data: Dict) -> Dict:
+        """把AI返回的单个任务字典规整为Task可直接校验的形状
+
+        宽容策略（坏日期置空、浮点工期取整、字符串status包成列表）
+        属于解析器而不是数据模型，所以在字典层完成，之后交给
+        pydantic整批构建。
+        """
+        # 解析日期
+        start_date = None
+        if task_data.get('start_date'):
+            try:
+                # 提示词固定要求%Y-%m-%d，fromisoformat比strptime快数倍
+                start_date = date.fromisoformat(task_data['start_date'])
+            except ValueError:
+                pass
+
+        # 处理status字段（可能是字符串或列表）
+        status = task_data.get('status', [])
+        if isinstance(status, str):
+            status = [status]
+        elif not isinstance(status, list):
+            status = []
+
+        # 处理duration字段（确保为整数）
+        duration = task_data.get('duration', 1)
+        if isinstance(duration, float):
+            duration = max(1, int(round(duration)))  # 四舍五入并确保最小为1
+        elif not isinstance(duration, int):
+            duration = 1
+
+        return {
+            'id': task_data.get('id', ''),
+            'name': task_data.get('name', ''),
+            'description': task_data.get('description'),
+            'duration': duration,
+            'dependencies': task_data.get('dependencies', []),
+            'status': status,
+            'is_milestone': task_data.get('is_milestone', False),
+            'section': task_data.get('section'),
+            'start_date': start_date,
+        }
+
+    def _build_task(self, task_data: Dict) -> Task:
+        """把AI返回的单个任务字典规整为Task对象"""
+        return Task(**self._normalize_task_data(task_data))
+
+    def parse_stream(self, description: str, project_title: str = None):
+        """
+        流式解析：任务随LLM响应逐个产出
+
+        以流式方式接收响应，tasks数组每关闭一个对象就立即构建并
+        产出一个Task，首个任务的等待时间从整段响应的生成时长缩短
+        到首个对象的生成时长。需要完整ProjectPlan时请用parse()。
+
+        Yields:
+            Task: 按响应中出现的顺序产出的任务对象
+        """
+        messages = [
+            {"role": "system", "content": self._build_system_prompt()},
+            {"role": "user", "content": self._build_user_prompt(description, project_title)}
+        ]
+        chunks = self.llm_client.stream_completion(
+            messages, temperature=0.1, max_tokens=4000
+        )
+        for obj_str in _iter_stream_objects(chunks):
+            yield self._build_task(_loads(obj_str))
 
-项目描述：
-{description}
-"""
-        
-        if project_title:
-            prompt += f"\n项目标题：{project_title}"
-        
-        prompt += "\n\n请返回JSON格式的项目计划。"
-        
-        return prompt
-    
     def _parse_ai_response(self, response: str) -> ProjectPlan:
         """解析AI响应"""
+        self._last_decode_error = None
         try:
             # 清理响应文本，移除markdown代码块标记
             clean_response = response.strip()
@@ -167,19 +598,10 @@ class NaturalLanguageParser:
             
             # 尝试修复截断的JSON
             if not clean_response.endswith('}'):
-                # 查找最后一个完整的对象
-                depth = 0
-                last_complete_pos = -1
-                for i, char in enumerate(clean_response):
-                    if char == '{':
-                        depth += 1
-                    elif char == '}':
-                        depth -= 1
-                        if depth == 0:
-                            last_complete_pos = i + 1
-                
-                if last_complete_pos > 0:
-                    clean_response = clean_response[:last_complete_pos]
+                # 裁剪到最后一个完整的对象（numpy时向量化扫描）
+                balanced = _truncate_to_balanced(clean_response)
+                if balanced is not None:
+                    clean_response = balanced
                 else:
                     # 如果找不到完整结构，尝试添加缺失的大括号
                     open_braces = clean_response.count('{')
@@ -189,56 +611,22 @@ class NaturalLanguageParser:
             
             # 解析JSON
             try:
-                data = json.loads(clean_response)
+                data = _loads(clean_response)
             except json.JSONDecodeError as json_error:
                 # 如果还是失败，尝试提取JSON部分
-                json_match = re.search(r'\{.*?\}', clean_response, re.DOTALL)
-                if json_match:
-                    json_str = json_match.group(0)
-                    data = json.loads(json_str)
+                json_str = _extract_json(clean_response)
+                if json_str:
+                    data = _loads(json_str)
                 else:
                     raise json_error
             
-            # 转换为ProjectPlan对象
-            tasks = []
-            for task_data in data.get('tasks', []):
-                # 解析日期
-                start_date = None
-                if task_data.get('start_date'):
-                    try:
-                        start_date = datetime.strptime(
-                            task_data['start_date'], '%Y-%m-%d'
-                        ).date()
-                    except ValueError:
-                        pass
-                
-                # 处理status字段（可能是字符串或列表）
-                status = task_data.get('status', [])
-                if isinstance(status, str):
-                    status = [status]
-                elif not isinstance(status, list):
-                    status = []
-                
-                # 处理duration字段（确保为整数）
-                duration = task_data.get('duration', 1)
-                if isinstance(duration, float):
-                    duration = max(1, int(round(duration)))  # 四舍五入并确保最小为1
-                elif not isinstance(duration, int):
-                    duration = 1
-                
-                task = Task(
-                    id=task_data.get('id', ''),
-                    name=task_data.get('name', ''),
-                    description=task_data.get('description'),
-                    duration=duration,
-                    dependencies=task_data.get('dependencies', []),
-                    status=status,
-                    is_milestone=task_data.get('is_milestone', False),
-                    section=task_data.get('section'),
-                    start_date=start_date
-                )
-                tasks.append(task)
-            
+            # 转换为ProjectPlan对象：字典规整后整批交给Rust核心校验，
+            # 再拓扑重排保证前置任务先于依赖它的任务
+            tasks = _topological_order(_TASK_LIST_ADAPTER.validate_python(
+                [self._normalize_task_data(task_data)
+                 for task_data in data.get('tasks', [])]
+            ))
+
             return ProjectPlan(
                 title=data.get('title', 'AI解析的项目'),
                 description=data.get('description', ''),
@@ -248,6 +636,9 @@ class NaturalLanguageParser:
             )
             
         except Exception as e:
+            if isinstance(e, json.JSONDecodeError):
+                # 留给_parse_with_ai判断是否值得升档重试
+                self._last_decode_error = e
             print(f"解析AI响应失败: {e}")
             print(f"原始响应长度: {len(response)}")
             print(f"响应前500字符: {response[:500]}")
@@ -268,12 +659,35 @@ class NaturalLanguageParser:
 
 返回优化后的完整项目计划，格式与输入相同。"""
         
-        # 将项目计划转换为描述
-        current_plan = self._project_plan_to_dict(project_plan)
-        
+        # 同一计划对象反复增强时复用上次的序列化结果。按对象身份+
+        # 版本号做单槽缓存，持有强引用保证id不被复用
+        memo = getattr(self, '_plan_json_memo', None)
+        if (memo is not None and memo[0] is project_plan
+                and memo[1] == project_plan.version):
+            plan_json = memo[2]
+        else:
+            # 序列化当前计划：orjson可直接带default钩子展开Task对象，
+            # 免去先整表转字典再dumps的两轮遍历；缺orjson时走原路径
+            if orjson is not None:
+                plan_json = orjson.dumps(
+                    {
+                        "title": project_plan.title,
+                        "description": project_plan.description,
+                        "tasks": project_plan.tasks,
+                    },
+                    default=_task_default,
+                    option=orjson.OPT_INDENT_2,
+                ).decode()
+            else:
+                plan_json = json.dumps(
+                    self._project_plan_to_dict(project_plan),
+                    ensure_ascii=False, indent=2
+                )
+            self._plan_json_memo = (project_plan, project_plan.version, plan_json)
+
         user_prompt = f"""请优化以下项目计划：
 
-{json.dumps(current_plan, ensure_ascii=False, indent=2)}
+{plan_json}
 
 请返回优化后的JSON格式项目计划。"""
         
@@ -282,7 +696,10 @@ class NaturalLanguageParser:
             {"role": "user", "content": user_prompt}
         ]
         
-        content = self.llm_client.chat_completion(messages, temperature=0.1, max_tokens=2000)
+        content = self.llm_client.chat_completion(
+            messages, temperature=0.1, max_tokens=2000,
+            prompt_cache_key=hashlib.sha1(system_prompt.encode('utf-8')).hexdigest()[:16]
+        )
         
         if not content:
             raise Exception("LLM返回空结果，优化失败")
@@ -311,19 +728,23 @@ class NaturalLanguageParser:
         }
 
 
-def create_project_from_description(description: str, title: str = None, 
-                                  provider: str = None, api_key: str = None) -> ProjectPlan:
+def create_project_from_description(description: str, title: str = None,
+                                  provider: str = None, api_key: str = None,
+                                  parser: NaturalLanguageParser = None) -> ProjectPlan:
     """
     便捷函数：从自然语言描述创建项目
-    
+
     Args:
         description: 项目描述
         title: 项目标题
         provider: LLM提供商
         api_key: API密钥
-        
+        parser: 预构建的解析器；循环调用时传入可免去每次重建
+            LLM客户端（SDK客户端和连接池初始化是这里的大头）
+
     Returns:
         项目计划对象
     """
-    parser = NaturalLanguageParser(provider=provider, api_key=api_key)
+    if parser is None:
+        parser = NaturalLanguageParser(provider=provider, api_key=api_key)
     return parser.parse(description, title)
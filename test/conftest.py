@@ -0,0 +1,30 @@
+"""
+测试共享fixture
+
+dummy key下的OpenAIClient走模拟模式，不触发真实API调用；客户端和
+备用解析器在整个测试会话内共享（解析器每次parse都会重置状态，
+跨用例复用是安全的）。
+"""
+
+import sys
+import os
+
+# 添加项目根目录到 Python 路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from parsers.ai_mermaid_parser import OpenAIClient
+from parsers.mermaid_parser import MermaidParser
+
+
+@pytest.fixture(scope="session")
+def llm_client():
+    """模拟模式的LLM客户端"""
+    return OpenAIClient("dummy_key")
+
+
+@pytest.fixture(scope="session")
+def fallback_parser():
+    """共享的本地Mermaid解析器"""
+    return MermaidParser()
@@ -1,16 +1,15 @@
 #!/usr/bin/env python3
 """
-TaskWeaver AI 核心模块测试脚本
+TaskWeaver AI 核心模块测试
 
-用于测试统一数据模型和核心处理引擎的功能。
+覆盖统一数据模型和核心处理引擎的功能。
 """
 
 from datetime import date, timedelta
-import sys
-import os
 
-# 添加项目根目录到 Python 路径
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pytest
+
+# 项目根目录的 sys.path 注入统一放在 conftest.py
 
 from core.models import Task, ProjectPlan
 from core.processor import CoreProcessor
@@ -18,7 +17,7 @@ from core.processor import CoreProcessor
 
 def create_sample_project():
     """创建一个示例项目用于测试"""
-    
+
     # 创建任务列表
     tasks = [
         Task(
@@ -88,7 +87,7 @@ def create_sample_project():
             section="测试阶段"
         )
     ]
-    
+
     # 创建项目计划
     project = ProjectPlan(
         title="TaskWeaver AI 测试项目",
@@ -97,166 +96,93 @@ def create_sample_project():
         created_date=date.today(),
         version="1.0"
     )
-    
+
     return project
 
 
-def test_data_model():
-    """测试数据模型功能"""
-    print("=== 测试数据模型 ===")
-    
-    # 创建示例项目
-    project = create_sample_project()
-    
-    # 基本属性测试
-    print(f"项目标题: {project.title}")
-    print(f"任务总数: {project.total_tasks}")
-    print(f"已完成任务: {project.completed_tasks}")
-    print(f"里程碑数量: {project.milestone_count}")
-    print(f"关键任务数量: {len(project.critical_tasks)}")
-    
-    # 分组测试
+@pytest.fixture(scope="module")
+def sample_project():
+    """模块级共享的示例项目（只读用例复用，省去重复构建8个Task）
+
+    CoreProcessor.calculate_dates会原地修改计划，需要可变计划的
+    用例请直接调用create_sample_project()拿新实例。
+    """
+    return create_sample_project()
+
+
+def test_data_model(sample_project):
+    """测试数据模型的统计属性与查询索引"""
+    project = sample_project
+
+    # 基本属性
+    assert project.total_tasks == 8
+    assert project.completed_tasks == 2
+    assert project.milestone_count == 2
+    assert len(project.critical_tasks) == 1
+
+    # 分组查询
     sections = project.get_sections()
-    print(f"项目分组: {sections}")
-    
+    assert set(sections) == {"项目启动", "开发阶段", "测试阶段"}
     for section in sections:
-        section_tasks = project.get_tasks_by_section(section)
-        print(f"  '{section}' 分组有 {len(section_tasks)} 个任务")
-    
-    # 任务查询测试
+        assert project.get_tasks_by_section(section)
+
+    # 任务与依赖查询
     task = project.get_task_by_id("task4")
-    if task:
-        print(f"\n任务详情 - {task.name}:")
-        print(f"  ID: {task.id}")
-        print(f"  状态: {task.status}")
-        print(f"  分组: {task.section}")
-        print(f"  持续时间: {task.duration} 天")
-        
-        # 依赖关系测试
-        dependencies = project.get_task_dependencies(task.id)
-        print(f"  前置任务: {[dep.name for dep in dependencies]}")
-        
-        dependents = project.get_task_dependents(task.id)
-        print(f"  后续任务: {[dep.name for dep in dependents]}")
-    
-    print("\n✅ 数据模型测试通过\n")
+    assert task is not None
+    assert task.section == "开发阶段"
+    assert task.duration == 10
+
+    dependencies = project.get_task_dependencies("task4")
+    assert [dep.id for dep in dependencies] == ["task3"]
+
+    dependents = project.get_task_dependents("task4")
+    assert [dep.id for dep in dependents] == ["task6"]
 
 
 def test_processor():
-    """测试核心处理引擎功能"""
-    print("=== 测试核心处理引擎 ===")
-    
-    # 创建示例项目
+    """测试核心处理引擎的验证、日期推导与统计"""
     project = create_sample_project()
-    
-    # 创建处理引擎
     processor = CoreProcessor(project)
-    
+
     # 验证项目计划
-    errors = processor.validate_plan()
-    if errors:
-        print("❌ 项目计划验证失败:")
-        for error in errors:
-            print(f"  - {error}")
-        return
-    else:
-        print("✅ 项目计划验证通过")
-    
-    # 计算日期
-    try:
-        processed_project = processor.calculate_dates()
-        print("✅ 日期计算完成")
-        
-        # 显示计算后的任务日期
-        print("\n任务日期计算结果:")
-        for task in processed_project.tasks:
-            print(f"  {task.name}: {task.start_date} ~ {task.end_date} ({task.duration}天)")
-        
-    except Exception as e:
-        print(f"❌ 日期计算失败: {e}")
-        return
-    
-    # 获取关键路径
-    try:
-        critical_path = processor.get_critical_path()
-        print(f"\n关键路径上的任务数量: {len(critical_path)}")
-        print("关键路径任务:")
-        for task in critical_path:
-            print(f"  - {task.name} ({task.id})")
-    except Exception as e:
-        print(f"❌ 关键路径计算失败: {e}")
-    
-    # 获取项目统计信息
-    try:
-        stats = processor.get_project_statistics()
-        print(f"\n项目统计信息:")
-        print(f"  总工期: {stats['total_duration']} 天")
-        print(f"  完成率: {stats['completion_rate']:.1f}%")
-        print(f"  进行中任务: {stats['active_tasks']}")
-        print(f"  项目开始日期: {stats['start_date']}")
-        print(f"  项目结束日期: {stats['end_date']}")
-        
-    except Exception as e:
-        print(f"❌ 统计信息获取失败: {e}")
-    
-    print("\n✅ 核心处理引擎测试通过\n")
+    assert processor.validate_plan() == []
+
+    # 计算日期：所有任务都应推导出起止日期
+    processed_project = processor.calculate_dates()
+    for task in processed_project.tasks:
+        assert task.start_date is not None
+        assert task.end_date is not None
+
+    # 关键路径
+    critical_path = processor.get_critical_path()
+    assert [task.id for task in critical_path] == [
+        "task3", "task5", "task6", "milestone2"
+    ]
+
+    # 项目统计信息
+    stats = processor.get_project_statistics()
+    assert stats['total_tasks'] == 8
+    assert stats['total_duration'] > 0
+    assert 0 <= stats['completion_rate'] <= 100
+    assert stats['start_date'] <= stats['end_date']
 
 
 def test_error_handling():
-    """测试错误处理"""
-    print("=== 测试错误处理 ===")
-    
-    # 测试循环依赖
-    try:
-        tasks = [
-            Task(id="A", name="任务A", dependencies=["C"], duration=1),
-            Task(id="B", name="任务B", dependencies=["A"], duration=1),
-            Task(id="C", name="任务C", dependencies=["B"], duration=1),
-        ]
-        
-        project = ProjectPlan(title="循环依赖测试", tasks=tasks)
-        processor = CoreProcessor(project)
+    """测试循环依赖与无效依赖的错误处理"""
+    # 循环依赖应在日期计算时被检测
+    tasks = [
+        Task(id="A", name="任务A", dependencies=["C"], duration=1),
+        Task(id="B", name="任务B", dependencies=["A"], duration=1),
+        Task(id="C", name="任务C", dependencies=["B"], duration=1),
+    ]
+    project = ProjectPlan(title="循环依赖测试", tasks=tasks)
+    processor = CoreProcessor(project)
+    with pytest.raises(ValueError):
         processor.calculate_dates()
-        
-        print("❌ 应该检测到循环依赖")
-        
-    except ValueError as e:
-        print(f"✅ 正确检测到循环依赖: {e}")
-    
-    # 测试无效依赖
-    try:
-        tasks = [
+
+    # 引用不存在的任务应在 Pydantic 验证时失败
+    with pytest.raises(ValueError):
+        ProjectPlan(title="无效依赖测试", tasks=[
             Task(id="A", name="任务A", dependencies=["B"], duration=1),
             Task(id="B", name="任务B", dependencies=["C"], duration=1),
-        ]
-        
-        project = ProjectPlan(title="无效依赖测试", tasks=tasks)
-        # 这个应该在 Pydantic 验证时失败
-        print("❌ 应该检测到无效依赖")
-        
-    except Exception as e:
-        print(f"✅ 正确检测到无效依赖: {e}")
-    
-    print("\n✅ 错误处理测试通过\n")
-
-
-def main():
-    """主测试函数"""
-    print("TaskWeaver AI 核心模块测试")
-    print("=" * 50)
-    
-    try:
-        test_data_model()
-        test_processor()
-        test_error_handling()
-        
-        print("🎉 所有测试通过！核心模块工作正常。")
-        
-    except Exception as e:
-        print(f"❌ 测试过程中出现错误: {e}")
-        import traceback
-        traceback.print_exc()
-
-
-if __name__ == "__main__":
-    main()
+        ])
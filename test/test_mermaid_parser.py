@@ -1,23 +1,16 @@
 #!/usr/bin/env python3
 """
-TaskWeaver AI Mermaid 解析器测试脚本
+TaskWeaver AI Mermaid 解析器测试
 
-用于测试重构后的 Mermaid 解析器功能。
+覆盖重构后 Mermaid 解析器的解析、验证与处理引擎集成。
 """
 
-import sys
-import os
-
-# 添加项目根目录到 Python 路径
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
+# 项目根目录的 sys.path 注入统一放在 conftest.py
 from parsers.mermaid_parser import MermaidParser, MermaidValidator
-from core.processor import CoreProcessor
 
 
 def test_basic_parsing():
     """测试基本解析功能"""
-    print("=== 测试基本解析功能 ===")
     
     mermaid_code = """
     gantt
@@ -61,12 +54,10 @@ def test_basic_parsing():
     assert milestone_a.is_milestone
     assert milestone_a.duration == 0
     
-    print("✅ 基本解析功能测试通过")
 
 
 def test_date_formats():
     """测试不同日期格式"""
-    print("=== 测试日期格式支持 ===")
     
     # 测试不同的日期格式
     test_cases = [
@@ -94,14 +85,11 @@ def test_date_formats():
         parser = MermaidParser()
         project_plan = parser.parse(test_case["code"])
         
-        print(f"测试用例 {i+1}: 期望格式 '{test_case['expected_format']}', 实际格式 '{project_plan.date_format}'")
         assert project_plan.date_format == test_case["expected_format"]
-        print(f"✅ 日期格式测试用例 {i+1} 通过")
 
 
 def test_dependency_handling():
     """测试依赖关系处理"""
-    print("=== 测试依赖关系处理 ===")
     
     mermaid_code = """
     gantt
@@ -126,12 +114,10 @@ def test_dependency_handling():
     assert "base" in middle_task.dependencies
     assert "middle" in final_task.dependencies
     
-    print("✅ 依赖关系处理测试通过")
 
 
 def test_milestone_handling():
     """测试里程碑处理"""
-    print("=== 测试里程碑处理 ===")
     
     mermaid_code = """
     gantt
@@ -168,12 +154,10 @@ def test_milestone_handling():
     assert complete_milestone is not None
     assert "dev" in complete_milestone.dependencies
     
-    print("✅ 里程碑处理测试通过")
 
 
 def test_status_handling():
     """测试状态处理"""
-    print("=== 测试状态处理 ===")
     
     mermaid_code = """
     gantt
@@ -203,12 +187,10 @@ def test_status_handling():
     assert "active" in multi_task.status
     assert "crit" in multi_task.status
     
-    print("✅ 状态处理测试通过")
 
 
 def test_validator():
     """测试语法验证器"""
-    print("=== 测试语法验证器 ===")
     
     # 测试正确的语法
     valid_code = """
@@ -224,7 +206,6 @@ def test_validator():
     
     assert is_valid
     assert len(errors) == 0
-    print("✅ 有效语法验证通过")
     
     # 测试无效的依赖
     invalid_code = """
@@ -240,13 +221,14 @@ def test_validator():
     assert not is_valid
     assert len(errors) > 0
     assert any("nonexistent" in error for error in errors)
-    print("✅ 无效依赖检测通过")
 
 
 def test_integration_with_processor():
     """测试与核心处理引擎的集成"""
-    print("=== 测试与核心处理引擎的集成 ===")
-    
+    # 只有本用例用到处理引擎，局部导入让其余用例免付其导入成本
+    from core.processor import CoreProcessor
+
+
     mermaid_code = """
     gantt
         dateFormat  YYYY-MM-DD
@@ -297,12 +279,10 @@ def test_integration_with_processor():
     assert stats['completed_tasks'] == 1
     assert stats['milestone_count'] == 1
     
-    print("✅ 与核心处理引擎集成测试通过")
 
 
 def test_error_handling():
     """测试错误处理"""
-    print("=== 测试错误处理 ===")
     
     # 测试空输入
     parser = MermaidParser()
@@ -337,31 +317,3 @@ def test_error_handling():
     # 应该跳过无效行，继续解析有效行
     assert plan.total_tasks == 1
     
-    print("✅ 错误处理测试通过")
-
-
-def main():
-    """主测试函数"""
-    print("TaskWeaver AI Mermaid 解析器测试")
-    print("=" * 50)
-    
-    try:
-        test_basic_parsing()
-        test_date_formats()
-        test_dependency_handling()
-        test_milestone_handling()
-        test_status_handling()
-        test_validator()
-        test_integration_with_processor()
-        test_error_handling()
-        
-        print("\n🎉 所有测试通过！Mermaid 解析器工作正常。")
-        
-    except Exception as e:
-        print(f"❌ 测试过程中出现错误: {e}")
-        import traceback
-        traceback.print_exc()
-
-
-if __name__ == "__main__":
-    main()